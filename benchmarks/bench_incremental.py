@@ -0,0 +1,107 @@
+"""
+Benchmark de la compilación incremental.
+
+Genera programas de N sentencias, los carga en una SesionIncremental y mide
+la latencia de editar una línea al azar (cambiar un literal) frente a
+recompilar el archivo entero. La edición solo re-tokeniza y re-parsea las
+sentencias tocadas; lo que aún crece con el archivo son copias en C (el texto
+y los desplazamientos de las sentencias posteriores). Reunir el TAC completo
+se mide aparte porque es proporcional a la salida.
+
+Uso:
+    python benchmarks/bench_incremental.py --tamanos 1000 10000 100000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.incremental import SesionIncremental  # noqa: E402
+from src.lexer import AnalizadorLexico  # noqa: E402
+from src.parser import AnalizadorSintactico  # noqa: E402
+from src.semantic import AnalizadorSemanticoAST  # noqa: E402
+from src.tac_generator import TACGenerator  # noqa: E402
+
+
+def generar_programa(sentencias, semilla=0):
+    """Programa con declaraciones al principio y luego asignaciones, ifs y whiles"""
+    aleatorio = random.Random(semilla)
+    variables = [f"v{i}" for i in range(50)]
+    lineas = [f"int {v};" for v in variables] + [f"{v} = {i};" for i, v in enumerate(variables)]
+    while len(lineas) < sentencias:
+        a, b = aleatorio.sample(variables, 2)
+        tipo = aleatorio.random()
+        if tipo < 0.7:
+            lineas.append(f"{a} = {b} + {aleatorio.randrange(100)};")
+        elif tipo < 0.85:
+            lineas.append(f"if ({a} < {b}) {{ {a} = {a} + 1; }} else {{ print({b}); }}")
+        else:
+            lineas.append(f"while ({a} > {aleatorio.randrange(100)}) {{ {a} = {a} - 1; }}")
+    return "\n".join(lineas) + "\n"
+
+
+def compilar_completo(texto):
+    with contextlib.redirect_stdout(io.StringIO()):
+        ast = AnalizadorSintactico(AnalizadorLexico().tokenizar(texto)).parse()
+        AnalizadorSemanticoAST().analizar(ast)
+        return TACGenerator().generate(ast)
+
+
+def editar_literal(sesion, aleatorio):
+    """Cambia el literal de una asignación al azar; devuelve los segundos de la
+    edición y los de reunir después el TAC completo"""
+    texto = sesion.texto
+    while True:
+        inicio = texto.find(" + ", aleatorio.randrange(len(texto)))
+        if inicio != -1:
+            break
+    inicio += 3
+    fin = texto.index(";", inicio)
+    antes = time.perf_counter()
+    sesion.editar(inicio, fin, str(aleatorio.randrange(1000)))
+    editado = time.perf_counter()
+    sesion.lineas_tac()
+    return editado - antes, time.perf_counter() - editado
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de la compilación incremental')
+    parser.add_argument('--tamanos', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='Número de sentencias de cada programa (default: 1000 10000 100000)')
+    parser.add_argument('--ediciones', type=int, default=50,
+                        help='Ediciones medidas por programa (default: 50)')
+    args = parser.parse_args()
+
+    print(f"{'sentencias':>10} {'completo (ms)':>14} {'carga (ms)':>11} "
+          f"{'edición media (ms)':>19} {'edición máx (ms)':>17} {'reunir TAC (ms)':>16}")
+    for tamano in args.tamanos:
+        texto = generar_programa(tamano)
+        antes = time.perf_counter()
+        compilar_completo(texto)
+        completo = time.perf_counter() - antes
+
+        sesion = SesionIncremental()
+        antes = time.perf_counter()
+        sesion.cargar(texto)
+        carga = time.perf_counter() - antes
+
+        aleatorio = random.Random(tamano)
+        medidas = [editar_literal(sesion, aleatorio) for _ in range(args.ediciones)]
+        tiempos = [edicion for edicion, _ in medidas]
+        reunir = sum(tac for _, tac in medidas) / len(medidas)
+        if sesion.error:
+            print(f"Error inesperado en la sesión: {sesion.error}")
+            sys.exit(1)
+        print(f"{tamano:>10} {completo * 1000:>14.1f} {carga * 1000:>11.1f} "
+              f"{sum(tiempos) / len(tiempos) * 1000:>19.3f} {max(tiempos) * 1000:>17.3f} "
+              f"{reunir * 1000:>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
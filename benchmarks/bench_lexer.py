@@ -0,0 +1,98 @@
+"""
+Benchmark del analizador léxico.
+
+Compara tokenizar() (código completo en memoria, lista de tokens) con
+iter_tokens() (lectura por bloques) sobre un archivo fuente generado del
+tamaño pedido. Reporta tokens/segundo y, con --memoria, el pico de memoria
+asignada (tracemalloc).
+
+Uso:
+    python benchmarks/bench_lexer.py --mb 20
+    python benchmarks/bench_lexer.py --mb 200 --solo-streaming --memoria
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.lexer import AnalizadorLexico  # noqa: E402
+
+BLOQUE_FUENTE = """int i;
+int suma;
+bool activo;
+// Bloque repetido para generar archivos grandes
+i = 0;
+suma = 0;
+activo = true;
+while (i <= 100 && activo) {
+    suma = suma + i * 2;
+    if (suma >= 5000 || i == 77) {
+        activo = false;
+    } else {
+        print(suma);
+    }
+    i = i + 1;
+}
+"""
+
+
+def generar_archivo(megabytes):
+    """Escribe un archivo fuente de aproximadamente 'megabytes' MB y devuelve su ruta"""
+    repeticiones = max(1, megabytes * 1024 * 1024 // len(BLOQUE_FUENTE))
+    descriptor, ruta = tempfile.mkstemp(suffix='.src')
+    with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+        for _ in range(repeticiones):
+            f.write(BLOQUE_FUENTE)
+    return ruta
+
+
+def medir(nombre, funcion, memoria):
+    if memoria:
+        tracemalloc.start()
+    inicio = time.perf_counter()
+    total = funcion()
+    segundos = time.perf_counter() - inicio
+    linea = f"{nombre:<14} {total:>12,} tokens  {segundos:8.2f} s  {total / segundos:>12,.0f} tokens/s"
+    if memoria:
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        linea += f"  pico {pico / (1024 * 1024):8.1f} MB"
+    print(linea)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark del analizador léxico')
+    parser.add_argument('--mb', type=int, default=20,
+                        help='Tamaño aproximado del fuente generado en MB (default: 20)')
+    parser.add_argument('--solo-streaming', action='store_true',
+                        help='Omitir tokenizar() (útil para archivos enormes)')
+    parser.add_argument('--memoria', action='store_true',
+                        help='Medir pico de memoria con tracemalloc (más lento)')
+    args = parser.parse_args()
+
+    lexico = AnalizadorLexico()
+    ruta = generar_archivo(args.mb)
+    try:
+        print(f"Fuente generado: {os.path.getsize(ruta) / (1024 * 1024):.1f} MB")
+
+        if not args.solo_streaming:
+            def completo():
+                with open(ruta, 'r', encoding='utf-8') as f:
+                    return len(lexico.tokenizar(f.read()))
+            medir('tokenizar', completo, args.memoria)
+
+        def streaming():
+            with open(ruta, 'r', encoding='utf-8') as f:
+                return sum(1 for _ in lexico.iter_tokens(f))
+        medir('iter_tokens', streaming, args.memoria)
+    finally:
+        os.remove(ruta)
+
+
+if __name__ == '__main__':
+    main()
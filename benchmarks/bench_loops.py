@@ -0,0 +1,108 @@
+"""
+Benchmark de la optimización de bucles.
+
+Escala los programas de tests/control_flow y tests/integration metiéndolos
+dentro de un bucle externo de N vueltas, los compila con -O0, -O1 y -O2 y
+cuenta las instrucciones TAC ejecutadas por vuelta y el tiempo de la VM.
+
+Uso:
+    python benchmarks/bench_loops.py --vueltas 20000
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.lexer import AnalizadorLexico  # noqa: E402
+from src.parser import AnalizadorSintactico  # noqa: E402
+from src.tac_generator import TACGenerator  # noqa: E402
+from src.optimizer import OptimizadorTAC  # noqa: E402
+from src.vm import (MaquinaTAC, decodificar, _FUNCIONES, OP_COPIA,  # noqa: E402
+                    OP_SI_FALSO, OP_GOTO)
+
+RAIZ = os.path.join(os.path.dirname(__file__), '..')
+CARPETAS = ('tests/control_flow', 'tests/integration')
+
+
+def escalar(fuente, vueltas):
+    """Repite el programa 'vueltas' veces dentro de un while (declaraciones fuera)"""
+    declaraciones = []
+    sentencias = []
+    for linea in fuente.splitlines():
+        limpia = linea.strip()
+        if limpia.startswith('int ') or limpia.startswith('bool '):
+            declaraciones.append(limpia)
+        elif limpia and not limpia.startswith('//'):
+            sentencias.append(limpia)
+    return "\n".join(declaraciones + [
+        "int vuelta_bench;",
+        "vuelta_bench = 0;",
+        f"while (vuelta_bench < {vueltas}) {{",
+        *sentencias,
+        "vuelta_bench = vuelta_bench + 1;",
+        "}",
+    ]) + "\n"
+
+
+def generar_tac(fuente, nivel):
+    tokens = AnalizadorLexico().tokenizar(fuente)
+    lineas = TACGenerator().generate(AnalizadorSintactico(tokens).parse())
+    if nivel:
+        lineas = OptimizadorTAC(nivel).optimizar(lineas)
+    return lineas
+
+
+def contar_ejecutadas(programa):
+    """Instrucciones ejecutadas por el programa (misma semántica que MaquinaTAC)"""
+    codigo = programa.codigo
+    mem = list(programa.memoria_inicial)
+    pc = 0
+    ejecutadas = 0
+    while pc < len(codigo):
+        op, a, b, c = codigo[pc]
+        pc += 1
+        ejecutadas += 1
+        if op < OP_COPIA:
+            mem[a] = _FUNCIONES[op](mem[b], mem[c])
+        elif op == OP_COPIA:
+            mem[a] = mem[b]
+        elif op == OP_SI_FALSO:
+            if not mem[a]:
+                pc = b
+        elif op == OP_GOTO:
+            pc = a
+    return ejecutadas
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de la optimización de bucles')
+    parser.add_argument('--vueltas', type=int, default=20000,
+                        help='Vueltas del bucle externo que escala cada programa (default: 20000)')
+    args = parser.parse_args()
+
+    rutas = sorted(ruta for carpeta in CARPETAS
+                   for ruta in glob.glob(os.path.join(RAIZ, carpeta, '*.src')))
+    print(f"{'programa':<24} {'nivel':>5} {'instr/vuelta':>13} {'VM (s)':>8}")
+    for ruta in rutas:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            fuente = escalar(f.read(), args.vueltas)
+        for nivel in (0, 1, 2):
+            programa = decodificar(generar_tac(fuente, nivel))
+            ejecutadas = contar_ejecutadas(programa)
+            with contextlib.redirect_stdout(io.StringIO()):
+                maquina = MaquinaTAC()
+                inicio = time.perf_counter()
+                maquina.ejecutar_programa(programa)
+                segundos = time.perf_counter() - inicio
+            print(f"{os.path.basename(ruta):<24} {'-O' + str(nivel):>5} "
+                  f"{ejecutadas / args.vueltas:>13.1f} {segundos:>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
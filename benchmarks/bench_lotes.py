@@ -0,0 +1,106 @@
+"""
+Benchmark de la ejecución por lotes (src/batch.py, necesita NumPy).
+
+Ejecuta un mismo programa sobre N entradas con una MaquinaTAC por entrada y
+con una sola MaquinaLotes, comprueba que la salida de cada instancia es la
+misma y compara el tiempo. Dos programas: uno de flujo uniforme (todas las
+instancias dan las mismas vueltas) y uno divergente (Collatz: cada instancia
+da un número distinto de vueltas y toma ramas distintas del if).
+
+Uso:
+    python benchmarks/bench_lotes.py --instancias 1000 10000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.batch import MaquinaLotes  # noqa: E402
+from src.lexer import AnalizadorLexico  # noqa: E402
+from src.output import SalidaLista, silenciar  # noqa: E402
+from src.parser import AnalizadorSintactico  # noqa: E402
+from src.tac_generator import TACGenerator  # noqa: E402
+from src.vm import MaquinaTAC, ProgramaTAC, decodificar  # noqa: E402
+
+PROGRAMAS = {
+    'uniforme': """
+int x;
+int i;
+int acumulado;
+acumulado = 0;
+i = 0;
+while (i < 200) {
+    acumulado = ((acumulado + (x * i)) - (acumulado / 3));
+    i = i + 1;
+}
+print(acumulado);
+""",
+    'collatz': """
+int x;
+int pasos;
+pasos = 0;
+while (x > 1) {
+    if ((((x / 2) * 2) == x)) {
+        x = x / 2;
+    } else {
+        x = (3 * x) + 1;
+    }
+    pasos = pasos + 1;
+}
+print(pasos);
+""",
+}
+
+
+def compilar(fuente):
+    tokens = AnalizadorLexico().tokenizar(fuente)
+    return decodificar(TACGenerator().generate(AnalizadorSintactico(tokens).parse()))
+
+
+def ejecutar_uno_a_uno(programa, valores):
+    """Salidas de una MaquinaTAC por entrada (x inicializada con cada valor)"""
+    slot = programa.simbolos['x']
+    salidas = []
+    for valor in valores:
+        memoria = list(programa.memoria_inicial)
+        memoria[slot] = valor
+        salida = SalidaLista()
+        MaquinaTAC(salida=salida).ejecutar_programa(
+            ProgramaTAC(programa.codigo, memoria, programa.simbolos, programa.etiquetas))
+        salidas.append(salida.valores)
+    return salidas
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de la ejecución por lotes')
+    parser.add_argument('--instancias', type=int, nargs='+', default=[1000, 10000],
+                        help='Número de entradas de cada medida (default: 1000 10000)')
+    args = parser.parse_args()
+    silenciar(True)
+
+    print(f"{'programa':<10} {'instancias':>10} {'uno a uno (ms)':>15} "
+          f"{'lotes (ms)':>11} {'aceleración':>12} {'pasos':>7}")
+    for nombre, fuente in PROGRAMAS.items():
+        programa = compilar(fuente)
+        for instancias in args.instancias:
+            valores = list(range(1, instancias + 1))
+            antes = time.perf_counter()
+            esperado = ejecutar_uno_a_uno(programa, valores)
+            uno_a_uno = time.perf_counter() - antes
+
+            maquina = MaquinaLotes()
+            antes = time.perf_counter()
+            salidas = maquina.ejecutar_programa(programa, {'x': valores})
+            lotes = time.perf_counter() - antes
+            if salidas != esperado:
+                print(f"Error: la salida por lotes de '{nombre}' no coincide con la de MaquinaTAC")
+                sys.exit(1)
+            print(f"{nombre:<10} {instancias:>10} {uno_a_uno * 1000:>15.1f} "
+                  f"{lotes * 1000:>11.1f} {uno_a_uno / lotes:>11.1f}x {maquina.pasos:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+"""
+Suite de benchmarks del compilador con baselines.
+
+Genera programas sintéticos (benchmarks/generador.py) para varios escenarios
+y mide por separado cada etapa: AnalizadorLexico, AnalizadorSintactico,
+AnalizadorSemanticoAST, TACGenerator y MaquinaTAC (decodificación, fusión y
+ejecución). De cada etapa se toma el mínimo de varias repeticiones, que es la
+medida menos sensible al ruido de la máquina. También se mide la memoria
+(tracemalloc) de tokens y AST por nodo del AST.
+
+Los resultados se pueden guardar como baseline JSON y comparar con una
+baseline anterior: una etapa más lenta que la baseline en más del umbral se
+marca como regresión y el script termina con código 1.
+
+Uso:
+    python benchmarks/bench_suite.py --guardar baseline.json
+    python benchmarks/bench_suite.py --comparar baseline.json --umbral 10
+    python benchmarks/bench_suite.py --escenarios pequeno bucles_anidados -r 3
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src import __version__  # noqa: E402
+from src.lexer import AnalizadorLexico  # noqa: E402
+from src.parser import AnalizadorSintactico  # noqa: E402
+from src.semantic import AnalizadorSemanticoAST  # noqa: E402
+from src.tac_generator import TACGenerator  # noqa: E402
+from src.vm import MaquinaTAC  # noqa: E402
+from src.stats import contar_nodos  # noqa: E402
+from generador import GeneradorProgramas  # noqa: E402
+
+ETAPAS = ('lexico', 'sintactico', 'semantico', 'tac', 'vm')
+
+# nombre -> parámetros de GeneradorProgramas
+ESCENARIOS = {
+    'pequeno': dict(sentencias=200, profundidad_expresion=2, anidamiento_bucles=1, iteraciones=10),
+    'grande': dict(sentencias=20000, profundidad_expresion=2, anidamiento_bucles=1, iteraciones=2),
+    'expresiones_profundas': dict(sentencias=2000, profundidad_expresion=6,
+                                  anidamiento_bucles=0, iteraciones=1),
+    'bucles_anidados': dict(sentencias=300, profundidad_expresion=2, anidamiento_bucles=3,
+                            iteraciones=15),
+    'bucles_largos': dict(sentencias=100, profundidad_expresion=1, anidamiento_bucles=1,
+                          iteraciones=5000),
+}
+
+
+def medir_etapas(fuente, repeticiones):
+    """{etapa: segundos} con el mínimo de 'repeticiones' ejecuciones de cada etapa"""
+    mejores = dict.fromkeys(ETAPAS, float('inf'))
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            tokens = AnalizadorLexico().tokenizar(fuente)
+            medido = time.perf_counter()
+            mejores['lexico'] = min(mejores['lexico'], medido - inicio)
+
+            inicio = time.perf_counter()
+            ast = AnalizadorSintactico(tokens).parse()
+            medido = time.perf_counter()
+            mejores['sintactico'] = min(mejores['sintactico'], medido - inicio)
+
+            inicio = time.perf_counter()
+            AnalizadorSemanticoAST().analizar(ast)
+            medido = time.perf_counter()
+            mejores['semantico'] = min(mejores['semantico'], medido - inicio)
+
+            inicio = time.perf_counter()
+            lineas_tac = TACGenerator().generate(ast)
+            medido = time.perf_counter()
+            mejores['tac'] = min(mejores['tac'], medido - inicio)
+
+            maquina = MaquinaTAC()
+            inicio = time.perf_counter()
+            maquina.ejecutar(lineas_tac)
+            medido = time.perf_counter()
+            mejores['vm'] = min(mejores['vm'], medido - inicio)
+    return mejores
+
+
+def medir_memoria(fuente):
+    """Bytes por nodo del AST que ocupan los tokens y el AST ya construidos"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        tracemalloc.start()
+        try:
+            tokens = AnalizadorLexico().tokenizar(fuente)
+            ast = AnalizadorSintactico(tokens).parse()
+            ocupado, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return ocupado / contar_nodos(ast)
+
+
+def comparar(resultados, baseline, umbral):
+    """Lista de (escenario, etapa, antes, ahora, % de cambio) que superan el umbral"""
+    regresiones = []
+    for escenario, etapas in resultados.items():
+        anteriores = baseline.get('escenarios', {}).get(escenario, {})
+        for etapa, segundos in etapas.items():
+            antes = anteriores.get(etapa)
+            if not antes:
+                continue
+            cambio = 100 * (segundos - antes) / antes
+            if cambio > umbral:
+                regresiones.append((escenario, etapa, antes, segundos, cambio))
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Suite de benchmarks por etapa con baselines')
+    parser.add_argument('--escenarios', nargs='+', choices=sorted(ESCENARIOS),
+                        default=list(ESCENARIOS), help='Escenarios a medir (default: todos)')
+    parser.add_argument('-r', '--repeticiones', type=int, default=5,
+                        help='Repeticiones por etapa; se usa el mínimo (default: 5)')
+    parser.add_argument('--semilla', type=int, default=0,
+                        help='Semilla del generador: la misma semilla da los mismos programas')
+    parser.add_argument('--guardar', metavar='ARCHIVO',
+                        help='Guardar los resultados como baseline JSON')
+    parser.add_argument('--comparar', metavar='ARCHIVO',
+                        help='Comparar con una baseline JSON guardada antes')
+    parser.add_argument('--umbral', type=float, default=10.0,
+                        help='%% de empeoramiento a partir del cual se marca regresión (default: 10)')
+    args = parser.parse_args()
+
+    baseline = None
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('semilla') != args.semilla:
+            print(f"Aviso: la baseline usó la semilla {baseline.get('semilla')}; "
+                  f"los programas no son los mismos")
+
+    print(f"{'escenario':<22} {'bytes':>8} " + " ".join(f"{etapa + ' (ms)':>15}" for etapa in ETAPAS)
+          + f" {'B/nodo':>12}")
+    resultados = {}
+    memoria = {}
+    for nombre in args.escenarios:
+        fuente = GeneradorProgramas(semilla=args.semilla, **ESCENARIOS[nombre]).generar()
+        resultados[nombre] = medir_etapas(fuente, args.repeticiones)
+        memoria[nombre] = medir_memoria(fuente)
+        columnas = []
+        for etapa in ETAPAS:
+            celda = f"{resultados[nombre][etapa] * 1000:.2f}"
+            antes = (baseline or {}).get('escenarios', {}).get(nombre, {}).get(etapa)
+            if antes:
+                celda += f" {100 * (resultados[nombre][etapa] - antes) / antes:+.0f}%"
+            columnas.append(f"{celda:>15}")
+        celda = f"{memoria[nombre]:.0f}"
+        antes = (baseline or {}).get('memoria', {}).get(nombre)
+        if antes:
+            celda += f" {100 * (memoria[nombre] - antes) / antes:+.0f}%"
+        columnas.append(f"{celda:>12}")
+        print(f"{nombre:<22} {len(fuente):>8} " + " ".join(columnas))
+
+    if args.guardar:
+        with open(args.guardar, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': __version__,
+                'python': platform.python_version(),
+                'maquina': platform.machine(),
+                'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'semilla': args.semilla,
+                'repeticiones': args.repeticiones,
+                'escenarios': resultados,
+                'memoria': memoria,  # Bytes de tokens + AST por nodo
+            }, f, indent=2)
+        print(f"\nBaseline guardada en {args.guardar}")
+
+    if baseline is not None:
+        regresiones = comparar(resultados, baseline, args.umbral)
+        print(f"\nComparación con {args.comparar} (versión {baseline.get('version', '?')}, "
+              f"umbral {args.umbral:.0f}%):")
+        if not regresiones:
+            print("Sin regresiones")
+            return
+        for escenario, etapa, antes, ahora, cambio in regresiones:
+            print(f"  REGRESIÓN {escenario}/{etapa}: {antes * 1000:.2f} ms -> "
+                  f"{ahora * 1000:.2f} ms ({cambio:+.1f}%)")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""
+Generador de programas sintéticos del mini-lenguaje para los benchmarks.
+
+Los programas son siempre válidos (léxico, sintaxis y tipos) y terminan:
+cada bucle usa un contador propio que el cuerpo no modifica. Para que los
+valores no crezcan sin límite dentro de los bucles, cada asignación entera
+divide la expresión entre su número de operandos.
+
+Uso como script:
+    python benchmarks/generador.py --sentencias 500 --profundidad 4 \\
+        --anidamiento 2 --iteraciones 20 -o programa.src
+"""
+
+import argparse
+import random
+
+_SANGRIA_MAXIMA = 6  # Bloques anidados como máximo (if dentro de if...)
+
+
+class GeneradorProgramas:
+    def __init__(self, sentencias=200, profundidad_expresion=3, anidamiento_bucles=2,
+                 iteraciones=10, variables=8, semilla=0):
+        self.sentencias = sentencias                      # Sentencias a generar (aprox.)
+        self.profundidad_expresion = profundidad_expresion  # Niveles de paréntesis
+        self.anidamiento_bucles = anidamiento_bucles      # Bucles while anidados como máximo
+        self.iteraciones = iteraciones                    # Vueltas de cada bucle
+        self.enteras = [f"v{i}" for i in range(variables)]
+        self.booleanas = [f"b{i}" for i in range(max(1, variables // 2))]
+        self.aleatorio = random.Random(semilla)
+
+    def generar(self):
+        """Texto fuente del programa"""
+        lineas = [f"int {nombre};" for nombre in self.enteras]
+        lineas += [f"bool {nombre};" for nombre in self.booleanas]
+        lineas += [f"int c{nivel};" for nivel in range(self.anidamiento_bucles)]
+        lineas += [f"{nombre} = {self.aleatorio.randrange(100)};" for nombre in self.enteras]
+        lineas += [f"{nombre} = {self.aleatorio.choice(('true', 'false'))};"
+                   for nombre in self.booleanas]
+        restantes = [self.sentencias]
+        while restantes[0] > 0:
+            self._sentencia(lineas, 0, 0, restantes)
+        lineas += [f"print({nombre});" for nombre in self.enteras]
+        return "\n".join(lineas) + "\n"
+
+    # ========== SENTENCIAS ==========
+
+    def _sentencia(self, lineas, sangria, nivel_bucle, restantes):
+        restantes[0] -= 1
+        espacio = "    " * sangria
+        tipo = self.aleatorio.random()
+        if tipo < 0.15 and nivel_bucle < self.anidamiento_bucles and restantes[0] > 2:
+            contador = f"c{nivel_bucle}"
+            lineas.append(f"{espacio}{contador} = 0;")
+            lineas.append(f"{espacio}while ({contador} < {self.iteraciones}) {{")
+            self._cuerpo(lineas, sangria + 1, nivel_bucle + 1, restantes)
+            lineas.append(f"{espacio}    {contador} = {contador} + 1;")
+            lineas.append(f"{espacio}}}")
+        elif tipo < 0.30 and restantes[0] > 1 and sangria < _SANGRIA_MAXIMA:
+            lineas.append(f"{espacio}if ({self._condicion()}) {{")
+            self._cuerpo(lineas, sangria + 1, nivel_bucle, restantes)
+            if self.aleatorio.random() < 0.5:
+                lineas.append(f"{espacio}}} else {{")
+                self._cuerpo(lineas, sangria + 1, nivel_bucle, restantes)
+            lineas.append(f"{espacio}}}")
+        elif tipo < 0.40:
+            destino = self.aleatorio.choice(self.booleanas)
+            lineas.append(f"{espacio}{destino} = {self._condicion()};")
+        elif tipo < 0.43:
+            lineas.append(f"{espacio}print({self.aleatorio.choice(self.enteras)});")
+        else:
+            destino = self.aleatorio.choice(self.enteras)
+            expresion, operandos = self._expresion(self.profundidad_expresion)
+            lineas.append(f"{espacio}{destino} = ({expresion}) / {operandos};")
+
+    def _cuerpo(self, lineas, sangria, nivel_bucle, restantes):
+        for _ in range(self.aleatorio.randint(1, 4)):
+            self._sentencia(lineas, sangria, nivel_bucle, restantes)
+
+    # ========== EXPRESIONES ==========
+
+    def _expresion(self, profundidad):
+        """(expresión entera solo con + y -, número de operandos hoja): su valor
+        absoluto no supera operandos * el mayor valor absoluto de las hojas"""
+        partes = []
+        operandos = 0
+        for i in range(self.aleatorio.randint(2, 3)):
+            if profundidad > 0 and self.aleatorio.random() < 0.5:
+                subexpresion, hojas = self._expresion(profundidad - 1)
+                termino = f"({subexpresion})"
+            else:
+                termino = self._hoja()
+                hojas = 1
+            operandos += hojas
+            partes.append(termino if i == 0 else f"{self.aleatorio.choice('+-')} {termino}")
+        return " ".join(partes), operandos
+
+    def _hoja(self):
+        if self.aleatorio.random() < 0.7:
+            return self.aleatorio.choice(self.enteras)
+        return str(self.aleatorio.randrange(100))
+
+    def _condicion(self):
+        # Sin precedencia de operadores: la comparación va entre paréntesis
+        comparacion = (f"{self.aleatorio.choice(self.enteras)} "
+                       f"{self.aleatorio.choice(('<', '<=', '>', '>=', '==', '!='))} "
+                       f"{self._hoja()}")
+        if self.aleatorio.random() < 0.5:
+            return comparacion
+        return (f"({comparacion}) {self.aleatorio.choice(('&&', '||'))} "
+                f"{self.aleatorio.choice(self.booleanas)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Genera un programa sintético del mini-lenguaje')
+    parser.add_argument('--sentencias', type=int, default=200)
+    parser.add_argument('--profundidad', type=int, default=3,
+                        help='Niveles de paréntesis en las expresiones (default: 3)')
+    parser.add_argument('--anidamiento', type=int, default=2,
+                        help='Bucles while anidados como máximo (default: 2)')
+    parser.add_argument('--iteraciones', type=int, default=10,
+                        help='Vueltas de cada bucle (default: 10)')
+    parser.add_argument('--variables', type=int, default=8)
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('-o', '--output', default=None, help='Archivo de salida (default: stdout)')
+    args = parser.parse_args()
+
+    texto = GeneradorProgramas(args.sentencias, args.profundidad, args.anidamiento,
+                               args.iteraciones, args.variables, args.semilla).generar()
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(texto)
+    else:
+        print(texto, end="")
+
+
+if __name__ == '__main__':
+    main()
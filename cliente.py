@@ -0,0 +1,95 @@
+"""
+Cliente del servidor de compilación ('python compilador.py serve').
+
+Solo usa la biblioteca estándar: no importa el compilador, así que arranca
+en lo que tarda el intérprete y deja el trabajo al servidor ya cargado.
+Los archivos se leen y escriben aquí; al servidor solo viaja el texto.
+
+Uso:
+    python cliente.py compile programa.src -o programa.tac
+    python cliente.py compile programa.src -O2 --run
+    python cliente.py run programa.tac --backend py
+    python cliente.py ping
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+
+# Mismo valor que src/server.py (duplicado para no importar el compilador)
+RUTA_SOCKET_POR_DEFECTO = os.environ.get('MINILANG_SOCKET') or os.path.join(
+    tempfile.gettempdir(), f"minilang-{os.getuid()}.sock")
+
+
+def enviar(peticion, ruta_socket=RUTA_SOCKET_POR_DEFECTO):
+    """Envía una petición al servidor y devuelve su respuesta (dict)"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conexion:
+        conexion.connect(ruta_socket)
+        conexion.sendall((json.dumps(peticion) + "\n").encode('utf-8'))
+        with conexion.makefile('rb') as lector:
+            return json.loads(lector.readline())
+
+
+def leer(ruta):
+    with open(ruta, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cliente del servidor de compilación')
+    parser.add_argument('--socket', default=RUTA_SOCKET_POR_DEFECTO,
+                        help='Ruta del socket del servidor (default: $MINILANG_SOCKET o /tmp/minilang-<uid>.sock)')
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    compile_parser = subparsers.add_parser('compile', help='Compilar un fuente a TAC')
+    compile_parser.add_argument('archivo_fuente')
+    compile_parser.add_argument('-o', '--output', default=None,
+                                help='Archivo TAC de salida (default: sin --run, el TAC a stdout)')
+    compile_parser.add_argument('-O', dest='optimizacion', type=int, choices=[0, 1, 2], default=0)
+    compile_parser.add_argument('--run', action='store_true', help='Ejecutar después de compilar')
+    compile_parser.add_argument('--backend', choices=['vm', 'py'], default='vm')
+
+    run_parser = subparsers.add_parser('run', help='Ejecutar un archivo TAC')
+    run_parser.add_argument('archivo_tac')
+    run_parser.add_argument('--backend', choices=['vm', 'py'], default='vm')
+
+    subparsers.add_parser('ping', help='Comprobar que el servidor responde')
+    args = parser.parse_args()
+
+    if args.comando == 'compile':
+        peticion = {'accion': 'compile', 'fuente': leer(args.archivo_fuente),
+                    'optimizacion': args.optimizacion, 'ejecutar': args.run,
+                    'backend': args.backend}
+    elif args.comando == 'run':
+        peticion = {'accion': 'run', 'tac': leer(args.archivo_tac), 'backend': args.backend}
+    else:
+        peticion = {'accion': 'ping'}
+
+    try:
+        respuesta = enviar(peticion, args.socket)
+    except OSError as e:
+        print(f"Error: no se pudo conectar con el servidor en {args.socket} ({e})")
+        sys.exit(1)
+
+    for aviso in respuesta.get('avisos', []):
+        print(aviso)
+    if 'tac' in respuesta:
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(respuesta['tac'])
+        elif not args.run:
+            print(respuesta['tac'])
+    if respuesta.get('salida'):
+        sys.stdout.write("".join(f"OUTPUT >> {valor}\n" for valor in respuesta['salida']))
+    if args.comando == 'ping' and respuesta.get('ok'):
+        print(f"Servidor activo (versión {respuesta.get('version')})")
+    if not respuesta.get('ok'):
+        print(respuesta.get('error'))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
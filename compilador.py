@@ -8,12 +8,33 @@ Original file is located at
 """
 # En compilador.py - MUEVE esta línea ARRIBA de los imports
 import argparse
+import contextlib
+import glob
+import io
+import json
 import re
+import signal
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor
 from src.lexer import AnalizadorLexico
 from src.parser import AnalizadorSintactico
 from src.semantic import AnalizadorSemanticoAST
-from src.tac_generator import GeneradorDeCodigo
-from src.vm import MaquinaTAC
+from src.errors import ErrorCompilacion, ErrorSintactico, ErrorSemantico
+from src.tac_generator import GeneradorDeCodigo, TACGenerator
+from src.vm import MaquinaTAC, decodificar, desensamblar, SUPERINSTRUCCIONES
+from src.optimizer import OptimizadorTAC
+from src.single_pass import AnalizadorGeneradorTAC
+from src.tacb import guardar_tacb, cargar_tacb
+from src.py_backend import MaquinaPython
+from src.batch import MaquinaLotes, leer_entradas_csv
+from src.pool import ejecutar_muchos
+from src.async_vm import MaquinaCooperativa, PresupuestoAgotado
+from src.cache import CacheCompilacion, TAMANO_MAXIMO_POR_DEFECTO
+from src.profiler import PerfilEjecucion
+from src.output import info, silenciar, silenciado, crear_salida, SalidaEstandar
+from src.stats import (EstadisticasCompilacion, medir, contar_nodos,
+                       contar_instrucciones, escribir_jsonl)
 import sys
 import os
 
@@ -26,66 +47,199 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 # ================== PIPELINE ==================
 
 
-def compilar(ruta_archivo_fuente, ruta_archivo_salida):
+def compilar(ruta_archivo_fuente, ruta_archivo_salida, nivel_optimizacion=0, cache=None,
+             estadisticas=None, una_pasada=False):
 
     # 0. Instanciar componentes
     lexico = AnalizadorLexico()
     semantico = AnalizadorSemanticoAST()  # El STUB
     generador_tac = GeneradorDeCodigo()  # El STUB
 
-    print(f"--- Iniciando compilacion de: {ruta_archivo_fuente} ---")
+    info(f"--- Iniciando compilacion de: {ruta_archivo_fuente} ---")
 
     # 1. Leer el código fuente COMPLETO
     try:
-        with open(ruta_archivo_fuente, 'r', encoding='utf-8') as file:
-            codigo_completo = file.read()
+        with medir(estadisticas, 'lectura'), open(ruta_archivo_fuente, 'rb') as file:
+            fuente_bytes = file.read()
     except FileNotFoundError:
         print(f"Error: No se encontro el archivo '{ruta_archivo_fuente}'")
         return False
 
+    # --- CACHÉ: un fuente ya compilado con las mismas opciones no se recompila ---
+    if cache is not None:
+        clave = cache.clave(fuente_bytes, nivel_optimizacion)
+        codigo_tac = cache.obtener(clave)
+        if codigo_tac is not None:
+            info(f"\n--- CACHÉ: acierto ({clave[:12]}) ---")
+            with medir(estadisticas, 'escritura'):
+                if not guardar_salida(codigo_tac, ruta_archivo_salida):
+                    return False
+            if estadisticas is not None:
+                estadisticas.contar('cache', 'acierto')
+                estadisticas.contar('instrucciones', contar_instrucciones(codigo_tac))
+            info("\n--- Compilacion Finalizada Exitosamente ---")
+            return True
+        info(f"\n--- CACHÉ: fallo ({clave[:12]}) ---")
+
     # --- ETAPA 1: LÉXICO ---
-    print("\n--- ETAPA 1: LEXICO ---")
-    tokens = lexico.tokenizar(codigo_completo)
-    print(f"Tokens generados: {len(tokens)}")
+    info("\n--- ETAPA 1: LEXICO ---")
+    with medir(estadisticas, 'lexico'):
+        # Misma lectura de texto que open(..., 'r'): saltos de línea universales
+        with io.TextIOWrapper(io.BytesIO(fuente_bytes), encoding='utf-8') as texto:
+            codigo_completo = texto.read()
+        tokens = lexico.tokenizar(codigo_completo)
+    info(f"Tokens generados: {len(tokens)}")
 
     # --- ETAPA 2: SINTÁCTICO (Parser) ---
-    print("\n--- ETAPA 2: SINTACTICO (Parser) ---")
+    info("\n--- ETAPA 2: SINTACTICO (Parser) ---")
     try:
-        parser = AnalizadorSintactico(tokens)
-        ast = parser.parse()
-        print("Arbol de Sintaxis Abstracto (AST) generado exitosamente.")
-    except SystemExit:
+        with medir(estadisticas, 'sintactico'):
+            parser = AnalizadorSintactico(tokens)
+            ast = parser.parse()
+        info("Arbol de Sintaxis Abstracto (AST) generado exitosamente.")
+    except ErrorSintactico as e:
+        print(e)
         print("Compilación detenida por error sintactico.")
         return False
     except Exception as e:
         print(f"Error Sintáctico Fatal Inesperado: {e}")
         return False
 
-    # --- ETAPA 3: SEMÁNTICO ---
-    print("\n--- ETAPA 3: SEMÁNTICO ---")
-    semantico.analizar(ast)  # Llama al STUB
-    print("Analisis semántico simulado completado.")
+    if una_pasada:
+        # --- ETAPAS 3 y 4 en un solo recorrido del AST: mismo TAC y mismos errores ---
+        info("\n--- ETAPA 3+4: SEMÁNTICO Y GENERACIÓN DE CODIGO (TAC) EN UNA PASADA ---")
+        try:
+            una = AnalizadorGeneradorTAC()
+            with medir(estadisticas, 'semantico_tac'):
+                codigo_tac = "\n".join(una.generate(ast))
+            slots = una.generador.slots
+        except ErrorSemantico as e:
+            print(e)
+            return False
+        info("Codigo TAC generado exitosamente.")
+    else:
+        # --- ETAPA 3: SEMÁNTICO ---
+        info("\n--- ETAPA 3: SEMÁNTICO ---")
+        try:
+            with medir(estadisticas, 'semantico'):
+                semantico.analizar(ast)  # Llama al STUB
+        except ErrorSemantico as e:
+            print(e)
+            return False
+        info("Analisis semántico simulado completado.")
+
+        # --- ETAPA 4: GENERACIÓN DE CÓDIGO (TAC) ---
+        info("\n--- ETAPA 4: GENERACIÓN DE CODIGO (TAC) ---")
+        with medir(estadisticas, 'tac'):
+            codigo_tac = generador_tac.generar(ast)  # Llama al STUB
+        slots = generador_tac.generator.slots  # Slots del semántico, para el .tacb
+        info("Codigo TAC simulado generado exitosamente.")
+    if estadisticas is not None:
+        estadisticas.contar('tokens', len(tokens))
+        estadisticas.contar('nodos_ast', contar_nodos(ast))
+        estadisticas.contar('instrucciones', contar_instrucciones(codigo_tac))
+
+    # --- ETAPA 4.1: OPTIMIZACIÓN ---
+    if nivel_optimizacion > 0:
+        info(f"\n--- ETAPA 4.1: OPTIMIZACIÓN (-O{nivel_optimizacion}) ---")
+        optimizador = OptimizadorTAC(nivel_optimizacion)
+        with medir(estadisticas, 'optimizacion'):
+            codigo_tac = "\n".join(optimizador.optimizar(codigo_tac.split("\n")))
+        if estadisticas is not None:
+            estadisticas.contar('instrucciones_optimizadas', contar_instrucciones(codigo_tac))
+        if optimizador.eliminadas >= 0:
+            cambio = f"{optimizador.eliminadas} eliminadas"
+        else:
+            cambio = f"+{-optimizador.eliminadas} añadidas"  # El desenrollado puede crecer el código
+        info(f"Instrucciones: {optimizador.instrucciones_antes} -> "
+              f"{optimizador.instrucciones_despues} ({cambio})")
+        if optimizador.temporales_despues != optimizador.temporales_antes:
+            info(f"Temporales: {optimizador.temporales_antes} -> "
+                  f"{optimizador.temporales_despues}")
+
+    with medir(estadisticas, 'escritura'):
+        if not guardar_salida(codigo_tac, ruta_archivo_salida, slots):
+            return False
+    if cache is not None:
+        cache.guardar(clave, codigo_tac)
+
+    info("\n--- Compilacion Finalizada Exitosamente ---")
+    return True
+
+
+def guardar_salida(codigo_tac, ruta_archivo_salida, slots=None):
+    # El formato de salida se elige por la extensión
+    if es_tacb(ruta_archivo_salida):
+        try:
+            guardar_tacb(decodificar(codigo_tac, slots), ruta_archivo_salida)
+        except ValueError as e:
+            # P. ej. una constante plegada que no cabe en int64
+            print(f"Error: {e}")
+            return False
+    else:
+        with open(ruta_archivo_salida, "w", encoding='utf-8') as f:
+            f.write(codigo_tac)
+    info(f"Codigo TAC guardado en: {ruta_archivo_salida}")
+    return True
+
 
-    # --- ETAPA 4: GENERACIÓN DE CÓDIGO (TAC) ---
-    print("\n--- ETAPA 4: GENERACIÓN DE CODIGO (TAC) ---")
-    codigo_tac = generador_tac.generar(ast)  # Llama al STUB
-    print("Codigo TAC simulado generado exitosamente.")
+def compilar_streaming(ruta_archivo_fuente, ruta_archivo_salida):
+    """Compila sentencia a sentencia: tokens, AST y TAC nunca están completos en memoria"""
+    if es_tacb(ruta_archivo_salida):
+        print("Error: --stream solo puede escribir TAC en texto (.tac)")
+        return False
+
+    lexico = AnalizadorLexico()
+    semantico = AnalizadorSemanticoAST()
+    generador = TACGenerator()
 
-    with open(ruta_archivo_salida, "w", encoding='utf-8') as f:
-        f.write(codigo_tac)
-    print(f"Codigo TAC guardado en: {ruta_archivo_salida}")
+    info(f"--- Iniciando compilacion (streaming) de: {ruta_archivo_fuente} ---")
+    ruta_temporal = ruta_archivo_salida + ".tmp"
+    instrucciones = 0
+    try:
+        with open(ruta_archivo_fuente, 'r', encoding='utf-8') as fuente, \
+                open(ruta_temporal, 'w', encoding='utf-8') as salida:
+            parser = AnalizadorSintactico(lexico.iter_tokens(fuente))
+            separador = ""
+            # Cada sentencia pasa por semántico y generación antes de parsear la siguiente
+            for sentencia in parser.iter_statements():
+                semantico.visit(sentencia)
+                generador.instructions = []
+                generador.visit(sentencia)
+                for instruccion in generador.instructions:
+                    salida.write(separador + instruccion)
+                    separador = "\n"
+                instrucciones += len(generador.instructions)
+    except FileNotFoundError:
+        print(f"Error: No se encontro el archivo '{ruta_archivo_fuente}'")
+        return False
+    except ErrorCompilacion as e:
+        # Error sintáctico o semántico: no se deja un TAC a medias
+        os.remove(ruta_temporal)
+        print(e)
+        return False
 
-    print("\n--- Compilacion Finalizada Exitosamente ---")
+    os.replace(ruta_temporal, ruta_archivo_salida)
+    info(f"Codigo TAC guardado en: {ruta_archivo_salida} ({instrucciones} líneas)")
+    info("\n--- Compilacion Finalizada Exitosamente ---")
     return True
 
 
+def es_tacb(ruta):
+    return ruta.lower().endswith('.tacb')
+
+
 def ejecutar(ruta_archivo_tac, maquina_tac_real):
-    print(f"\n--- ETAPA 5: EJECUCIÓN (Runtime) ---")
+    info("\n--- ETAPA 5: EJECUCIÓN (Runtime) ---")
+
+    if es_tacb(ruta_archivo_tac):
+        ejecutar_tacb(ruta_archivo_tac, maquina_tac_real)
+        return
 
     try:
         with open(ruta_archivo_tac, 'r') as f:
             contenido_tac = f.read()
-            print(
+            info(
                 f"Contenido de {ruta_archivo_tac} a ejecutar:\n{contenido_tac}")
 
             # CORRECCIÓN: Pasamos el string real, no la lista falsa
@@ -94,6 +248,259 @@ def ejecutar(ruta_archivo_tac, maquina_tac_real):
     except FileNotFoundError:
         print(f"Error: No se encontró el archivo TAC '{ruta_archivo_tac}'")
 
+
+def ejecutar_tacb(ruta_archivo_tacb, maquina_tac_real):
+    # El binario ya está decodificado: se mapea y se ejecuta sin parsear texto
+    try:
+        programa = cargar_tacb(ruta_archivo_tacb)
+    except FileNotFoundError:
+        print(f"Error: No se encontró el archivo TAC '{ruta_archivo_tacb}'")
+        return
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+
+    if not silenciado():  # Desensamblar a texto solo si se va a mostrar
+        contenido_tac = "\n".join(desensamblar(programa))
+        info(f"Contenido de {ruta_archivo_tacb} a ejecutar:\n{contenido_tac}")
+    maquina_tac_real.ejecutar_programa(programa)
+
+
+def ejecutar_lotes(ruta_archivo_tac, ruta_entradas, superinstrucciones=True, destino='-'):
+    """Ejecuta el TAC una vez por fila del CSV de entradas, todas a la vez en la VM por lotes"""
+    info("\n--- ETAPA 5: EJECUCIÓN POR LOTES (Runtime) ---")
+    try:
+        if es_tacb(ruta_archivo_tac):
+            programa = cargar_tacb(ruta_archivo_tac)
+        else:
+            with open(ruta_archivo_tac, 'r') as f:
+                programa = decodificar(f.read())
+        entradas = leer_entradas_csv(ruta_entradas)
+        maquina = MaquinaLotes(superinstrucciones)
+        salidas = maquina.ejecutar_programa(programa, entradas)
+    except FileNotFoundError as e:
+        print(f"Error: No se encontró el archivo '{e.filename}'")
+        sys.exit(1)
+    except (ValueError, ImportError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    # Cada instancia con su número en el prefijo: 'OUTPUT[3] >> valor'
+    with crear_salida(destino) as salida:
+        for carril, valores in enumerate(salidas):
+            salida.prefijo = f"OUTPUT[{carril}] >> "
+            for valor in valores:
+                salida.escribir(valor)
+            salida.vaciar()
+            if carril in maquina.errores:
+                print(f"Error en la instancia {carril}: {maquina.errores[carril]}")
+    info(f"{len(salidas)} instancias, {maquina.pasos} instrucciones ejecutadas por la VM por lotes")
+
+
+def crear_maquina(backend, superinstrucciones=True, contadores=False, perfilar=False,
+                  salida=None, limite_instrucciones=None, limite_segundos=None):
+    """Instancia la máquina de ejecución según el backend elegido"""
+    if backend == 'py':
+        return MaquinaPython(salida=salida)
+    if limite_instrucciones is not None or limite_segundos is not None:
+        # Por porciones, comprobando los límites entre una y otra
+        return MaquinaCooperativa(superinstrucciones, salida,
+                                  limite_instrucciones=limite_instrucciones,
+                                  limite_segundos=limite_segundos)
+    return MaquinaTAC(superinstrucciones=superinstrucciones, contadores=contadores,
+                      perfilar=perfilar, salida=salida)
+
+
+def imprimir_superinstrucciones(maquina):
+    """Tabla de superinstrucciones: cuántas se fusionaron y cuántas veces se ejecutaron"""
+    print("\n--- Superinstrucciones ---")
+    if isinstance(maquina, MaquinaPython):
+        print("Solo disponibles con --backend=vm")
+        return
+    print(f"{'tipo':<20} {'fusionadas':>10} {'ejecuciones':>12}")
+    for tipo in SUPERINSTRUCCIONES:
+        fusionadas, ejecuciones = maquina.estadisticas_superinstrucciones.get(tipo, (0, 0))
+        print(f"{tipo:<20} {fusionadas:>10} {ejecuciones:>12}")
+
+
+def imprimir_perfil(maquina, ruta_json=None):
+    """Tabla del perfil de ejecución y, si se pide, el mismo perfil en JSON
+    ('-' lo escribe en la salida estándar)"""
+    print("\n--- Perfil de ejecución ---")
+    if isinstance(maquina, MaquinaPython) or maquina.ejecuciones is None:
+        print("Solo disponible con --backend=vm")
+        return
+    perfil = PerfilEjecucion.de_maquina(maquina)
+    print(perfil.tabla())
+    if ruta_json == '-':
+        print(json.dumps(perfil.como_dict(), indent=2, ensure_ascii=False))
+    elif ruta_json:
+        with open(ruta_json, 'w', encoding='utf-8') as f:
+            json.dump(perfil.como_dict(), f, indent=2, ensure_ascii=False)
+        print(f"Perfil guardado en {ruta_json}")
+
+
+# ================== COMPILACIÓN POR LOTES ==================
+
+
+def expandir_fuentes(patrones):
+    """Archivos fuente de la línea de comandos; los patrones glob se expanden aquí
+    para que funcionen también en shells que no los expanden (cmd.exe)"""
+    rutas = []
+    for patron in patrones:
+        if glob.has_magic(patron):
+            rutas.extend(sorted(glob.glob(patron, recursive=True)))
+        else:
+            rutas.append(patron)
+    return list(dict.fromkeys(rutas))  # Sin duplicados, en orden
+
+
+def rutas_salida_lote(rutas, directorio_salida=None):
+    """'.tac' junto a cada fuente o, con directorio_salida, bajo él y con la misma
+    estructura relativa (dos 'main.src' de carpetas distintas no se pisan)"""
+    if directorio_salida is None:
+        return [os.path.splitext(ruta)[0] + '.tac' for ruta in rutas]
+    absolutas = [os.path.abspath(ruta) for ruta in rutas]
+    base = os.path.commonpath([os.path.dirname(ruta) for ruta in absolutas])
+    return [os.path.join(directorio_salida, os.path.splitext(os.path.relpath(ruta, base))[0] + '.tac')
+            for ruta in absolutas]
+
+
+def _compilar_en_lote(trabajo):
+    # Se ejecuta en un proceso del pool: la salida por etapas se captura para que
+    # los archivos no se mezclen y solo se devuelve el último error
+    ruta_fuente, ruta_salida, nivel_optimizacion, stream, cache, con_estadisticas, una_pasada = trabajo
+    inicio = time.perf_counter()
+    capturado = io.StringIO()
+    estadisticas = None
+    if con_estadisticas:
+        estadisticas = EstadisticasCompilacion(ruta_fuente, nivel_optimizacion)
+    with contextlib.redirect_stdout(capturado):
+        try:
+            directorio = os.path.dirname(ruta_salida)
+            if directorio:
+                os.makedirs(directorio, exist_ok=True)
+            if stream:
+                exito = compilar_streaming(ruta_fuente, ruta_salida)
+            elif estadisticas is not None:
+                with estadisticas:
+                    exito = compilar(ruta_fuente, ruta_salida, nivel_optimizacion, cache,
+                                     estadisticas, una_pasada)
+            else:
+                exito = compilar(ruta_fuente, ruta_salida, nivel_optimizacion, cache,
+                                 una_pasada=una_pasada)
+        except SystemExit:
+            exito = False
+        except Exception as e:
+            print(f"Error inesperado: {type(e).__name__}: {e}")
+            exito = False
+    error = None
+    if not exito:
+        errores = [linea for linea in capturado.getvalue().splitlines()
+                   if linea.startswith('Error') or linea.startswith('Compilación detenida')]
+        error = errores[0] if errores else "la compilación falló"
+    registro = estadisticas.como_dict() if estadisticas is not None and exito else None
+    return ruta_fuente, ruta_salida, exito, time.perf_counter() - inicio, error, registro
+
+
+def compilar_lote(rutas, directorio_salida, procesos, nivel_optimizacion=0,
+                  stream=False, cache=None, con_estadisticas=False, ruta_estadisticas=None,
+                  una_pasada=False):
+    """Compila varios fuentes repartidos en un pool de procesos; devuelve True si
+    todos compilaron. 'con_estadisticas' muestra la tabla de estadísticas y
+    'ruta_estadisticas' las escribe en JSONL; con cualquiera de los dos se miden"""
+    salidas = rutas_salida_lote(rutas, directorio_salida)
+    medir_etapas = con_estadisticas or ruta_estadisticas is not None
+    trabajos = [(ruta, salida, nivel_optimizacion, stream, cache, medir_etapas, una_pasada)
+                for ruta, salida in zip(rutas, salidas)]
+    info(f"--- Compilación por lotes: {len(trabajos)} archivos, {procesos} procesos ---")
+
+    inicio = time.perf_counter()
+    if procesos > 1 and len(trabajos) > 1:
+        # Lotes de varios archivos por envío: con fuentes pequeños el coste de
+        # comunicación con el pool dominaría
+        lote = max(1, len(trabajos) // (procesos * 8))
+        with ProcessPoolExecutor(procesos) as ejecutor:
+            resultados = list(ejecutor.map(_compilar_en_lote, trabajos, chunksize=lote))
+    else:
+        resultados = [_compilar_en_lote(trabajo) for trabajo in trabajos]
+    total = time.perf_counter() - inicio
+
+    fallidos = []
+    for ruta_fuente, ruta_salida, exito, segundos, error, _ in resultados:
+        estado = "OK" if exito else "FALLO"
+        info(f"{estado:<6} {ruta_fuente:<50} {segundos * 1000:8.1f} ms  -> {ruta_salida}")
+        if not exito:
+            fallidos.append((ruta_fuente, error))
+
+    suma = sum(resultado[3] for resultado in resultados)
+    info("\n--- Resumen del lote ---")
+    info(f"Compilados: {len(resultados) - len(fallidos)}/{len(resultados)}")
+    info(f"Tiempo total: {total:.2f} s (suma de los tiempos por archivo: {suma:.2f} s)")
+    if fallidos:
+        print(f"Fallos ({len(fallidos)}):")
+        for ruta_fuente, error in fallidos:
+            print(f"  {ruta_fuente}: {error}")
+
+    registros = [resultado[5] for resultado in resultados if resultado[5] is not None]
+    if con_estadisticas:
+        imprimir_estadisticas_lote(registros)
+    if ruta_estadisticas:
+        escribir_jsonl(registros, ruta_estadisticas)
+    return not fallidos
+
+
+def ejecutar_muchos_cli(rutas, procesos, backend='vm', superinstrucciones=True,
+                        con_estadisticas=False):
+    """Ejecuta los TAC en un pool e imprime la salida de cada uno en orden; devuelve
+    True si todos terminaron sin error"""
+    info(f"--- Ejecución de {len(rutas)} programas, {procesos} procesos ---")
+    inicio = time.perf_counter()
+    resultados = ejecutar_muchos(rutas, procesos, backend, superinstrucciones)
+    total = time.perf_counter() - inicio
+
+    fallidos = [resultado for resultado in resultados if not resultado.exito]
+    with SalidaEstandar() as salida:
+        for resultado in resultados:
+            salida.vaciar()  # Lo del programa anterior antes de la cabecera
+            print(f"=== {resultado.nombre} ===")
+            for valor in resultado.salida:
+                salida.escribir(valor)
+            salida.vaciar()
+            if not resultado.exito:
+                print(resultado.error)
+
+    suma = sum(r.segundos_decodificacion + r.segundos_ejecucion for r in resultados)
+    info("\n--- Resumen de la ejecución ---")
+    info(f"Ejecutados sin error: {len(resultados) - len(fallidos)}/{len(resultados)}")
+    info(f"Tiempo total: {total:.2f} s (suma de los tiempos por programa: {suma:.2f} s)")
+    if con_estadisticas:
+        imprimir_estadisticas_ejecucion(resultados)
+    return not fallidos
+
+
+def imprimir_estadisticas_ejecucion(resultados):
+    """Una fila por programa ejecutado con run-many"""
+    print("\n--- Estadísticas por programa (c: ya decodificado en ese proceso) ---")
+    print(f"{'programa':<40} {'decodif (ms)':>12} {'ejec (ms)':>10} {'instr':>7} "
+          f"{'prints':>8} {'proceso':>8}")
+    for r in resultados:
+        decodificacion = f"{r.segundos_decodificacion * 1000:.2f}" + (" c" if r.en_cache else "")
+        print(f"{r.nombre:<40} {decodificacion:>12} {r.segundos_ejecucion * 1000:>10.2f} "
+              f"{r.instrucciones:>7} {len(r.salida):>8} {r.proceso:>8}")
+
+
+def imprimir_estadisticas_lote(registros):
+    """Una fila por archivo compilado: tiempos, pico de memoria y conteos"""
+    print("\n--- Estadísticas por archivo ---")
+    print(f"{'archivo':<40} {'real (ms)':>10} {'CPU (ms)':>10} {'pico (KB)':>10} "
+          f"{'tokens':>8} {'instr':>8}")
+    for registro in registros:
+        conteos = registro['conteos']
+        print(f"{registro['fuente']:<40} {registro['segundos_total'] * 1000:>10.2f} "
+              f"{registro['cpu_total'] * 1000:>10.2f} {registro['pico_bytes'] / 1024:>10.1f} "
+              f"{conteos.get('tokens', '-'):>8} {conteos.get('instrucciones', '-'):>8}")
+
 # ================== PUNTO DE ENTRADA ==================
 
 
@@ -107,8 +514,21 @@ Punto de entrada principal del compilador
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 
-def parse_arguments():
-    """Configura y parsea los argumentos de línea de comandos"""
+def _positivo(tipo):
+    """Tipo de argparse: un número de 'tipo' mayor que cero"""
+    def convertir(texto):
+        try:
+            valor = tipo(texto)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"'{texto}' no es un número válido") from None
+        if not valor > 0:  # También rechaza nan
+            raise argparse.ArgumentTypeError(f"debe ser mayor que 0 (se recibió {texto})")
+        return valor
+    return convertir
+
+
+def parse_arguments(argv=None):
+    """Configura y parsea los argumentos de línea de comandos (sys.argv si argv es None)"""
     parser = argparse.ArgumentParser(
         description='Mini-Language Compiler - De código fuente a TAC ejecutable',
         epilog='Ejemplos:\n  python compilador.py compile ejemplo.txt -o output.tac\n  python compilador.py run output.tac\n  python compilador.py compile ejemplo.txt --run',
@@ -122,17 +542,99 @@ def parse_arguments():
     compile_parser = subparsers.add_parser(
         'compile', help='Compilar archivo fuente a TAC')
     compile_parser.add_argument(
-        'archivo_fuente', help='Archivo .src o .txt a compilar')
-    compile_parser.add_argument('-o', '--output', default='output.tac',
-                                help='Archivo de salida TAC (default: output.tac)')
+        'archivo_fuente', nargs='+',
+        help='Archivo .src o .txt a compilar; con varios archivos o patrones glob se compila por lotes')
+    compile_parser.add_argument('-o', '--output', default=None,
+                                help='Archivo de salida TAC; con extensión .tacb se escribe en binario (default: output.tac)')
+    compile_parser.add_argument('-j', '--jobs', type=int, default=None,
+                                help='Procesos para compilar por lotes (default: número de CPUs)')
+    compile_parser.add_argument('--out-dir', default=None,
+                                help='Por lotes: directorio donde escribir los .tac (default: junto a cada fuente)')
     compile_parser.add_argument('--run', action='store_true',
                                 help='Ejecutar automáticamente después de compilar')
+    compile_parser.add_argument('-O', dest='optimizacion', type=int, choices=[0, 1, 2], default=0,
+                                help='Nivel de optimización del TAC: -O0, -O1 o -O2 (default: -O0)')
+    compile_parser.add_argument('--stream', action='store_true',
+                                help='Compilar por sentencias leyendo el fuente por bloques (memoria acotada)')
+    compile_parser.add_argument('--backend', choices=['vm', 'py'], default='vm',
+                                help='Backend de ejecución para --run (default: vm)')
+    compile_parser.add_argument('--single-pass', action='store_true',
+                                help='Análisis semántico y generación de TAC en un solo recorrido del AST (mismo TAC y mismos errores)')
+    compile_parser.add_argument('--cache', action='store_true',
+                                help='Reutilizar el TAC de compilaciones anteriores del mismo fuente y opciones')
+    compile_parser.add_argument('--cache-dir', default=None,
+                                help='Directorio de la caché (implica --cache; default: $MINILANG_CACHE_DIR o $XDG_CACHE_HOME/minilang, y si no ~/.cache/minilang)')
+    compile_parser.add_argument('--cache-max-mb', type=int, default=TAMANO_MAXIMO_POR_DEFECTO // (1024 * 1024),
+                                help='Tamaño máximo de la caché en MB; se desalojan las entradas menos usadas (default: 256)')
+    compile_parser.add_argument('--sin-superinstrucciones', action='store_true',
+                                help='No fusionar secuencias en superinstrucciones al cargar en la VM')
+    compile_parser.add_argument('--contadores', action='store_true',
+                                help='Con --run, mostrar cuántas veces se ejecutó cada superinstrucción')
+    compile_parser.add_argument('--salida-print', metavar='DESTINO', default='-',
+                                help="Con --run, destino de los print del programa: '-' (stdout), 'nula' o un archivo")
+    compile_parser.add_argument('-q', '--quiet', action='store_true',
+                                help='Sin mensajes de progreso: solo errores, salida del programa y lo pedido')
+    compile_parser.add_argument('--stats', action='store_true',
+                                help='Tiempo real, CPU y pico de memoria (tracemalloc) por etapa, con conteos de tokens, nodos e instrucciones')
+    compile_parser.add_argument('--stats-json', metavar='ARCHIVO', default=None,
+                                help="Añadir las estadísticas como una línea JSON por compilación ('-' para la salida estándar)")
 
     # Comando RUN
     run_parser = subparsers.add_parser('run', help='Ejecutar archivo TAC')
-    run_parser.add_argument('archivo_tac', help='Archivo .tac a ejecutar')
-
-    return parser.parse_args()
+    run_parser.add_argument('archivo_tac', help='Archivo .tac o .tacb a ejecutar')
+    run_parser.add_argument('--backend', choices=['vm', 'py'], default='vm',
+                            help='vm: intérprete TAC; py: TAC compilado a función Python (default: vm)')
+    run_parser.add_argument('--sin-superinstrucciones', action='store_true',
+                            help='No fusionar secuencias en superinstrucciones al cargar en la VM')
+    run_parser.add_argument('--contadores', action='store_true',
+                            help='Mostrar cuántas veces se ejecutó cada superinstrucción')
+    run_parser.add_argument('--salida-print', metavar='DESTINO', default='-',
+                            help="Destino de los print del programa: '-' (stdout), 'nula' o un archivo")
+    run_parser.add_argument('-q', '--quiet', action='store_true',
+                            help='Sin mensajes de progreso: solo errores, salida del programa y lo pedido')
+    run_parser.add_argument('--profile', action='store_true',
+                            help='Perfil de la VM: instrucciones por operación, por índice TAC y vueltas por etiqueta')
+    run_parser.add_argument('--profile-json', metavar='ARCHIVO', default=None,
+                            help="Escribir también el perfil en JSON ('-' para la salida estándar; implica --profile)")
+    run_parser.add_argument('--limite-instrucciones', type=_positivo(int), default=None, metavar='N',
+                            help='Cortar el programa tras N instrucciones de la VM (bucles infinitos)')
+    run_parser.add_argument('--limite-segundos', type=_positivo(float), default=None, metavar='S',
+                            help='Cortar el programa tras S segundos de ejecución')
+    run_parser.add_argument('--entradas', metavar='CSV', default=None,
+                            help='Ejecutar una instancia por fila del CSV (cabecera: variables a inicializar) con la VM por lotes de NumPy')
+
+    # Comando RUN-MANY
+    run_many_parser = subparsers.add_parser(
+        'run-many', help='Ejecutar muchos archivos TAC repartidos en un pool de procesos')
+    run_many_parser.add_argument('archivos_tac', nargs='+',
+                                 help='Archivos .tac o .tacb (se admiten patrones glob)')
+    run_many_parser.add_argument('-j', '--jobs', type=int, default=None,
+                                 help='Procesos del pool (default: un proceso por CPU)')
+    run_many_parser.add_argument('--backend', choices=['vm', 'py'], default='vm',
+                                 help='vm: intérprete TAC; py: TAC compilado a función Python (default: vm)')
+    run_many_parser.add_argument('--sin-superinstrucciones', action='store_true',
+                                 help='No fusionar secuencias en superinstrucciones al cargar en la VM')
+    run_many_parser.add_argument('--stats', action='store_true',
+                                 help='Tabla por programa: decodificación, ejecución, valores impresos y proceso')
+    run_many_parser.add_argument('-q', '--quiet', action='store_true',
+                                 help='Sin mensajes de progreso: solo errores, salida de los programas y lo pedido')
+
+    # Comando SERVE
+    serve_parser = subparsers.add_parser(
+        'serve', help='Servidor de compilación en un socket Unix (cliente: cliente.py)')
+    serve_parser.add_argument('--socket', default=None,
+                              help='Ruta del socket (default: $MINILANG_SOCKET o /tmp/minilang-<uid>.sock)')
+    serve_parser.add_argument('--limite-segundos', type=int, default=30,
+                              help='Tiempo máximo por petición; el programa se corta al superarlo (default: 30)')
+
+    # Comando CACHE
+    cache_parser = subparsers.add_parser('cache', help='Consultar o vaciar la caché de compilación')
+    cache_parser.add_argument('accion', choices=['stats', 'clear'],
+                              help='stats: entradas, tamaño y aciertos; clear: borrar todo')
+    cache_parser.add_argument('--cache-dir', default=None,
+                              help='Directorio de la caché (default: $MINILANG_CACHE_DIR o $XDG_CACHE_HOME/minilang, y si no ~/.cache/minilang)')
+
+    return parser.parse_args(argv)
 
 
 def modo_interactivo():
@@ -183,29 +685,161 @@ def modo_interactivo():
 
 def ejecutar_comando_cli(args):
     """Ejecuta los comandos de línea de comandos"""
+    silenciar(getattr(args, 'quiet', False))
     if args.comando == 'compile':
-        print(f"Compilando {args.archivo_fuente} -> {args.output}")
-
-        if not os.path.exists(args.archivo_fuente):
-            print(f"Error: Archivo {args.archivo_fuente} no encontrado")
+        fuentes = expandir_fuentes(args.archivo_fuente)
+        por_lotes = len(fuentes) > 1 or args.jobs is not None or args.out_dir is not None
+
+        for fuente in fuentes:
+            if not os.path.exists(fuente):
+                print(f"Error: Archivo {fuente} no encontrado")
+                sys.exit(1)
+        if not fuentes:
+            print(f"Error: Ningún archivo coincide con {' '.join(args.archivo_fuente)}")
             sys.exit(1)
 
-        exito = compilar(args.archivo_fuente, args.output)
+        cache = None
+        if args.cache or args.cache_dir:
+            cache = CacheCompilacion(args.cache_dir, args.cache_max_mb * 1024 * 1024)
+
+        con_estadisticas = args.stats or args.stats_json is not None
+        if args.stream:
+            if args.optimizacion:
+                print("Error: --stream no admite optimización (-O1/-O2)")
+                sys.exit(1)
+            if cache is not None:
+                print("Error: --stream no admite --cache")
+                sys.exit(1)
+            if con_estadisticas:
+                print("Error: --stream no admite --stats (las etapas se intercalan)")
+                sys.exit(1)
+            if args.single_pass:
+                print("Error: --stream no admite --single-pass (ya intercala semántico y TAC por sentencia)")
+                sys.exit(1)
+
+        if por_lotes:
+            if args.output is not None or args.run:
+                print("Error: con varios archivos usa --out-dir en lugar de -o; --run no está disponible")
+                sys.exit(1)
+            procesos = args.jobs or os.cpu_count() or 1
+            if not compilar_lote(fuentes, args.out_dir, procesos, args.optimizacion,
+                                 args.stream, cache, args.stats, args.stats_json,
+                                 args.single_pass):
+                sys.exit(1)
+            return
+
+        args.archivo_fuente = fuentes[0]
+        args.output = args.output or 'output.tac'
+        info(f"Compilando {args.archivo_fuente} -> {args.output}")
+        if args.stream:
+            exito = compilar_streaming(args.archivo_fuente, args.output)
+        elif con_estadisticas:
+            estadisticas = EstadisticasCompilacion(args.archivo_fuente, args.optimizacion)
+            with estadisticas:
+                exito = compilar(args.archivo_fuente, args.output, args.optimizacion, cache,
+                                 estadisticas, args.single_pass)
+            if exito and args.stats:
+                print("\n--- Estadísticas de compilación ---")
+                print(estadisticas.tabla())
+            if exito and args.stats_json:
+                escribir_jsonl([estadisticas.como_dict()], args.stats_json)
+        else:
+            exito = compilar(args.archivo_fuente, args.output, args.optimizacion, cache,
+                             una_pasada=args.single_pass)
+        if not exito:
+            sys.exit(1)
 
-        if exito and args.run:
-            print("Ejecutando código TAC...")
-            vm = MaquinaTAC()
-            ejecutar(args.output, vm)
+        if args.run:
+            info("Ejecutando código TAC...")
+            with crear_salida(args.salida_print) as salida:
+                vm = crear_maquina(args.backend, not args.sin_superinstrucciones,
+                                   args.contadores, salida=salida)
+                ejecutar(args.output, vm)
+            if args.contadores:
+                imprimir_superinstrucciones(vm)
 
     elif args.comando == 'run':
-        print(f"Ejecutando {args.archivo_tac}")
+        info(f"Ejecutando {args.archivo_tac}")
 
         if not os.path.exists(args.archivo_tac):
             print(f"Error: Archivo TAC {args.archivo_tac} no encontrado")
             sys.exit(1)
 
-        vm = MaquinaTAC()
-        ejecutar(args.archivo_tac, vm)
+        perfilar = args.profile or args.profile_json is not None
+        con_limites = args.limite_instrucciones is not None or args.limite_segundos is not None
+        if con_limites and (args.backend != 'vm' or args.contadores or perfilar or args.entradas):
+            print("Error: los límites de ejecución solo están disponibles con --backend vm, "
+                  "sin --contadores, --profile ni --entradas")
+            sys.exit(1)
+        if args.entradas:
+            if args.backend != 'vm' or args.contadores or perfilar:
+                print("Error: --entradas no admite --backend py, --contadores ni --profile")
+                sys.exit(1)
+            ejecutar_lotes(args.archivo_tac, args.entradas, not args.sin_superinstrucciones,
+                           args.salida_print)
+            return
+
+        with crear_salida(args.salida_print) as salida:
+            vm = crear_maquina(args.backend, not args.sin_superinstrucciones,
+                               args.contadores, perfilar, salida,
+                               args.limite_instrucciones, args.limite_segundos)
+            try:
+                ejecutar(args.archivo_tac, vm)
+            except PresupuestoAgotado as e:
+                salida.vaciar()
+                print(f"Error: ejecución detenida: {e}")
+                sys.exit(1)
+        if args.contadores:
+            imprimir_superinstrucciones(vm)
+        if perfilar:
+            imprimir_perfil(vm, args.profile_json)
+
+    elif args.comando == 'run-many':
+        rutas = expandir_fuentes(args.archivos_tac)
+        if not rutas:
+            print(f"Error: Ningún archivo coincide con {' '.join(args.archivos_tac)}")
+            sys.exit(1)
+        procesos = args.jobs or os.cpu_count() or 1
+        if not ejecutar_muchos_cli(rutas, procesos, args.backend, not args.sin_superinstrucciones,
+                                   args.stats):
+            sys.exit(1)
+
+    elif args.comando == 'serve':
+        if not hasattr(socket, 'AF_UNIX'):
+            print("Error: 'serve' necesita sockets Unix, no disponibles en esta plataforma")
+            sys.exit(1)
+        from src.server import ServidorCompilacion, RUTA_SOCKET_POR_DEFECTO
+        ruta = args.socket or RUTA_SOCKET_POR_DEFECTO
+        # SIGTERM también cierra el servidor ordenadamente (y borra el socket)
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        try:
+            servidor = ServidorCompilacion(ruta, args.limite_segundos)
+        except OSError as e:
+            print(f"Error: no se puede iniciar el servidor: {e}")
+            sys.exit(1)
+        with servidor:
+            print(f"Servidor de compilación escuchando en {ruta} (Ctrl+C para terminar)")
+            try:
+                servidor.serve_forever()
+            except KeyboardInterrupt:
+                print("\nServidor detenido")
+
+    elif args.comando == 'cache':
+        cache = CacheCompilacion(args.cache_dir)
+        if args.accion == 'clear':
+            borradas = cache.limpiar()
+            print(f"Caché vaciada: {borradas} entradas borradas de {cache.directorio}")
+        else:
+            datos = cache.estadisticas()
+            consultas = datos['aciertos'] + datos['fallos']
+            tasa = 100 * datos['aciertos'] / consultas if consultas else 0.0
+            print(f"Directorio:  {datos['directorio']}")
+            print(f"Entradas:    {datos['entradas']}")
+            print(f"Tamaño:      {datos['tamano'] / 1024:.1f} KB "
+                  f"(máximo {datos['tamano_maximo'] / (1024 * 1024):.0f} MB)")
+            print(f"Aciertos:    {datos['aciertos']}")
+            print(f"Fallos:      {datos['fallos']}")
+            print(f"Tasa:        {tasa:.1f}%")
 
 
 if __name__ == "__main__":
@@ -216,7 +850,7 @@ if __name__ == "__main__":
         if args.comando:
             ejecutar_comando_cli(args)
         else:
-            print("Comando no reconocido. Usa 'compile' o 'run'")
+            print("Comando no reconocido. Usa 'compile', 'run', 'serve' o 'cache'")
             sys.exit(1)
     else:
         # Modo interactivo (compatibilidad hacia atrás)
@@ -1,109 +1,463 @@
 
 """
-Script simple para ejecutar tests del compilador
+Ejecuta los tests del compilador en paralelo y dentro del mismo intérprete.
+
+Cada programa tests/<categoría>/<nombre>.src pasa por el pipeline de src/
+(léxico, sintáctico, semántico, TAC y VM) sin lanzar subprocesos, y su
+salida se compara con el archivo golden <nombre>.expected del mismo
+directorio. La salida que se compara son las líneas 'OUTPUT >> ...' de la VM
+y los mensajes 'Error ...' del compilador.
+
+Uso:
+    python run_test.py                     # todos los tests, un proceso por CPU
+    python run_test.py tests/basic -j 4    # solo una carpeta, 4 procesos
+    python run_test.py -O2 --backend py    # misma salida esperada optimizando
+    python run_test.py --actualizar        # (re)escribe los .expected
+
+Con --modo los mismos goldens comprueban otros caminos del compilador:
+    lote-json     compilador.py compile en modo lote (-j 1 --out-dir) con solo
+                  --stats-json; además del golden, el JSONL debe tener el
+                  registro de cada fuente que compila
+    una-pasada    semántico y TAC en un solo recorrido (--single-pass); el TAC
+                  (o el error) debe ser idéntico al de las dos pasadas
+    incremental   reproduce un guion de ediciones sobre una SesionIncremental
+                  (escribir el programa línea a línea, borrar y reponer cada
+                  línea, cambiar y restaurar cada literal) y tras cada una
+                  compara TAC y error con una recompilación completa
+    lotes         VM por lotes (src/batch.py, necesita NumPy): cada test en dos
+                  carriles idénticos que deben imprimir lo mismo
+    pool          'compilador.py run-many' (src/pool.py) con el TAC del test
+    cooperativa   MaquinaCooperativa (src/async_vm.py) en porciones de 7
+                  instrucciones, con un límite que no se alcanza
+
+Un test con un archivo acompañante es propio de un modo y solo se ejecuta en
+él; su golden es la salida de ese modo:
+    <nombre>.csv  lotes: 'compilador.py run --entradas <nombre>.csv', una
+                  instancia por fila ('OUTPUT[i] >> ...' y 'Error en la
+                  instancia i: ...')
+    <nombre>.pool pool: lista de fuentes (rutas relativas al .pool, '#' para
+                  comentarios) que se compilan y se ejecutan juntos con
+                  'run-many -j 4'; la salida debe seguir el orden de la lista
+    <nombre>.limite
+                  cooperativa: 'compilador.py run --limite-instrucciones N'
+                  con el N del archivo; lo impreso antes de agotarlo se conserva
 """
 
+import argparse
+import contextlib
+import glob
+import io
+import json
 import os
-import subprocess
+import re
 import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.errors import ErrorCompilacion
+from src.lexer import AnalizadorLexico
+from src.parser import AnalizadorSintactico
+from src.semantic import AnalizadorSemanticoAST
+from src.tac_generator import TACGenerator
+from src.optimizer import OptimizadorTAC
+from src.vm import MaquinaTAC, decodificar
+from src.py_backend import MaquinaPython
+from src.single_pass import AnalizadorGeneradorTAC
+from src.incremental import SesionIncremental
+from src.batch import MaquinaLotes
+from src.async_vm import MaquinaCooperativa
+from src.output import SalidaEstandar
+import compilador
+
+CARPETA_TESTS = "tests"
+EXTENSION_GOLDEN = ".expected"
+ACOMPANANTES = {".csv": "lotes", ".pool": "pool", ".limite": "cooperativa"}
+
+
+def ruta_golden(ruta_src):
+    return os.path.splitext(ruta_src)[0] + EXTENSION_GOLDEN
+
+
+def _salida_relevante(texto):
+    # Solo lo que ve el usuario del programa: salida de la VM ('OUTPUT >>' o
+    # 'OUTPUT[i] >>' por lotes) y errores
+    return [linea for linea in texto.splitlines()
+            if linea.startswith("OUTPUT") or linea.startswith("Error")]
+
+
+def modo_propio(ruta_src):
+    """Modo al que pertenece un test por su archivo acompañante, o None"""
+    base = os.path.splitext(ruta_src)[0]
+    for extension, modo in ACOMPANANTES.items():
+        if os.path.exists(base + extension):
+            return modo
+    return None
+
+
+def crear_maquina(backend):
+    return MaquinaPython() if backend == "py" else MaquinaTAC()
 
 
-def ejecutar_test(archivo_src, categoria):
-    """Ejecuta un test individual y muestra el resultado"""
-    print(f"\n{'='*50}")
-    print(f"🧪 Ejecutando: {categoria}/{archivo_src}")
-    print(f"{'='*50}")
+def _parsear(ruta_src):
+    with open(ruta_src, "r", encoding="utf-8") as f:
+        tokens = AnalizadorLexico().tokenizar(f.read())
+    return AnalizadorSintactico(tokens).parse()
 
-    # Construir rutas
-    ruta_src = os.path.join("tests", categoria, archivo_src)
-    nombre_base = os.path.splitext(archivo_src)[0]
-    ruta_tac = os.path.join("tests", categoria, f"{nombre_base}.tac")
 
+def _ejecutar_tac(lineas_tac, nivel_optimizacion, backend, slots=None):
+    if nivel_optimizacion:
+        lineas_tac = OptimizadorTAC(nivel_optimizacion).optimizar(lineas_tac)
+    crear_maquina(backend).ejecutar_programa(decodificar(lineas_tac, slots))
+
+
+def _modo_normal(ruta_src, nivel_optimizacion, backend):
+    ast = _parsear(ruta_src)
+    AnalizadorSemanticoAST().analizar(ast)
+    generador = TACGenerator()
+    lineas_tac = generador.generate(ast)
+    # Con los slots del semántico, como el .tacb de 'compile'
+    _ejecutar_tac(lineas_tac, nivel_optimizacion, backend, generador.slots)
+
+
+def _modo_una_pasada(ruta_src, nivel_optimizacion, backend):
+    def dos_pasadas():
+        ast = _parsear(ruta_src)
+        AnalizadorSemanticoAST().analizar(ast)
+        return TACGenerator().generate(ast)
+
+    resultados = []
+    for compilar in (dos_pasadas, lambda: AnalizadorGeneradorTAC().generate(_parsear(ruta_src))):
+        try:
+            resultados.append(compilar())
+        except ErrorCompilacion as e:
+            resultados.append(str(e))
+    dos, una = resultados
+    if una != dos:
+        print("Error: el TAC (o el error) de una pasada difiere del de dos pasadas")
+    if isinstance(una, str):
+        print(una)
+        return
+    _ejecutar_tac(una, nivel_optimizacion, backend)
+
+
+def _compilar_a_tac(ruta_src, nivel_optimizacion, directorio):
+    """Compila en este proceso y escribe el .tac en 'directorio'; devuelve su
+    ruta (un error de compilación se propaga)"""
+    ast = _parsear(ruta_src)
+    AnalizadorSemanticoAST().analizar(ast)
+    lineas_tac = TACGenerator().generate(ast)
+    if nivel_optimizacion:
+        lineas_tac = OptimizadorTAC(nivel_optimizacion).optimizar(lineas_tac)
+    ruta_tac = os.path.join(directorio, os.path.splitext(os.path.basename(ruta_src))[0] + ".tac")
+    with open(ruta_tac, "w", encoding="utf-8") as f:
+        f.write("\n".join(lineas_tac))
+    return ruta_tac
+
+
+def _ejecutar_cli(argumentos):
+    """'python compilador.py <argumentos>' en este proceso"""
     try:
-        # Compilar
-        print(f"Compilando {ruta_src}...")
-        resultado_compile = subprocess.run([
-            "python", "compilador.py", "compile",
-            ruta_src, "-o", ruta_tac
-        ], capture_output=True, text=True)
+        compilador.ejecutar_comando_cli(compilador.parse_arguments(argumentos))
+    except SystemExit:
+        pass  # El error ya está impreso
+
+
+def _modo_lote_json(ruta_src, nivel_optimizacion, backend):
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_json = os.path.join(directorio, "estadisticas.jsonl")
+        args = compilador.parse_arguments(
+            ["compile", ruta_src, "-j", "1", "--out-dir", directorio,
+             f"-O{nivel_optimizacion}", "--stats-json", ruta_json])
+        capturado = io.StringIO()
+        with contextlib.redirect_stdout(capturado):
+            try:
+                compilador.ejecutar_comando_cli(args)
+            except SystemExit:
+                pass
+        # El lote lista los fallos como '  <ruta>: <error>'
+        prefijo = f"  {ruta_src}: "
+        for linea in capturado.getvalue().splitlines():
+            if linea.startswith(prefijo):
+                print(linea[len(prefijo):])
+        registros = []
+        if os.path.exists(ruta_json):
+            with open(ruta_json, "r", encoding="utf-8") as f:
+                registros = [json.loads(linea) for linea in f if linea.strip()]
+        ruta_tac = compilador.rutas_salida_lote([ruta_src], directorio)[0]
+        if not os.path.exists(ruta_tac):
+            return
+        if len(registros) != 1:
+            print(f"Error: el JSONL de --stats-json tiene {len(registros)} registros (se esperaba 1)")
+        with open(ruta_tac, "r", encoding="utf-8") as f:
+            crear_maquina(backend).ejecutar(f.read())
 
-        if resultado_compile.returncode != 0:
-            print(f"Error compilando:")
-            print(resultado_compile.stderr)
-            return False
 
-        # Ejecutar
-        print(f"Ejecutando {ruta_tac}...")
-        resultado_run = subprocess.run([
-            "python", "compilador.py", "run", ruta_tac
-        ], capture_output=True, text=True)
+def guion_ediciones(texto):
+    """Ediciones (inicio, fin, reemplazo) que parten de un texto vacío y
+    terminan en 'texto': escribirlo línea a línea, borrar y reponer cada
+    línea, y cambiar y restaurar cada literal entero"""
+    ediciones = []
+    lineas = texto.splitlines(keepends=True)
+    posicion = 0
+    for linea in lineas:
+        ediciones.append((posicion, posicion, linea))
+        posicion += len(linea)
+    posicion = 0
+    for linea in lineas:
+        ediciones.append((posicion, posicion + len(linea), ""))
+        ediciones.append((posicion, posicion, linea))
+        posicion += len(linea)
+    for literal in re.finditer(r"\b\d+\b", texto):
+        inicio = literal.start()
+        otro = str(int(literal.group()) + 7)
+        ediciones.append((inicio, literal.end(), otro))
+        ediciones.append((inicio, inicio + len(otro), literal.group()))
+    return ediciones
 
-        if resultado_run.returncode != 0:
-            print(f"Error ejecutando:")
-            print(resultado_run.stderr)
-            return False
 
-        print(f"Test completado: {archivo_src}")
-        return True
+def _normalizar_tac(lineas):
+    # La sesión no reinicia los contadores de temporales y etiquetas:
+    # se renumeran por orden de aparición para comparar
+    nombres = {}
 
-    except Exception as e:
-        print(f"Error inesperado: {e}")
-        return False
+    def renombrar(nombre):
+        nombre = nombre.group()
+        if nombre not in nombres:
+            nombres[nombre] = f"{nombre[0]}#{sum(n[0] == nombre[0] for n in nombres)}"
+        return nombres[nombre]
+
+    return [re.sub(r"\b[tL]\d+\b", renombrar, linea) for linea in lineas]
+
+
+def _compilar_completo(texto):
+    """(líneas TAC, None) o (None, error) recompilando el texto entero"""
+    try:
+        ast = AnalizadorSintactico(AnalizadorLexico().tokenizar(texto)).parse()
+        AnalizadorSemanticoAST().analizar(ast)
+        return TACGenerator().generate(ast), None
+    except ErrorCompilacion as e:
+        return None, str(e)
+
+
+def _modo_incremental(ruta_src, nivel_optimizacion, backend):
+    with open(ruta_src, "r", encoding="utf-8") as f:
+        texto = f.read()
+    sesion = SesionIncremental()
+    with contextlib.redirect_stdout(io.StringIO()):  # Avisos del léxico, una vez por paso
+        sesion.cargar("")
+        for paso, (inicio, fin, reemplazo) in enumerate(guion_ediciones(texto), start=1):
+            sesion.editar(inicio, fin, reemplazo)
+            lineas, error = _compilar_completo(sesion.texto)
+            incremental = sesion.lineas_tac()
+            if error != sesion.error or (lineas is not None and incremental is not None
+                                         and _normalizar_tac(lineas) != _normalizar_tac(incremental)):
+                break
+        else:
+            paso = None
+    if paso is not None:
+        print(f"Error: la edición {paso} del guion no coincide con la recompilación completa")
+        return
+    if sesion.texto != texto:
+        print("Error: el guion de ediciones no termina en el fuente")
+        return
+    if sesion.error is not None:
+        print(sesion.error)
+        return
+    _ejecutar_tac(sesion.lineas_tac(), nivel_optimizacion, backend)
+
+
+def _modo_lotes(ruta_src, nivel_optimizacion, backend):
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_tac = _compilar_a_tac(ruta_src, nivel_optimizacion, directorio)
+        ruta_csv = os.path.splitext(ruta_src)[0] + ".csv"
+        if os.path.exists(ruta_csv):
+            _ejecutar_cli(["run", ruta_tac, "--entradas", ruta_csv, "-q"])
+            return
+        with open(ruta_tac, "r", encoding="utf-8") as f:
+            programa = decodificar(f.read())
+    maquina = MaquinaLotes()
+    primera, segunda = maquina.ejecutar_programa(programa, {}, carriles=2)
+    if primera != segunda:
+        print("Error: dos carriles con la misma entrada imprimen valores distintos")
+    with SalidaEstandar() as salida:
+        for valor in primera:
+            salida.escribir(valor)
+    if 0 in maquina.errores:
+        # El único error que detiene un carril es la división por cero: se
+        # informa como en la VM escalar para que el golden sea el mismo
+        raise ZeroDivisionError("division by zero")
+
+
+def leer_lista_pool(ruta_pool):
+    """Rutas de los fuentes listados en un .pool"""
+    directorio = os.path.dirname(ruta_pool)
+    with open(ruta_pool, "r", encoding="utf-8") as f:
+        return [os.path.join(directorio, linea.strip()) for linea in f
+                if linea.strip() and not linea.lstrip().startswith("#")]
+
+
+def _modo_pool(ruta_src, nivel_optimizacion, backend):
+    ruta_pool = os.path.splitext(ruta_src)[0] + ".pool"
+    fuentes = leer_lista_pool(ruta_pool) if os.path.exists(ruta_pool) else [ruta_src]
+    with tempfile.TemporaryDirectory() as directorio:
+        rutas_tac = []
+        for numero, fuente in enumerate(fuentes):
+            # Un subdirectorio por programa: dos fuentes pueden llamarse igual
+            subdirectorio = os.path.join(directorio, str(numero))
+            os.mkdir(subdirectorio)
+            rutas_tac.append(_compilar_a_tac(fuente, nivel_optimizacion, subdirectorio))
+        procesos = "4" if len(rutas_tac) > 1 else "1"
+        _ejecutar_cli(["run-many", *rutas_tac, "-j", procesos, "--backend", backend, "-q"])
+
+
+def _modo_cooperativa(ruta_src, nivel_optimizacion, backend):
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_tac = _compilar_a_tac(ruta_src, nivel_optimizacion, directorio)
+        ruta_limite = os.path.splitext(ruta_src)[0] + ".limite"
+        if os.path.exists(ruta_limite):
+            with open(ruta_limite, "r", encoding="utf-8") as f:
+                limite = f.read().strip()
+            _ejecutar_cli(["run", ruta_tac, "--limite-instrucciones", limite, "-q"])
+            return
+        with open(ruta_tac, "r", encoding="utf-8") as f:
+            codigo_tac = f.read()
+    # Porciones muy cortas: casi cada salto cae en el borde de una
+    with SalidaEstandar() as salida:
+        maquina = MaquinaCooperativa(salida=salida, instrucciones_por_porcion=7,
+                                     limite_instrucciones=10 ** 9)
+        maquina.ejecutar(codigo_tac)
+
+
+MODOS = {
+    "normal": _modo_normal,
+    "lote-json": _modo_lote_json,
+    "una-pasada": _modo_una_pasada,
+    "incremental": _modo_incremental,
+    "lotes": _modo_lotes,
+    "pool": _modo_pool,
+    "cooperativa": _modo_cooperativa,
+}
+
+
+def ejecutar_test(ruta_src, nivel_optimizacion=0, backend="vm", modo="normal"):
+    """Compila y ejecuta un test en este proceso; devuelve (ruta, líneas de salida, segundos)"""
+    inicio = time.perf_counter()
+    capturado = io.StringIO()
+    with contextlib.redirect_stdout(capturado):
+        try:
+            MODOS[modo](ruta_src, nivel_optimizacion, backend)
+        except ErrorCompilacion as e:
+            print(e)  # Error sintáctico o semántico
+        except Exception as e:
+            print(f"Error de ejecución: {type(e).__name__}: {e}")  # Como run-many
+    return ruta_src, _salida_relevante(capturado.getvalue()), time.perf_counter() - inicio
+
+
+def _ejecutar_lote(argumentos):
+    return ejecutar_test(*argumentos)
+
+
+def buscar_tests(rutas, modo="normal"):
+    """Archivos .src de las rutas dadas (carpetas se recorren recursivamente),
+    sin los que son propios de otro modo"""
+    encontrados = []
+    for ruta in rutas:
+        if os.path.isdir(ruta):
+            encontrados.extend(glob.glob(os.path.join(ruta, "**", "*.src"), recursive=True))
+        else:
+            encontrados.append(ruta)
+    return sorted(ruta for ruta in encontrados if modo_propio(ruta) in (None, modo))
+
+
+def comparar(ruta_src, salida, actualizar):
+    """Devuelve (estado, detalle) comparando la salida con el golden"""
+    golden = ruta_golden(ruta_src)
+    if actualizar:
+        with open(golden, "w", encoding="utf-8") as f:
+            f.write("".join(linea + "\n" for linea in salida))
+        return "ACTUALIZADO", None
+    if not os.path.exists(golden):
+        return "SIN GOLDEN", f"falta {golden} (usa --actualizar)"
+    with open(golden, "r", encoding="utf-8") as f:
+        esperada = f.read().splitlines()
+    if salida == esperada:
+        return "OK", None
+    diferencias = [f"      esperado: {e!r}\n      obtenido: {o!r}"
+                   for e, o in zip(esperada, salida) if e != o]
+    if len(esperada) != len(salida):
+        diferencias.append(f"      líneas: esperadas {len(esperada)}, obtenidas {len(salida)}")
+    return "FALLO", "\n".join(diferencias[:5])
 
 
 def main():
-    """Ejecuta todos los tests por categoría"""
-
-    # Estructura de tests (mínimo 12 como pide el PDF)
-    tests_por_categoria = {
-        "basic": [
-            "basic1_declarations.src",      # Declaraciones simples
-            "basic2_assignments.src",       # Asignaciones
-            "basic3_arithmetic.src",         # Operaciones aritméticas
-            "basic4_bool_expr.src"         # Expresiones complejas
-        ],
-        "control_flow": [
-            "cf1_if_simple.src",          # If simple
-            "cf2_if_else.src",            # If-else
-            "cf3_while_simple.src",              # While loop
-            "cf4_while_if_nested.src"             # Control flow anidado
-        ],
-        "semantic_errors": [
-            "semerr1_undeclared_var.src",         # Variable no declarada
-            "semerr2_type_mismatch.src"         # Error de tipos
-        ],
-        "integration": [
-            "int1_sum_loop.src",          # Programa complejo
-            "int2_min_and_bool.src"          # Algoritmo completo
-        ]
-    }
-
-    print("INICIANDO EJECUCIÓN DE TESTS")
-    print("Nota: Esto compila y ejecuta cada test, mostrando la salida en terminal")
-
-    total_tests = 0
-    exitosos = 0
-
-    for categoria, tests in tests_por_categoria.items():
-        print(f"\n📁 CATEGORÍA: {categoria.upper()}")
-
-        for test in tests:
-            total_tests += 1
-            if ejecutar_test(test, categoria):
-                exitosos += 1
+    parser = argparse.ArgumentParser(description="Ejecuta los tests del compilador en paralelo")
+    parser.add_argument("rutas", nargs="*", default=[CARPETA_TESTS],
+                        help="Carpetas o archivos .src (default: tests)")
+    parser.add_argument("-j", "--procesos", type=int, default=os.cpu_count() or 1,
+                        help="Procesos en paralelo (default: número de CPUs)")
+    parser.add_argument("-O", dest="optimizacion", type=int, choices=[0, 1, 2], default=0,
+                        help="Nivel de optimización con el que compilar los tests")
+    parser.add_argument("--backend", choices=["vm", "py"], default="vm",
+                        help="Máquina con la que ejecutar los tests (default: vm)")
+    parser.add_argument("--modo", choices=list(MODOS), default="normal",
+                        help="Camino del compilador con el que pasar los tests (default: normal)")
+    parser.add_argument("--actualizar", action="store_true",
+                        help="Escribir la salida actual como golden .expected (con --modo, solo "
+                             "los de los tests propios de ese modo)")
+    parser.add_argument("--lentos", type=int, default=5,
+                        help="Cuántos de los tests más lentos listar al final (default: 5)")
+    args = parser.parse_args()
+
+    rutas = buscar_tests(args.rutas, args.modo)
+    if not rutas:
+        print("No se encontraron tests .src")
+        sys.exit(1)
+
+    print(f"INICIANDO {len(rutas)} TESTS ({args.procesos} procesos, -O{args.optimizacion}, "
+          f"backend {args.backend}, modo {args.modo})")
+    inicio = time.perf_counter()
+    trabajos = [(ruta, args.optimizacion, args.backend, args.modo) for ruta in rutas]
+    # Lotes grandes: con miles de tests el coste de enviar cada uno domina
+    lote = max(1, len(trabajos) // (args.procesos * 8))
+    if args.procesos > 1:
+        with ProcessPoolExecutor(args.procesos) as ejecutor:
+            resultados = list(ejecutor.map(_ejecutar_lote, trabajos, chunksize=lote))
+    else:
+        resultados = [_ejecutar_lote(trabajo) for trabajo in trabajos]
+
+    # En otro modo, --actualizar solo reescribe los goldens propios de ese modo
+    propio = None if args.modo == "normal" else args.modo
+    conteo = {}
+    for ruta, salida, segundos in resultados:
+        actualizar = args.actualizar and modo_propio(ruta) == propio
+        estado, detalle = comparar(ruta, salida, actualizar)
+        conteo[estado] = conteo.get(estado, 0) + 1
+        nombre = os.path.relpath(ruta, CARPETA_TESTS)
+        print(f"{estado:<12} {nombre:<50} {segundos * 1000:8.1f} ms")
+        if detalle:
+            print(detalle)
+    total = time.perf_counter() - inicio
+
+    if args.lentos:
+        print("\nMás lentos:")
+        for ruta, _, segundos in sorted(resultados, key=lambda r: r[2], reverse=True)[:args.lentos]:
+            print(f"   {os.path.relpath(ruta, CARPETA_TESTS):<50} {segundos * 1000:8.1f} ms")
 
     # Resumen final
+    fallidos = len(rutas) - conteo.get("OK", 0) - conteo.get("ACTUALIZADO", 0)
     print(f"\n{'='*60}")
     print(f" Resumen:")
-    print(f"   Tests ejecutados: {total_tests}")
-    print(f"   Tests exitosos:   {exitosos}")
-    print(f"   Tests fallidos:   {total_tests - exitosos}")
+    print(f"   Tests ejecutados: {len(rutas)}")
+    for estado, cantidad in sorted(conteo.items()):
+        print(f"   {estado + ':':<17} {cantidad}")
+    print(f"   Tiempo total:     {total:.2f} s")
     print(f"{'='*60}")
 
-    if exitosos == total_tests:
-        print("Todos los tests pasaron")
-    else:
+    if fallidos:
         print("Algunos tests fallaron")
+        sys.exit(1)
+    print("Todos los tests pasaron")
 
 
 if __name__ == "__main__":
@@ -2,16 +2,30 @@
 """
 Mini-Language Compiler - Módulos principales
 """
+# Forma parte de la clave de la caché de compilación: subirla invalida las entradas
+__version__ = '0.10.0'
+
 from .lexer import AnalizadorLexico, Token
 from .parser import AnalizadorSintactico, Program, ASTNode
 from .semantic import AnalizadorSemanticoAST
 from .tac_generator import GeneradorDeCodigo, TACGenerator
 from .vm import MaquinaTAC
+from .py_backend import MaquinaPython
+from .batch import MaquinaLotes
+from .pool import ejecutar_muchos, ResultadoEjecucion
+from .async_vm import MaquinaCooperativa, PresupuestoAgotado
+from .optimizer import OptimizadorTAC
+from .cfg import GrafoFlujo
+from .incremental import SesionIncremental
 
 __all__ = [
     'AnalizadorLexico', 'Token',
     'AnalizadorSintactico', 'Program', 'ASTNode',
     'AnalizadorSemanticoAST',
     'GeneradorDeCodigo', 'TACGenerator',
-    'MaquinaTAC'
+    'MaquinaTAC', 'MaquinaPython', 'MaquinaLotes',
+    'ejecutar_muchos', 'ResultadoEjecucion',
+    'MaquinaCooperativa', 'PresupuestoAgotado',
+    'OptimizadorTAC', 'GrafoFlujo',
+    'SesionIncremental'
 ]
@@ -0,0 +1,129 @@
+# ================== VM COOPERATIVA (asyncio) ==================
+# MaquinaTAC.ejecutar_programa no vuelve hasta que el programa termina: un
+# 'while (true)' bloquea el proceso que la aloja. MaquinaCooperativa ejecuta
+# el mismo código por porciones de N instrucciones y entre porción y porción
+# cede el control al bucle de eventos (await asyncio.sleep(0)), así que un
+# servicio async puede tener miles de programas en marcha en un solo hilo.
+#
+# Presupuestos por programa, comprobados al final de cada porción:
+#   limite_instrucciones  instrucciones de la VM (una superinstrucción cuenta
+#                         como una); la última porción se recorta para no
+#                         pasarse
+#   limite_segundos       tiempo real desde que empezó el programa, incluido
+#                         el que pasó esperando mientras corrían los demás
+# Al agotarse uno se lanza PresupuestoAgotado; lo impreso hasta entonces ya
+# está en la salida.
+
+import asyncio
+import time
+
+from .output import info
+from .vm import (MaquinaTAC, decodificar, fusionar_superinstrucciones, _FUNCIONES,
+                 OP_COPIA, OP_SI_FALSO, OP_GOTO, OP_SALTO_SI_NO, OP_COPIA_SALTO)
+
+INSTRUCCIONES_POR_PORCION = 10000
+
+
+class PresupuestoAgotado(Exception):
+    """Un programa superó su límite de instrucciones o de tiempo"""
+
+    def __init__(self, mensaje, instrucciones, segundos):
+        super().__init__(mensaje)
+        self.instrucciones = instrucciones  # Ejecutadas hasta cortarlo
+        self.segundos = segundos
+
+
+class MaquinaCooperativa(MaquinaTAC):
+    def __init__(self, superinstrucciones=True, salida=None,
+                 instrucciones_por_porcion=INSTRUCCIONES_POR_PORCION,
+                 limite_instrucciones=None, limite_segundos=None):
+        super().__init__(superinstrucciones=superinstrucciones, salida=salida)
+        if instrucciones_por_porcion < 1:
+            raise ValueError("instrucciones_por_porcion debe ser al menos 1")
+        if limite_instrucciones is not None and limite_instrucciones < 1:
+            raise ValueError("limite_instrucciones debe ser al menos 1 (None: sin límite)")
+        if limite_segundos is not None and not limite_segundos > 0:
+            raise ValueError("limite_segundos debe ser mayor que 0 (None: sin límite)")
+        self.instrucciones_por_porcion = instrucciones_por_porcion
+        self.limite_instrucciones = limite_instrucciones  # None: sin límite
+        self.limite_segundos = limite_segundos
+        # De la última ejecución
+        self.instrucciones = 0
+        self.porciones = 0
+
+    def ejecutar_programa(self, programa):
+        """Versión bloqueante con los mismos presupuestos (no usar dentro de un
+        bucle de eventos en marcha: ahí, await ejecutar_programa_async)"""
+        asyncio.run(self.ejecutar_programa_async(programa))
+
+    async def ejecutar_async(self, codigo_tac_string):
+        await self.ejecutar_programa_async(decodificar(codigo_tac_string))
+
+    async def ejecutar_programa_async(self, programa):
+        if self.superinstrucciones:
+            programa, _ = fusionar_superinstrucciones(programa)
+        codigo = programa.codigo
+        self.labels = programa.etiquetas
+        self.mem = list(programa.memoria_inicial)
+        self.instrucciones = 0
+        self.porciones = 0
+        limite = self.limite_instrucciones
+        porcion = self.instrucciones_por_porcion
+
+        info(f"\n--- [Ejecución Cooperativa] Iniciando ({len(codigo)} instrucciones) ---")
+        inicio = time.perf_counter()
+        pc = 0
+        try:
+            while True:
+                cuantas = porcion if limite is None else min(porcion, limite - self.instrucciones)
+                pc, ejecutadas = self._porcion(codigo, pc, cuantas)
+                self.instrucciones += ejecutadas
+                self.porciones += 1
+                self.segundos = time.perf_counter() - inicio
+                if pc >= len(codigo):
+                    break
+                if limite is not None and self.instrucciones >= limite:
+                    raise PresupuestoAgotado(
+                        f"límite de {limite} instrucciones agotado",
+                        self.instrucciones, self.segundos)
+                if self.limite_segundos is not None and self.segundos >= self.limite_segundos:
+                    raise PresupuestoAgotado(
+                        f"límite de {self.limite_segundos} s agotado tras "
+                        f"{self.instrucciones} instrucciones", self.instrucciones, self.segundos)
+                self.salida.vaciar()  # Lo impreso en la porción sale antes de ceder el turno
+                await asyncio.sleep(0)
+        finally:
+            self.salida.vaciar()
+        info("--- [Ejecución Cooperativa] Finalizada ---")
+
+    def _porcion(self, codigo, pc, cuantas):
+        # Igual que _bucle, pero ejecuta como mucho 'cuantas' instrucciones a
+        # partir de pc; devuelve (pc siguiente, instrucciones ejecutadas)
+        mem = self.mem
+        funciones = _FUNCIONES
+        escribir = self.salida.escribir
+        total = len(codigo)
+
+        for ejecutadas in range(cuantas):
+            if pc >= total:
+                return pc, ejecutadas
+            op, a, b, c = codigo[pc]
+            pc += 1
+            if op < OP_COPIA:
+                mem[a] = funciones[op](mem[b], mem[c])
+            elif op == OP_COPIA:
+                mem[a] = mem[b]
+            elif op >= OP_SALTO_SI_NO:
+                if op == OP_COPIA_SALTO:
+                    mem[a] = mem[b]
+                    pc = c
+                elif not funciones[op - OP_SALTO_SI_NO](mem[b], mem[c]):
+                    pc = a
+            elif op == OP_SI_FALSO:
+                if not mem[a]:
+                    pc = b
+            elif op == OP_GOTO:
+                pc = a
+            else:
+                escribir(mem[a])
+        return pc, cuantas
@@ -0,0 +1,263 @@
+# ================== EJECUCIÓN POR LOTES (NumPy) ==================
+# Ejecuta un mismo ProgramaTAC sobre muchas entradas a la vez: barridos de
+# parámetros en los que solo cambian los valores iniciales de algunas
+# variables. En lugar de una MaquinaTAC por entrada, cada slot del banco de
+# registros es un array de NumPy con un carril por instancia y cada
+# instrucción se ejecuta una sola vez para todos los carriles.
+#
+# Mientras las instancias siguen el mismo camino avanzan juntas. En un salto
+# condicional en el que no todas coinciden, el grupo se separa en dos con su
+# propio pc; se ejecuta siempre el grupo de menor pc y, al llegar al pc en el
+# que espera otro grupo, se vuelven a unir. Los if y while que genera
+# TACGenerator siempre convergen hacia delante, así que las ramas de un if se
+# reúnen tras el else y los carriles que salen antes de un while esperan al
+# final a los que siguen dando vueltas.
+#
+# Diferencias con MaquinaTAC: los enteros son int64 (no enteros de Python sin
+# límite) y una división por cero detiene solo su carril, que queda en
+# 'errores'. '&&' y '||' devuelven un operando, como 'and'/'or' en la VM; si
+# en unos carriles es un bool y en otros el 0 de una variable bool sin
+# asignar, el array es entero y esos carriles imprimen 0 y 1 en lugar de
+# False y True. NumPy es opcional: solo se importa al crear una MaquinaLotes.
+
+import csv
+
+from .output import info
+from .vm import (decodificar, fusionar_superinstrucciones, OP_DIV, OP_COPIA,
+                 OP_SI_FALSO, OP_GOTO, OP_SALTO_SI_NO, OP_COPIA_SALTO)
+
+
+def _importar_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("La ejecución por lotes necesita NumPy (pip install numpy)") from None
+    return numpy
+
+
+def leer_entradas_csv(ruta):
+    """Lee {variable: [valor por instancia]} de un CSV con los nombres en la
+    cabecera y una fila por instancia ('true'/'false' o enteros)"""
+    with open(ruta, 'r', encoding='utf-8', newline='') as f:
+        filas = list(csv.reader(f))
+    if not filas:
+        raise ValueError(f"El archivo de entradas '{ruta}' está vacío")
+    nombres = [nombre.strip() for nombre in filas[0]]
+    entradas = {nombre: [] for nombre in nombres}
+    for numero, fila in enumerate(filas[1:], start=2):
+        if not fila:
+            continue
+        if len(fila) != len(nombres):
+            raise ValueError(f"Línea {numero} de '{ruta}': se esperaban {len(nombres)} valores")
+        for nombre, texto in zip(nombres, fila):
+            texto = texto.strip()
+            if texto in ('true', 'false'):
+                entradas[nombre].append(texto == 'true')
+            else:
+                try:
+                    entradas[nombre].append(int(texto))
+                except ValueError:
+                    raise ValueError(f"Línea {numero} de '{ruta}': valor no válido "
+                                     f"'{texto}' para '{nombre}'") from None
+    return entradas
+
+
+class MaquinaLotes:
+    def __init__(self, superinstrucciones=True):
+        info("[MaquinaLotes] VM por lotes Inicializada.")
+        self.np = np = _importar_numpy()
+        self.superinstrucciones = superinstrucciones
+        self.mem = []       # Un array por slot, con un valor por carril
+        self.errores = {}   # {carril: mensaje} de los carriles que fallaron
+        self.pasos = 0      # Instrucciones ejecutadas (una por grupo, no por carril)
+
+        def division(a, b):
+            # Como _division de la VM: int(a / b), división real truncada hacia cero
+            return (a / b).astype(np.int64)
+
+        def elegir(mascara, si, no):
+            # Por carril, 'si' donde la máscara es cierta y 'no' donde no. Si
+            # todos eligen el mismo operando se copia ese, con su tipo: where()
+            # pasaría a int un bool mezclado con el 0 de una variable sin asignar
+            mascara = mascara.astype(bool)
+            if mascara.all():
+                return si.copy()
+            if not mascara.any():
+                return no.copy()
+            return np.where(mascara, si, no)
+
+        def y_logico(a, b):
+            # Como 'a and b' de la VM: devuelve un operando, no siempre un bool
+            return elegir(a, b, a)
+
+        def o_logico(a, b):
+            return elegir(a, a, b)
+
+        # Mismo orden que _FUNCIONES de src/vm.py
+        self.funciones = [
+            np.add, np.subtract, np.multiply, division,
+            np.less, np.less_equal, np.greater, np.greater_equal,
+            np.equal, np.not_equal, y_logico, o_logico
+        ]
+
+    def ejecutar(self, codigo_tac_string, entradas, carriles=None):
+        return self.ejecutar_programa(decodificar(codigo_tac_string), entradas, carriles)
+
+    def ejecutar_programa(self, programa, entradas, carriles=None):
+        """Ejecuta 'programa' una vez por instancia. 'entradas' es {variable:
+        secuencia de valores iniciales}, todas de la misma longitud (o
+        'carriles' instancias idénticas si no hay entradas). Devuelve la lista
+        de valores impresos por cada instancia"""
+        np = self.np
+        if carriles is None:
+            if not entradas:
+                raise ValueError("Sin entradas hay que indicar el número de carriles")
+            carriles = len(next(iter(entradas.values())))
+
+        self.mem = mem = [np.full(carriles, valor) for valor in programa.memoria_inicial]
+        for nombre, valores in entradas.items():
+            if nombre not in programa.simbolos:
+                raise ValueError(f"Variable '{nombre}' no encontrada en el TAC")
+            valores = np.asarray(valores)
+            if valores.shape != (carriles,):
+                raise ValueError(f"'{nombre}' tiene {valores.size} valores; se esperaban {carriles}")
+            if valores.dtype != np.bool_:
+                valores = valores.astype(np.int64)
+            mem[programa.simbolos[nombre]] = valores.copy()
+
+        if self.superinstrucciones:
+            programa, _ = fusionar_superinstrucciones(programa)
+        info(f"\n--- [Ejecución por lotes] Iniciando ({len(programa.codigo)} "
+             f"instrucciones, {carriles} instancias) ---")
+        self.errores = {}
+        impresos = self._bucle(programa.codigo, carriles)
+
+        salidas = [[] for _ in range(carriles)]
+        for grupo, valores in impresos:
+            destinos = range(carriles) if grupo is None else grupo.tolist()
+            for carril, valor in zip(destinos, valores.tolist()):
+                salidas[carril].append(valor)
+        info("--- [Ejecución por lotes] Finalizada ---")
+        return salidas
+
+    def _bucle(self, codigo, carriles):
+        np = self.np
+        mem = self.mem
+        funciones = self.funciones
+        total = len(codigo)
+        impresos = []  # (grupo, valores) de cada print, en orden de ejecución
+        pendientes = {}  # {pc: carriles que esperan en pc}; nunca por debajo del pc actual
+        # Carriles del grupo que se ejecuta: None son todos (sin máscaras) y si
+        # no un array ordenado de índices
+        grupo = None
+        pc = 0
+        pasos = 0
+
+        def asignar(destino, valor):
+            if grupo is None:
+                mem[destino] = valor
+                return
+            if mem[destino].dtype != valor.dtype:  # Bool en un slot iniciado a 0
+                mem[destino] = mem[destino].astype(valor.dtype)
+            mem[destino][grupo] = valor
+
+        def leer(slot):
+            return mem[slot] if grupo is None else mem[slot][grupo]
+
+        def copiar(slot):
+            # El índice de un grupo ya devuelve una copia
+            return mem[slot].copy() if grupo is None else mem[slot][grupo]
+
+        while True:
+            if pc >= total:
+                # El grupo terminó: seguir con el que espera en el menor pc
+                if not pendientes:
+                    break
+                pc = min(pendientes)
+                grupo = pendientes.pop(pc)
+                continue
+            if pc in pendientes:
+                grupo = self._unir(grupo, pendientes.pop(pc), carriles)
+
+            pasos += 1
+            op, a, b, c = codigo[pc]
+            pc += 1
+            salto = None  # Destino para los carriles que saltan
+            saltan = None  # Máscara de esos carriles (None: todos)
+            if op < OP_COPIA:
+                if op == OP_DIV:
+                    divisor = leer(c)
+                    ceros = divisor == 0
+                    if ceros.any():
+                        grupo = self._descartar(grupo, ceros, carriles)
+                        if grupo.size == 0:
+                            pc = total
+                            continue
+                        divisor = leer(c)
+                    asignar(a, funciones[op](leer(b), divisor))
+                else:
+                    asignar(a, funciones[op](leer(b), leer(c)))
+            elif op == OP_COPIA:
+                asignar(a, copiar(b))
+            elif op >= OP_SALTO_SI_NO:
+                if op == OP_COPIA_SALTO:
+                    asignar(a, copiar(b))
+                    salto = c
+                else:
+                    # logical_not y no '~': '&&' y '||' pueden dar enteros
+                    saltan = np.logical_not(funciones[op - OP_SALTO_SI_NO](leer(b), leer(c)))
+                    salto = a
+            elif op == OP_SI_FALSO:
+                saltan = np.logical_not(leer(a))
+                salto = b
+            elif op == OP_GOTO:
+                salto = a
+            else:
+                # Una copia: las asignaciones a un subgrupo modifican el array en su sitio
+                impresos.append((grupo, copiar(a)))
+
+            if salto is None:
+                continue
+            if saltan is not None:
+                cuantos = np.count_nonzero(saltan)
+                if cuantos == 0:
+                    continue
+                if cuantos < saltan.size:
+                    # Divergencia: los que saltan esperan en 'salto', el resto sigue
+                    indices = np.arange(carriles) if grupo is None else grupo
+                    self._esperar(pendientes, salto, indices[saltan], carriles)
+                    grupo = indices[~saltan]
+                    if salto > pc:
+                        continue
+                    # Salto hacia atrás: el grupo que salta pasa a ser el de menor pc
+                    self._esperar(pendientes, pc, grupo, carriles)
+                    pc = min(pendientes)
+                    grupo = pendientes.pop(pc)
+                    continue
+            pc = salto
+            if pendientes and pc > min(pendientes):
+                self._esperar(pendientes, pc, grupo, carriles)
+                pc = min(pendientes)
+                grupo = pendientes.pop(pc)
+
+        self.pasos = pasos
+        return impresos
+
+    def _unir(self, grupo, otro, carriles):
+        # Dos grupos pendientes nunca son todos los carriles: grupo no es None.
+        # Son disjuntos y ya ordenados: la ordenación estable (timsort) solo mezcla
+        np = self.np
+        unido = np.sort(np.concatenate((grupo, otro)), kind='stable')
+        return None if unido.size == carriles else unido
+
+    def _esperar(self, pendientes, pc, grupo, carriles):
+        if pc in pendientes:
+            grupo = self._unir(grupo, pendientes[pc], carriles)
+        pendientes[pc] = grupo
+
+    def _descartar(self, grupo, fallan, carriles):
+        """Quita del grupo los carriles de la máscara 'fallan' (división por cero)"""
+        indices = self.np.arange(carriles) if grupo is None else grupo
+        for carril in indices[fallan].tolist():
+            self.errores[carril] = "división por cero"
+        return indices[~fallan]
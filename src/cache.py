@@ -0,0 +1,249 @@
+# ================== CACHÉ DE COMPILACIÓN ==================
+# Guarda el TAC ya generado en un directorio, indexado por el SHA-256 de los
+# bytes del fuente, la versión del compilador (__version__ más una huella de
+# los módulos de src/ y de compilador.py, que también da forma al TAC, para
+# que editar el compilador invalide la caché) y las
+# opciones que cambian el resultado (nivel de optimización). En un acierto
+# compilar() devuelve el TAC guardado sin pasar por léxico, parser, semántico
+# ni generación.
+#
+#   <directorio>/ab/abcdef....tac   una entrada por clave
+#   <directorio>/contadores         aciertos y fallos, dos u64 que se
+#                                   actualizan en su sitio (16 bytes siempre)
+#   <directorio>/.bloqueo           cerrojo para desalojo y limpieza
+#
+# La fecha de modificación de cada entrada se actualiza en cada acierto: al
+# superar el tamaño máximo se borran las entradas usadas hace más tiempo (LRU).
+# Cada CacheCompilacion lleva la cuenta del tamaño total (un recorrido del
+# directorio la primera vez, y después suma lo que guarda) y solo recorre y
+# desaloja cuando esa cuenta pasa del máximo; entonces baja hasta el 90 % para
+# que los siguientes guardados no vuelvan a desalojar enseguida. Las
+# escrituras van a un archivo temporal que se renombra (los que deja un
+# proceso interrumpido se borran al desalojar o limpiar) y cada contador se
+# incrementa bajo un cerrojo de solo sus 8 bytes (lockf), así que varios
+# procesos pueden compartir el directorio sin entradas a medias y sin que las
+# consultas esperen al desalojo.
+
+import contextlib
+import functools
+import glob
+import hashlib
+import os
+import struct
+import tempfile
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin cerrojo, el desalojo sigue siendo idempotente
+    fcntl = None
+
+from . import __version__
+
+DIRECTORIO_POR_DEFECTO = os.path.join(
+    os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache')),
+    'minilang')
+TAMANO_MAXIMO_POR_DEFECTO = 256 * 1024 * 1024
+_EXTENSION = '.tac'
+_CONTADORES = 'contadores'
+_DESPLAZAMIENTOS = {'aciertos': 0, 'fallos': 8}  # Posición de cada u64 en _CONTADORES
+_CONTADOR = struct.Struct('<Q')
+_BLOQUEO = '.bloqueo'
+_MARGEN_DESALOJO = 0.9  # El desalojo deja la caché en esta fracción del máximo
+_TEMPORAL = '.tmp'
+_EDAD_TEMPORAL_ABANDONADO = 3600  # Segundos: un guardado en curso nunca tarda tanto
+_COMPILADOR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           'compilador.py')
+
+
+@functools.lru_cache(maxsize=None)
+def huella_compilador():
+    """Versión del compilador: __version__ y el contenido de los módulos de src/
+    y de compilador.py (el pipeline de compilar())"""
+    resumen = hashlib.sha256(__version__.encode('utf-8'))
+    rutas = sorted(glob.glob(os.path.join(os.path.dirname(__file__), '*.py')))
+    for ruta in rutas + [_COMPILADOR]:
+        try:
+            with open(ruta, 'rb') as f:
+                resumen.update(f.read())
+        except FileNotFoundError:  # src/ usado como paquete sin el CLI
+            pass
+    return resumen.hexdigest()
+
+
+class CacheCompilacion:
+    def __init__(self, directorio=None, tamano_maximo=TAMANO_MAXIMO_POR_DEFECTO):
+        self.directorio = directorio or os.environ.get('MINILANG_CACHE_DIR') \
+            or DIRECTORIO_POR_DEFECTO
+        self.tamano_maximo = tamano_maximo
+        self._tamano = None  # Tamaño total estimado; None hasta el primer guardado
+
+    @staticmethod
+    def clave(fuente, nivel_optimizacion=0):
+        """Clave de una compilación: fuente en bytes + versión + opciones"""
+        resumen = hashlib.sha256()
+        resumen.update(f"{huella_compilador()} -O{nivel_optimizacion}\0".encode('utf-8'))
+        resumen.update(fuente)
+        return resumen.hexdigest()
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, clave[:2], clave + _EXTENSION)
+
+    # ========== LECTURA Y ESCRITURA ==========
+
+    def obtener(self, clave):
+        """TAC guardado para la clave, o None si no está"""
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, 'r', encoding='utf-8') as f:
+                codigo_tac = f.read()
+            os.utime(ruta)  # Marca de uso para el LRU
+        except FileNotFoundError:  # Nunca guardada, o desalojada por otro proceso
+            self._contar('fallos')
+            return None
+        self._contar('aciertos')
+        return codigo_tac
+
+    def guardar(self, clave, codigo_tac):
+        ruta = self._ruta(clave)
+        if self._tamano is None:
+            self._tamano = sum(tamano for _, tamano, _ in self._entradas())
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        try:
+            anterior = os.path.getsize(ruta)
+        except FileNotFoundError:
+            anterior = 0
+        descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(ruta), suffix=_TEMPORAL)
+        try:
+            datos = codigo_tac.encode('utf-8')
+            with os.fdopen(descriptor, 'wb') as f:
+                f.write(datos)
+            os.replace(temporal, ruta)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(temporal)
+            raise
+        self._tamano += len(datos) - anterior
+        if self._tamano > self.tamano_maximo:
+            self.desalojar()
+
+    # ========== TAMAÑO Y DESALOJO ==========
+
+    def _entradas(self, extension=_EXTENSION):
+        # (fecha de uso, tamaño, ruta) de cada entrada (o temporal, con '.tmp')
+        entradas = []
+        if not os.path.isdir(self.directorio):
+            return entradas
+        for subdirectorio in os.scandir(self.directorio):
+            if not subdirectorio.is_dir():
+                continue
+            for entrada in os.scandir(subdirectorio.path):
+                if not entrada.name.endswith(extension):
+                    continue
+                try:
+                    datos = entrada.stat()
+                except FileNotFoundError:
+                    continue
+                entradas.append((datos.st_mtime, datos.st_size, entrada.path))
+        return entradas
+
+    def _borrar_temporales_abandonados(self):
+        # Temporales de un guardado que no llegó a renombrarlos (proceso
+        # matado). Los recientes pueden ser de un guardado en curso: se dejan
+        limite = time.time() - _EDAD_TEMPORAL_ABANDONADO
+        for fecha, _, ruta in self._entradas(_TEMPORAL):
+            if fecha < limite:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(ruta)
+
+    def desalojar(self):
+        """Si la caché pasa del tamaño máximo, borra las entradas menos usadas
+        hasta dejarla en el 90 % del máximo; devuelve cuántas borró"""
+        with self._bloqueo():
+            self._borrar_temporales_abandonados()
+            # Recorrido real: incluye lo que han guardado otros procesos
+            entradas = self._entradas()
+            total = sum(tamano for _, tamano, _ in entradas)
+            borradas = 0
+            if total > self.tamano_maximo:
+                objetivo = self.tamano_maximo * _MARGEN_DESALOJO
+                for _, tamano, ruta in sorted(entradas):
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(ruta)
+                    borradas += 1
+                    total -= tamano
+                    if total <= objetivo:
+                        break
+            self._tamano = total
+            return borradas
+
+    def limpiar(self):
+        """Borra todas las entradas y las estadísticas; devuelve cuántas entradas había"""
+        with self._bloqueo():
+            self._borrar_temporales_abandonados()
+            entradas = self._entradas()
+            for _, _, ruta in entradas:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(ruta)
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(os.path.join(self.directorio, _CONTADORES))
+            self._tamano = 0
+            return len(entradas)
+
+    @contextlib.contextmanager
+    def _bloqueo(self):
+        os.makedirs(self.directorio, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.directorio, _BLOQUEO), 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    # ========== ESTADÍSTICAS ==========
+
+    @staticmethod
+    def _leer_valor(descriptor, campo):
+        # Un archivo recién creado (o más corto) cuenta como 0
+        os.lseek(descriptor, _DESPLAZAMIENTOS[campo], os.SEEK_SET)
+        datos = os.read(descriptor, _CONTADOR.size)
+        return _CONTADOR.unpack(datos)[0] if len(datos) == _CONTADOR.size else 0
+
+    def _leer_contador(self, campo):
+        try:
+            descriptor = os.open(os.path.join(self.directorio, _CONTADORES), os.O_RDONLY)
+        except FileNotFoundError:
+            return 0
+        try:
+            return self._leer_valor(descriptor, campo)
+        finally:
+            os.close(descriptor)
+
+    def _contar(self, campo):
+        # Leer, sumar y reescribir en su sitio con un cerrojo sobre los 8 bytes
+        # del contador; cerrar el descriptor lo libera
+        os.makedirs(self.directorio, exist_ok=True)
+        descriptor = os.open(os.path.join(self.directorio, _CONTADORES),
+                             os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.lockf(descriptor, fcntl.LOCK_EX, _CONTADOR.size, _DESPLAZAMIENTOS[campo])
+            valor = self._leer_valor(descriptor, campo)
+            os.lseek(descriptor, _DESPLAZAMIENTOS[campo], os.SEEK_SET)
+            os.write(descriptor, _CONTADOR.pack(valor + 1))
+        finally:
+            os.close(descriptor)
+
+    def estadisticas(self):
+        entradas = self._entradas()
+        return {
+            'directorio': self.directorio,
+            'entradas': len(entradas),
+            'tamano': sum(tamano for _, tamano, _ in entradas),
+            'tamano_maximo': self.tamano_maximo,
+            'aciertos': self._leer_contador('aciertos'),
+            'fallos': self._leer_contador('fallos'),
+        }
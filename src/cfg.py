@@ -0,0 +1,210 @@
+# ================== GRAFO DE FLUJO DE CONTROL ==================
+# Bloques básicos, sucesores/predecesores, dominadores y análisis de vida
+# (liveness) sobre la representación de src/tac_ir.py. Lo usan los pases del
+# optimizador y puede reutilizarse en otros análisis.
+
+from .tac_ir import parsear, usos, definicion, es_ejecutable, es_literal
+
+
+class BloqueBasico:
+    def __init__(self, indice):
+        self.indice = indice
+        self.instrucciones = []   # Tuplas de tac_ir (incluye etiquetas y comentarios)
+        self.sucesores = []       # Índices de bloques
+        self.predecesores = []
+        # Rellenados por GrafoFlujo.analizar_vida()
+        self.usos = set()          # Leídas antes de escribirse en el bloque
+        self.definiciones = set()  # Escritas en el bloque
+        self.vivas_entrada = set()
+        self.vivas_salida = set()
+
+    @property
+    def etiquetas(self):
+        return [inst[1] for inst in self.instrucciones if inst[0] == 'etiqueta']
+
+    @property
+    def ejecutables(self):
+        return [inst for inst in self.instrucciones if es_ejecutable(inst)]
+
+    def vivas_despues(self):
+        """Lista paralela a self.instrucciones con las variables vivas tras cada una"""
+        vivas = set(self.vivas_salida)
+        resultado = [None] * len(self.instrucciones)
+        for i in range(len(self.instrucciones) - 1, -1, -1):
+            resultado[i] = set(vivas)
+            inst = self.instrucciones[i]
+            destino = definicion(inst)
+            if destino is not None:
+                vivas.discard(destino)
+            vivas.update(op for op in usos(inst) if not es_literal(op))
+        return resultado
+
+    def __repr__(self):
+        return f"BloqueBasico({self.indice}, sucesores={self.sucesores})"
+
+
+class GrafoFlujo:
+    def __init__(self, instrucciones):
+        self.bloques = []
+        self._construir(instrucciones)
+        self.idom = self._calcular_dominadores()
+
+    @classmethod
+    def desde_lineas(cls, lineas):
+        return cls([parsear(linea) for linea in lineas if linea.strip()])
+
+    def instrucciones(self):
+        """Aplana los bloques de vuelta a una lista de instrucciones"""
+        return [inst for bloque in self.bloques for inst in bloque.instrucciones]
+
+    # ========== CONSTRUCCIÓN ==========
+
+    def _construir(self, instrucciones):
+        actual = BloqueBasico(0)
+        self.bloques.append(actual)
+        con_codigo = False
+        for inst in instrucciones:
+            # Una etiqueta abre bloque salvo que el actual aún no tenga código
+            if inst[0] == 'etiqueta' and con_codigo:
+                actual = BloqueBasico(len(self.bloques))
+                self.bloques.append(actual)
+                con_codigo = False
+            actual.instrucciones.append(inst)
+            if es_ejecutable(inst):
+                con_codigo = True
+            if inst[0] in ('goto', 'si_falso'):
+                actual = BloqueBasico(len(self.bloques))
+                self.bloques.append(actual)
+                con_codigo = False
+
+        bloque_de = {}
+        for bloque in self.bloques:
+            for etiqueta in bloque.etiquetas:
+                bloque_de[etiqueta] = bloque.indice
+
+        for bloque in self.bloques:
+            ejecutables = bloque.ejecutables
+            ultima = ejecutables[-1] if ejecutables else None
+            siguiente = bloque.indice + 1
+            if ultima is not None and ultima[0] == 'goto':
+                bloque.sucesores = [bloque_de[ultima[1]]]
+            elif ultima is not None and ultima[0] == 'si_falso':
+                bloque.sucesores = [bloque_de[ultima[2]]]
+                if siguiente < len(self.bloques) and siguiente not in bloque.sucesores:
+                    bloque.sucesores.append(siguiente)
+            elif siguiente < len(self.bloques):
+                bloque.sucesores = [siguiente]
+            for sucesor in bloque.sucesores:
+                self.bloques[sucesor].predecesores.append(bloque.indice)
+
+    def postorden_inverso(self):
+        """Bloques alcanzables desde la entrada en postorden inverso"""
+        visitados = {0}
+        orden = []
+        pila = [(0, iter(self.bloques[0].sucesores))]
+        while pila:
+            indice, pendientes = pila[-1]
+            for sucesor in pendientes:
+                if sucesor not in visitados:
+                    visitados.add(sucesor)
+                    pila.append((sucesor, iter(self.bloques[sucesor].sucesores)))
+                    break
+            else:
+                pila.pop()
+                orden.append(indice)
+        orden.reverse()
+        return orden
+
+    # ========== DOMINADORES ==========
+
+    def _calcular_dominadores(self):
+        # Cooper, Harvey y Kennedy: dominador inmediato de cada bloque alcanzable
+        orden = self.postorden_inverso()
+        posicion = {indice: i for i, indice in enumerate(orden)}
+        idom = [None] * len(self.bloques)
+        idom[0] = 0
+
+        def interseccion(a, b):
+            while a != b:
+                while posicion[a] > posicion[b]:
+                    a = idom[a]
+                while posicion[b] > posicion[a]:
+                    b = idom[b]
+            return a
+
+        cambio = True
+        while cambio:
+            cambio = False
+            for indice in orden[1:]:
+                nuevo = None
+                for pred in self.bloques[indice].predecesores:
+                    if idom[pred] is None:
+                        continue
+                    nuevo = pred if nuevo is None else interseccion(pred, nuevo)
+                if idom[indice] != nuevo:
+                    idom[indice] = nuevo
+                    cambio = True
+        return idom
+
+    def domina(self, a, b):
+        """True si el bloque a domina al bloque b"""
+        if self.idom[b] is None:
+            return False
+        while b != a:
+            if b == 0:
+                return False
+            b = self.idom[b]
+        return True
+
+    def dominadores(self, indice):
+        """Conjunto de bloques que dominan a 'indice' (incluido él mismo)"""
+        if self.idom[indice] is None:
+            return set()
+        resultado = {indice}
+        while indice != 0:
+            indice = self.idom[indice]
+            resultado.add(indice)
+        return resultado
+
+    def aristas_retroceso(self):
+        """Aristas (origen, cabecera) donde la cabecera domina al origen: bucles naturales"""
+        return [(bloque.indice, sucesor)
+                for bloque in self.bloques
+                for sucesor in bloque.sucesores
+                if self.domina(sucesor, bloque.indice)]
+
+    # ========== ANÁLISIS DE VIDA ==========
+
+    def analizar_vida(self):
+        """Calcula usos/definiciones y variables vivas a la entrada y salida de cada bloque"""
+        for bloque in self.bloques:
+            bloque.usos = set()
+            bloque.definiciones = set()
+            for inst in bloque.instrucciones:
+                for operando in usos(inst):
+                    if not es_literal(operando) and operando not in bloque.definiciones:
+                        bloque.usos.add(operando)
+                destino = definicion(inst)
+                if destino is not None:
+                    bloque.definiciones.add(destino)
+            bloque.vivas_entrada = set()
+            bloque.vivas_salida = set()
+
+        # Iteración hacia atrás hasta punto fijo
+        pendientes = list(range(len(self.bloques)))
+        en_cola = set(pendientes)
+        while pendientes:
+            bloque = self.bloques[pendientes.pop()]
+            en_cola.discard(bloque.indice)
+            salida = set()
+            for sucesor in bloque.sucesores:
+                salida |= self.bloques[sucesor].vivas_entrada
+            entrada = bloque.usos | (salida - bloque.definiciones)
+            bloque.vivas_salida = salida
+            if entrada != bloque.vivas_entrada:
+                bloque.vivas_entrada = entrada
+                for pred in bloque.predecesores:
+                    if pred not in en_cola:
+                        en_cola.add(pred)
+                        pendientes.append(pred)
+        return self
@@ -0,0 +1,19 @@
+# ================== ERRORES DE COMPILACIÓN ==================
+# El parser y el analizador semántico lanzan estas excepciones en lugar de
+# terminar el proceso: así un programa con errores no tumba a quien compila
+# dentro de un proceso de larga vida (servidor, tests en paralelo, sesión
+# incremental). str(error) es el mensaje que antes se imprimía.
+
+
+class ErrorCompilacion(Exception):
+    """Error en el programa fuente que impide compilarlo"""
+
+
+class ErrorSintactico(ErrorCompilacion):
+    def __init__(self, mensaje, linea=None):
+        super().__init__(mensaje)
+        self.linea = linea
+
+
+class ErrorSemantico(ErrorCompilacion):
+    pass
@@ -0,0 +1,317 @@
+# ================== COMPILACIÓN INCREMENTAL ==================
+# Sesión que conserva entre ediciones el AST, el resultado semántico y el TAC
+# de cada sentencia de nivel superior ("unidad"). Al editar el fuente:
+#
+#   1. Léxico: se re-tokeniza desde el inicio de la unidad anterior a la
+#      editada y se para en el primer fin de unidad posterior a la edición
+#      donde el nuevo flujo de tokens vuelve a coincidir con el viejo (el
+#      resto del texto no cambió, así que sus tokens tampoco).
+#   2. Sintáctico: solo se parsean esos tokens. Si el parser llega al final
+#      de la región a mitad de una sentencia (p. ej. se abrió una llave) la
+#      región se amplía hasta el siguiente punto de coincidencia.
+#   3. Semántico: si las unidades nuevas declaran exactamente lo mismo que las
+#      reemplazadas, solo se analizan ellas; si no (o si había errores), se
+#      repasa el programa entero, que sigue sin re-tokenizar ni re-parsear.
+#   4. TAC: solo se genera para las unidades nuevas. Los contadores de
+#      temporales y etiquetas nunca retroceden, así que los nombres de las
+#      unidades viejas y nuevas no chocan.
+
+import bisect
+import contextlib
+import io
+
+from .errors import ErrorSintactico, ErrorSemantico
+from .lexer import AnalizadorLexico, Token
+from .parser import AnalizadorSintactico, VarDecl, Block, IfStatement, WhileStatement
+from .semantic import AnalizadorSemanticoAST
+from .tac_generator import TACGenerator
+
+_SEPARACION_ORDEN = float(1 << 20)  # Hueco inicial entre claves de orden de unidades
+_BLOQUE_PREFIJO = 1 << 12
+
+
+class Unidad:
+    """Sentencia de nivel superior con su AST, declaraciones y TAC"""
+
+    def __init__(self, nodo, orden):
+        self.nodo = nodo
+        self.orden = orden      # Clave creciente en el orden del programa
+        self.declara = _declaraciones(nodo)  # {nombre: tipo}
+        self.tac = []
+
+
+def _declaraciones(nodo):
+    declara = {}
+    pendientes = [nodo]
+    while pendientes:
+        nodo = pendientes.pop()
+        if isinstance(nodo, VarDecl):
+            declara.setdefault(nodo.var_token.valor, nodo.tipo_token.valor)
+        elif isinstance(nodo, Block):
+            pendientes.extend(reversed(nodo.statements))
+        elif isinstance(nodo, IfStatement):
+            if nodo.false_branch:
+                pendientes.append(nodo.false_branch)
+            pendientes.append(nodo.true_branch)
+        elif isinstance(nodo, WhileStatement):
+            pendientes.append(nodo.body)
+    return declara
+
+
+class _TablaVisible(dict):
+    """Tabla de símbolos vista desde una unidad: lo que ella misma declara
+    (en el dict) más lo declarado por unidades anteriores"""
+
+    def __init__(self, declaradas, orden):
+        super().__init__()
+        self.declaradas = declaradas
+        self.orden = orden
+
+    def _anterior(self, nombre):
+        entrada = self.declaradas.get(nombre)
+        if entrada is not None and entrada[1].orden < self.orden:
+            return entrada
+        return None
+
+    def __contains__(self, nombre):
+        return dict.__contains__(self, nombre) or self._anterior(nombre) is not None
+
+    def __getitem__(self, nombre):
+        if dict.__contains__(self, nombre):
+            return dict.__getitem__(self, nombre)
+        entrada = self._anterior(nombre)
+        if entrada is None:
+            raise KeyError(nombre)
+        return entrada[0]
+
+
+def _prefijo_comun(a, b):
+    # Longitud del prefijo común comparando por bloques (la comparación de
+    # cadenas es en C; solo el último bloque se recorre carácter a carácter)
+    limite = min(len(a), len(b))
+    i = 0
+    while i < limite and a[i:i + _BLOQUE_PREFIJO] == b[i:i + _BLOQUE_PREFIJO]:
+        i += _BLOQUE_PREFIJO
+    i = min(i, limite)
+    while i > 0 and a[:i] != b[:i]:
+        i -= 1
+    while i < limite and a[i] == b[i]:
+        i += 1
+    return i
+
+
+class SesionIncremental:
+    def __init__(self):
+        self.lexico = AnalizadorLexico()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.semantico = AnalizadorSemanticoAST()
+        self.generador = TACGenerator()
+        self.texto = ""
+        self.unidades = []
+        self.fines = []        # Posición (en self.texto) donde termina cada unidad
+        self.declaradas = {}   # nombre -> (tipo, unidad que lo declara)
+        self.error = None
+        self._valida = False   # False: el texto no corresponde a self.unidades
+        self.ultima_edicion = {}
+
+    # ========== API ==========
+
+    def cargar(self, texto):
+        """Compila el texto completo; devuelve True si no hay errores"""
+        self.texto = texto
+        self.unidades = []
+        self.fines = []
+        tokens, posiciones, _ = self._tokenizar(0, None)
+        resultado, _, mensaje = self._parsear(tokens)
+        if resultado is None:
+            return self._fallo_sintactico(mensaje)
+
+        self.unidades = [Unidad(nodo, (i + 1) * _SEPARACION_ORDEN)
+                         for i, (nodo, _) in enumerate(resultado)]
+        self.fines = [posiciones[fin - 1] for _, fin in resultado]
+        for unidad in self.unidades:
+            self._generar(unidad)
+        self._valida = True
+        self.ultima_edicion = {'unidades': len(self.unidades), 'tokens': len(tokens),
+                               'semantico': 'completo'}
+        return self._analizar_todo()
+
+    def actualizar(self, texto):
+        """Recibe el texto nuevo completo y recompila solo la parte que cambió"""
+        prefijo = _prefijo_comun(self.texto, texto)
+        maximo = min(len(self.texto), len(texto)) - prefijo
+        sufijo = _prefijo_comun(self.texto[::-1][:maximo], texto[::-1][:maximo])
+        return self.editar(prefijo, len(self.texto) - sufijo,
+                           texto[prefijo:len(texto) - sufijo])
+
+    def editar(self, inicio, fin, reemplazo):
+        """Sustituye self.texto[inicio:fin] por 'reemplazo' y recompila lo afectado"""
+        texto = self.texto[:inicio] + reemplazo + self.texto[fin:]
+        if not self._valida:
+            return self.cargar(texto)
+        delta = len(reemplazo) - (fin - inicio)
+
+        # 1. Región: desde la unidad anterior a la editada (un 'else' añadido
+        # pertenece al 'if' de antes)
+        primera = max(0, bisect.bisect_right(self.fines, inicio) - 1)
+        inicio_region = self.fines[primera - 1] if primera > 0 else 0
+        self.texto = texto
+        region = self._reparsear_region(inicio_region, fin, delta)
+        if region is None:
+            return False
+        ultima, resultado, posiciones, n_tokens = region
+
+        # 2. Sustituir las unidades [primera, ultima] por las nuevas
+        anterior = self.unidades[primera - 1].orden if primera > 0 else 0.0
+        siguiente = self.unidades[ultima + 1].orden if ultima + 1 < len(self.unidades) \
+            else anterior + (len(resultado) + 1) * _SEPARACION_ORDEN
+        paso = (siguiente - anterior) / (len(resultado) + 1)
+        nuevas = [Unidad(nodo, anterior + (i + 1) * paso) for i, (nodo, _) in enumerate(resultado)]
+        viejas = self.unidades[primera:ultima + 1]
+        self.unidades[primera:ultima + 1] = nuevas
+        # Desplazar los fines posteriores es O(n) pero en C (map sobre enteros)
+        self.fines[primera:] = [posiciones[f - 1] for _, f in resultado] + \
+            list(map(delta.__add__, self.fines[ultima + 1:]))
+        if paso < 1e-6:
+            for i, unidad in enumerate(self.unidades):
+                unidad.orden = (i + 1) * _SEPARACION_ORDEN
+
+        for unidad in nuevas:
+            self._generar(unidad)
+        self.ultima_edicion = {'unidades': len(nuevas), 'tokens': n_tokens}
+
+        # 3. Semántico: parcial si las declaraciones no cambiaron
+        declaraban = {}
+        for unidad in viejas:
+            declaraban.update(unidad.declara)
+        declaran = {}
+        for unidad in nuevas:
+            declaran.update(unidad.declara)
+        if self.error is None and declaraban == declaran:
+            self.ultima_edicion['semantico'] = 'parcial'
+            return self._analizar_unidades(nuevas)
+        self.ultima_edicion['semantico'] = 'completo'
+        return self._analizar_todo()
+
+    def lineas_tac(self):
+        """Líneas de TAC del programa completo, o None si hay errores"""
+        if self.error is not None:
+            return None
+        return [linea for unidad in self.unidades for linea in unidad.tac]
+
+    def tac(self):
+        lineas = self.lineas_tac()
+        return None if lineas is None else "\n".join(lineas)
+
+    # ========== LÉXICO Y SINTÁCTICO ==========
+
+    def _tokenizar(self, inicio, parada):
+        """Tokens desde 'inicio'; 'parada(fin)' puede cortar tras cualquier token.
+        Devuelve (tokens terminados en EOF, posiciones de fin, si se cortó)."""
+        posiciones = []
+        linea = self.texto.count('\n', 0, inicio) + 1
+        tokens = []
+        for token in self.lexico.escanear_desde(self.texto, inicio, linea, posiciones):
+            tokens.append(token)
+            if token.tipo != 'EOF' and parada is not None and parada(posiciones[-1]):
+                tokens.append(Token('EOF', 'EOF', token.linea))
+                return tokens, posiciones, True
+        return tokens, posiciones, False
+
+    def _parsear(self, tokens):
+        """(lista de (nodo, tokens consumidos), error en EOF, mensaje) para tokens
+        que acaban en EOF; la lista es None si hubo error sintáctico"""
+        parser = AnalizadorSintactico(tokens)
+        resultado = []
+        try:
+            while parser.token_actual.tipo != 'EOF':
+                nodo = parser.parse_statement()
+                resultado.append((nodo, parser.pos))
+        except ErrorSintactico as e:
+            return None, parser.token_actual.tipo == 'EOF', str(e)
+        return resultado, False, None
+
+    def _reparsear_region(self, inicio_region, fin_edicion, delta):
+        """Re-tokeniza y parsea desde 'inicio_region' hasta volver a coincidir con
+        el texto viejo. Devuelve (última unidad vieja reemplazada, [(nodo, tokens
+        consumidos)], posiciones de fin de los tokens, número de tokens) o None."""
+        # Fines de unidades viejas posteriores a la edición: puntos donde el
+        # flujo de tokens nuevo puede volver a coincidir con el viejo
+        fines = self.fines
+        estado = {'j': bisect.bisect_right(fines, fin_edicion), 'pasados': 0, 'espera': 1}
+
+        def parada(fin_token):
+            while estado['j'] < len(fines) and fines[estado['j']] + delta < fin_token:
+                estado['j'] += 1
+            if estado['j'] < len(fines) and fines[estado['j']] + delta == fin_token:
+                # Tras cada intento fallido se deja pasar el doble de unidades
+                # antes de volver a parsear: una llave sin cerrar cuesta O(n), no O(n²)
+                estado['pasados'] += 1
+                if estado['pasados'] >= estado['espera']:
+                    return True
+                estado['j'] += 1
+            return False
+
+        tokens = []
+        posiciones = []
+        inicio = inicio_region
+        while True:
+            nuevos, nuevas_posiciones, cortado = self._tokenizar(inicio, parada)
+            tokens = tokens[:-1] + nuevos  # Sin el EOF del intento anterior
+            posiciones.extend(nuevas_posiciones)
+            resultado, error_en_eof, mensaje = self._parsear(tokens)
+            if resultado is not None:
+                ultima = estado['j'] if cortado else len(self.unidades) - 1
+                return ultima, resultado, posiciones, len(tokens)
+            if not (cortado and error_en_eof):
+                self._fallo_sintactico(mensaje)
+                return None
+            # La región acabó a mitad de una sentencia: se amplía
+            inicio = posiciones[-1]
+            estado['j'] += 1
+            estado['pasados'] = 0
+            estado['espera'] *= 2
+
+    def _fallo_sintactico(self, mensaje):
+        self.error = mensaje or "Error Sintáctico"
+        self._valida = False  # La próxima edición recompila todo
+        return False
+
+    # ========== SEMÁNTICO Y TAC ==========
+
+    def _analizar(self, unidad, tabla):
+        self.semantico.tabla_simbolos = tabla
+        try:
+            self.semantico.visit(unidad.nodo)
+        except ErrorSemantico as e:
+            self.error = str(e)
+            return False
+        return True
+
+    def _analizar_todo(self):
+        # Igual que AnalizadorSemanticoAST.analizar sobre el programa completo
+        self.error = None
+        self.declaradas = {}
+        self.semantico.slots = {}
+        tabla = {}
+        for unidad in self.unidades:
+            if not self._analizar(unidad, tabla):
+                return False
+            for nombre, tipo in unidad.declara.items():
+                self.declaradas.setdefault(nombre, (tipo, unidad))
+        return True
+
+    def _analizar_unidades(self, unidades):
+        # Las declaraciones son las mismas: solo cambia qué unidad las hace
+        for unidad in unidades:
+            for nombre, tipo in unidad.declara.items():
+                self.declaradas[nombre] = (tipo, unidad)
+        for unidad in unidades:
+            if not self._analizar(unidad, _TablaVisible(self.declaradas, unidad.orden)):
+                return False
+        return True
+
+    def _generar(self, unidad):
+        self.generador.instructions = []
+        self.generador.visit(unidad.nodo)
+        unidad.tac = self.generador.instructions
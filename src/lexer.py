@@ -1,6 +1,7 @@
 # ================== 1. ANALIZADOR LÉXICO (FINAL) ==================
 
 import re
+import sys
 
 
 class AnalizadorLexico:
@@ -39,47 +40,95 @@ class AnalizadorLexico:
         self.tipos_token = [tipo for _, tipo in rules]
 
     def tokenizar(self, codigo):
-        tokens = []
-        linea = 1
+        return list(self._tokens_de_texto(codigo))
 
-        for match in self.patron_token.finditer(codigo):
-            tipo = None
-            valor = match.group(0)
+    def iter_tokens(self, fileobj, tam_bloque=1 << 16):
+        """Genera los tokens de un archivo de texto leyéndolo por bloques.
 
-            # ********** CORRECCIÓN DEL ÍNDICE APLICADA (i + 1) **********
-            for i, tipo_sub in enumerate(self.tipos_token):
-                if match.group(i + 1):  # <-- CAMBIO CLAVE
-                    tipo = tipo_sub
-                    break
-            # ************************************************************
+        La memoria usada no depende del tamaño del archivo: solo se guarda el
+        bloque actual y el trozo final que aún puede continuar en el siguiente.
+        """
+        pendiente = ''
+        linea = 1
+        while True:
+            bloque = fileobj.read(tam_bloque)
+            final = not bloque
+            texto = pendiente + bloque
+            linea, consumido = yield from self._escanear(texto, linea, final)
+            pendiente = texto[consumido:]
+            if final:
+                break
+        yield Token('EOF', 'EOF', linea)
+
+    def _tokens_de_texto(self, codigo):
+        linea, _ = yield from self._escanear(codigo, 1, True)
+        yield Token('EOF', 'EOF', linea)
+
+    def escanear_desde(self, texto, inicio, linea, posiciones):
+        """Genera los tokens de 'texto' a partir de la posición 'inicio' (que está
+        en la línea 'linea'); añade a 'posiciones' dónde termina cada token.
+        Lo usa la compilación incremental para re-tokenizar solo una región."""
+        linea, _ = yield from self._escanear(texto, linea, True, inicio, posiciones)
+        yield Token('EOF', 'EOF', linea)
+
+    def _escanear(self, texto, linea, final, inicio=0, posiciones=None):
+        """Genera los tokens de 'texto' y devuelve (línea, posición consumida).
+
+        Si 'final' es False el texto continúa en otro bloque: la coincidencia
+        que toca el final del texto no se emite (puede ser un token cortado) y
+        queda sin consumir junto con lo que venga detrás.
+        """
+        tipos_token = self.tipos_token
+        palabras_reservadas = self.palabras_reservadas
+        mapa_tokens = self.mapa_tokens
+        intern = sys.intern
+        limite = len(texto)
+        consumido = inicio
+
+        for match in self.patron_token.finditer(texto, inicio):
+            fin = match.end()
+            if fin == limite and not final:
+                break
+            consumido = fin
+
+            # Cada regla tiene un único grupo de captura: lastindex la identifica
+            tipo = tipos_token[match.lastindex - 1]
+            valor = match.group()
 
             if tipo is None:
                 if '\n' in valor:
                     linea += valor.count('\n')
                 continue
 
-            tipo_token = None
-            if tipo == 'KEYWORD':
-                tipo_token = self.palabras_reservadas.get(valor)
-            elif tipo == 'ID':
+            # Identificadores, operadores y palabras reservadas se internan: todos
+            # los tokens con el mismo texto comparten un único objeto str
+            if tipo == 'ID':
                 tipo_token = 'ID'
+                valor = intern(valor)
+            elif tipo == 'OPERADOR_SIMPLE' or tipo == 'OPERADOR_MULTI':
+                tipo_token = mapa_tokens.get(valor)
+                valor = intern(valor)
             elif tipo == 'NUMERO_ENTERO':
                 tipo_token = 'LITERAL_ENTERO'
-            elif tipo == 'OPERADOR_MULTI' or tipo == 'OPERADOR_SIMPLE':
-                tipo_token = self.mapa_tokens.get(valor)
+            else:
+                tipo_token = palabras_reservadas.get(valor)
+                valor = intern(valor)
 
             if tipo_token is None:
                 print(
                     f"Advertencia Léxica en línea {linea}: Token no reconocido '{valor}' (tipo {tipo}) ignorado.")
                 continue
 
-            tokens.append(Token(tipo_token, valor, linea))
+            if posiciones is not None:
+                posiciones.append(fin)
+            yield Token(tipo_token, valor, linea)
 
-        tokens.append(Token('EOF', 'EOF', linea))
-        return tokens
+        return linea, consumido
 
 
 class Token:
+    __slots__ = ('tipo', 'valor', 'linea')
+
     def __init__(self, tipo, valor, linea):
         self.tipo = tipo
         self.valor = valor
@@ -0,0 +1,374 @@
+# ================== OPTIMIZACIÓN DE BUCLES ==================
+# Trabaja sobre los bucles naturales que genera visit_WhileStatement:
+#
+#   Lstart:
+#     <condición>
+#     if c == false goto Lend
+#     <cuerpo>
+#     goto Lstart
+#   Lend:
+#
+# De dentro hacia fuera, a cada bucle se le aplica:
+#   - desenrollado completo si el contador da un número pequeño y constante
+#     de vueltas ('i := 0' antes del bucle, 'i < K' y 'i := i + c' en el cuerpo)
+#   - extracción de cálculos invariantes a un preencabezado (antes de Lstart)
+#   - reducción de fuerza: 'tN := i * k' con i variable de inducción pasa a
+#     ser una copia de un acumulador que se incrementa junto con i
+
+import itertools
+import re
+
+from .vm import OPERADORES, _FUNCIONES
+from .cfg import GrafoFlujo
+from .tac_ir import (definicion, usos, es_ejecutable, es_literal, literal,
+                     contar_lecturas)
+
+_MAX_VUELTAS = 8        # Vueltas máximas para desenrollar un bucle
+_MAX_DESENROLLADO = 64  # Instrucciones máximas que puede producir el desenrollado
+_MAX_RONDAS = 10
+
+_COMPARACIONES = {'<', '<=', '>', '>=', '==', '!='}
+_NUMERADO = re.compile(r'([tL])(\d+)$')
+
+
+class Bucle:
+    """Bucle con el patrón de while: posiciones dentro de la lista de instrucciones"""
+
+    def __init__(self, inicio, prueba, fin, cabecera):
+        self.inicio = inicio      # Etiqueta Lstart
+        self.prueba = prueba      # 'if c == false goto Lend'
+        self.fin = fin            # 'goto Lstart'
+        self.cabecera = cabecera  # Bloque básico de Lstart
+
+    def contiene(self, otro):
+        return self.inicio <= otro.inicio and otro.fin <= self.fin
+
+
+class _Nombres:
+    """Nombres nuevos de temporales y etiquetas que no chocan con los existentes"""
+
+    def __init__(self, instrucciones):
+        mayor = {'t': 0, 'L': 0}
+        for inst in instrucciones:
+            if inst[0] == 'etiqueta' or inst[0] == 'goto':
+                nombres = (inst[1],)
+            elif inst[0] == 'si_falso':
+                nombres = (inst[2],)
+            else:
+                nombres = usos(inst) + (definicion(inst),)
+            for nombre in nombres:
+                numerado = _NUMERADO.match(nombre or '')
+                if numerado:
+                    prefijo, numero = numerado.groups()
+                    mayor[prefijo] = max(mayor[prefijo], int(numero))
+        self._temporales = itertools.count(mayor['t'] + 1)
+        self._etiquetas = itertools.count(mayor['L'] + 1)
+
+    def temporal(self):
+        return f"t{next(self._temporales)}"
+
+    def etiqueta(self):
+        return f"L{next(self._etiquetas)}"
+
+
+# ========== DETECCIÓN ==========
+
+def _destino_salto(inst):
+    if inst[0] == 'goto':
+        return inst[1]
+    if inst[0] == 'si_falso':
+        return inst[2]
+    return None
+
+
+def encontrar_bucles(instrucciones, grafo):
+    """Bucles con el patrón de while, ordenados de dentro hacia fuera"""
+    posiciones = []  # Posición en la lista de la primera instrucción de cada bloque
+    posicion = 0
+    for bloque in grafo.bloques:
+        posiciones.append(posicion)
+        posicion += len(bloque.instrucciones)
+
+    etiquetas = {inst[1]: i for i, inst in enumerate(instrucciones) if inst[0] == 'etiqueta'}
+    saltos = {}  # etiqueta -> posiciones de los saltos que llegan a ella
+    for i, inst in enumerate(instrucciones):
+        destino = _destino_salto(inst)
+        if destino is not None:
+            saltos.setdefault(destino, []).append(i)
+
+    bucles = []
+    for origen, cabecera in grafo.aristas_retroceso():
+        bloque = grafo.bloques[origen]
+        fin = posiciones[origen] + len(bloque.instrucciones) - 1
+        if instrucciones[fin][0] != 'goto':
+            continue
+        inicio = etiquetas[instrucciones[fin][1]]
+        if saltos[instrucciones[inicio][1]] != [fin]:
+            continue  # La cabecera solo debe alcanzarse desde fuera o por el retroceso
+
+        # Primera instrucción de salto tras la cabecera: la prueba de salida
+        prueba = inicio + 1
+        while prueba < fin and _destino_salto(instrucciones[prueba]) is None:
+            if instrucciones[prueba][0] == 'etiqueta':
+                break
+            prueba += 1
+        if instrucciones[prueba][0] != 'si_falso':
+            continue
+        salida = instrucciones[prueba][2]
+        siguiente = fin + 1
+        while siguiente < len(instrucciones) and instrucciones[siguiente][0] == 'etiqueta' \
+                and instrucciones[siguiente][1] != salida:
+            siguiente += 1
+        if siguiente == len(instrucciones) or instrucciones[siguiente] != ('etiqueta', salida):
+            continue
+
+        # Región cerrada: ningún salto entra al cuerpo desde fuera ni sale de él
+        # salvo hacia Lend
+        if _region_cerrada(instrucciones, inicio, fin, salida, etiquetas, saltos):
+            bucles.append(Bucle(inicio, prueba, fin, cabecera))
+
+    # Los internos (que empiezan más tarde y acaban antes) primero
+    bucles.sort(key=lambda b: (b.fin - b.inicio, b.inicio))
+    return bucles
+
+
+def _region_cerrada(instrucciones, inicio, fin, salida, etiquetas, saltos):
+    for i in range(inicio + 1, fin):
+        inst = instrucciones[i]
+        if inst[0] == 'etiqueta':
+            if any(not inicio <= j <= fin for j in saltos.get(inst[1], ())):
+                return False
+        destino = _destino_salto(inst)
+        if destino is not None and destino != salida \
+                and not inicio <= etiquetas[destino] <= fin:
+            return False
+    return True
+
+
+# ========== TRANSFORMACIONES ==========
+
+def _definiciones(instrucciones):
+    conteo = {}
+    for inst in instrucciones:
+        destino = definicion(inst)
+        if destino is not None:
+            conteo[destino] = conteo.get(destino, 0) + 1
+    return conteo
+
+
+def _paso_induccion(inst, variable):
+    """Incremento constante c si inst es 'variable := variable +/- c', si no None"""
+    if inst[0] != 'binop' or inst[1] != variable or inst[3] not in ('+', '-'):
+        return None
+    _, _, a, op, b = inst
+    if a == variable and _es_entero(b):
+        paso = int(b)
+    elif op == '+' and b == variable and _es_entero(a):
+        paso = int(a)
+    else:
+        return None
+    return paso if op == '+' else -paso
+
+
+def _nivel_superior(region, posicion):
+    # True si ningún salto interno puede saltarse la instrucción en 'posicion'
+    etiquetas = {inst[1]: i for i, inst in enumerate(region) if inst[0] == 'etiqueta'}
+    for i, inst in enumerate(region):
+        destino = _destino_salto(inst)
+        if destino in etiquetas and \
+                min(i, etiquetas[destino]) < posicion < max(i, etiquetas[destino]):
+            return False
+    return True
+
+
+def _desenrollar(instrucciones, bucle, temps, lecturas, nombres):
+    """Copias del cuerpo que sustituyen al bucle completo, o None si no se puede"""
+    inicio, prueba, fin = bucle.inicio, bucle.prueba, bucle.fin
+    condicion = [inst for inst in instrucciones[inicio + 1:prueba] if es_ejecutable(inst)]
+    if len(condicion) != 1 or condicion[0][0] != 'binop':
+        return None
+    _, temporal, a, op, b = condicion[0]
+    if op not in _COMPARACIONES or instrucciones[prueba][1] != temporal \
+            or temporal not in temps or lecturas.get(temporal) != 1:
+        return None
+    contador, limite = (a, b) if es_literal(b) else (b, a)
+    if es_literal(contador) or not _es_entero(limite):
+        return None
+
+    # El cuerpo cambia el contador una sola vez, en su nivel superior, y no sale
+    # antes de tiempo hacia Lend
+    cuerpo = instrucciones[prueba + 1:fin]
+    salida = instrucciones[prueba][2]
+    if any(_destino_salto(inst) == salida for inst in cuerpo):
+        return None
+    pasos = [i for i, inst in enumerate(cuerpo) if definicion(inst) == contador]
+    if len(pasos) != 1 or not _nivel_superior(cuerpo, pasos[0]):
+        return None
+    paso = _paso_induccion(cuerpo[pasos[0]], contador)
+    if not paso:
+        return None
+
+    # Valor inicial: última asignación al contador en el bloque anterior al bucle
+    inicial = None
+    for inst in reversed(instrucciones[:inicio]):
+        if inst[0] == 'etiqueta' or _destino_salto(inst) is not None:
+            break
+        if definicion(inst) == contador:
+            if inst[0] == 'copia' and _es_entero(inst[2]):
+                inicial = int(inst[2])
+            break
+    if inicial is None:
+        return None
+
+    comparar = _FUNCIONES[OPERADORES[op]]
+    limite = int(limite)
+    valor = inicial
+    vueltas = 0
+    while comparar(valor, limite) if contador == a else comparar(limite, valor):
+        vueltas += 1
+        valor += paso
+        if vueltas > _MAX_VUELTAS:
+            return None
+    ejecutables = sum(1 for inst in cuerpo if es_ejecutable(inst))
+    if vueltas * ejecutables > _MAX_DESENROLLADO:
+        return None
+
+    # Cada copia del cuerpo lleva etiquetas propias
+    locales = [inst[1] for inst in cuerpo if inst[0] == 'etiqueta']
+    desenrollado = []
+    for _ in range(vueltas):
+        nuevas = {etiqueta: nombres.etiqueta() for etiqueta in locales}
+        for inst in cuerpo:
+            if inst[0] == 'etiqueta' or inst[0] == 'goto':
+                inst = (inst[0], nuevas.get(inst[1], inst[1]))
+            elif inst[0] == 'si_falso':
+                inst = ('si_falso', inst[1], nuevas.get(inst[2], inst[2]))
+            desenrollado.append(inst)
+    return desenrollado
+
+
+def _extraer_invariantes(region, vivas_cabecera, temps, definiciones, lecturas):
+    """Separa las instrucciones invariantes de la región: (preencabezado, resto)"""
+    definidas = _definiciones(region)
+    lecturas_region = contar_lecturas(region)
+    invariantes = set()
+    preencabezado = []
+    resto = []
+    for inst in region:
+        destino = definicion(inst)
+        # Solo temporales con una única definición, que nadie lee antes de
+        # asignarlos ni fuera del bucle
+        movible = destino in temps and definiciones.get(destino) == 1 \
+            and destino not in vivas_cabecera \
+            and lecturas_region.get(destino, 0) == lecturas.get(destino, 0) \
+            and all(es_literal(op) or op in invariantes or op not in definidas
+                    for op in usos(inst))
+        # El preencabezado se ejecuta aunque el bucle no dé ninguna vuelta: la
+        # división solo se extrae con divisor constante distinto de cero
+        if movible and inst[0] == 'binop' and inst[3] == '/':
+            movible = _es_entero(inst[4]) and int(inst[4]) != 0
+        if movible:
+            invariantes.add(destino)
+            preencabezado.append(inst)
+        else:
+            resto.append(inst)
+    return preencabezado, resto
+
+
+def _reducir_fuerza(region, temps, nombres):
+    """'tN := i * k' pasa a 'tN := s', con 's := s + c*k' tras cada 'i := i + c'.
+    Devuelve (inicializaciones del preencabezado, región nueva)."""
+    definidas = _definiciones(region)
+    pasos = {}  # Variable de inducción -> incremento por vuelta
+    for inst in region:
+        destino = definicion(inst)
+        if destino is not None and definidas[destino] == 1:
+            paso = _paso_induccion(inst, destino)
+            if paso:
+                pasos[destino] = paso
+
+    def multiplicacion(inst):
+        # (variable de inducción, factor) si inst es 'tN := i * k'
+        if inst[0] != 'binop' or inst[3] != '*' or inst[1] not in temps:
+            return None
+        _, destino, a, _, b = inst
+        variable, factor = (a, b) if a in pasos else (b, a)
+        if variable not in pasos or destino == variable or not _es_entero(factor):
+            return None
+        return variable, int(factor)
+
+    acumuladores = {}  # (variable, factor) -> temporal que guarda variable * factor
+    for inst in region:
+        clave = multiplicacion(inst)
+        if clave is not None and clave not in acumuladores:
+            acumuladores[clave] = nombres.temporal()
+    if not acumuladores:
+        return [], region
+
+    resultado = []
+    for inst in region:
+        clave = multiplicacion(inst)
+        if clave is not None:
+            inst = ('copia', inst[1], acumuladores[clave])
+        resultado.append(inst)
+        destino = definicion(inst)
+        if destino in pasos:
+            for (variable, factor), acumulador in acumuladores.items():
+                if variable == destino:
+                    resultado.append(('binop', acumulador, acumulador, '+',
+                                      literal(pasos[variable] * factor)))
+    iniciales = [('binop', acumulador, variable, '*', literal(factor))
+                 for (variable, factor), acumulador in acumuladores.items()]
+    return iniciales, resultado
+
+
+def _es_entero(operando):
+    return es_literal(operando) and operando not in ('true', 'false')
+
+
+# ========== PASE COMPLETO ==========
+
+def _transformar(instrucciones, bucle, grafo, temps, definiciones, lecturas, nombres):
+    """Instrucciones que sustituyen a [inicio, fin] del bucle, o None si no cambia"""
+    desenrollado = _desenrollar(instrucciones, bucle, temps, lecturas, nombres)
+    if desenrollado is not None:
+        return desenrollado
+
+    region = instrucciones[bucle.inicio:bucle.fin + 1]
+    vivas_cabecera = grafo.bloques[bucle.cabecera].vivas_entrada
+    preencabezado, region = _extraer_invariantes(
+        region, vivas_cabecera, temps, definiciones, lecturas)
+    iniciales, region = _reducir_fuerza(region, temps, nombres)
+    if not preencabezado and not iniciales:
+        return None
+    return preencabezado + iniciales + region
+
+
+def optimizar_bucles(instrucciones, temps):
+    """Aplica desenrollado, extracción de invariantes y reducción de fuerza.
+    Devuelve (instrucciones, número de bucles transformados)."""
+    nombres = _Nombres(instrucciones)
+    transformados = 0
+    for _ in range(_MAX_RONDAS):
+        grafo = GrafoFlujo(instrucciones).analizar_vida()
+        definiciones = _definiciones(instrucciones)
+        lecturas = contar_lecturas(instrucciones)
+
+        # En cada ronda se transforman bucles disjuntos; el que contiene a uno
+        # ya transformado espera a la ronda siguiente
+        cambios = []
+        for bucle in encontrar_bucles(instrucciones, grafo):
+            if any(bucle.contiene(otro) for otro, _ in cambios):
+                continue
+            nuevas = _transformar(instrucciones, bucle, grafo, temps,
+                                  definiciones, lecturas, nombres)
+            if nuevas is not None:
+                cambios.append((bucle, nuevas))
+        if not cambios:
+            break
+
+        instrucciones = list(instrucciones)
+        for bucle, nuevas in sorted(cambios, key=lambda c: c[0].inicio, reverse=True):
+            instrucciones[bucle.inicio:bucle.fin + 1] = nuevas
+        transformados += len(cambios)
+    return instrucciones, transformados
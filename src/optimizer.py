@@ -0,0 +1,329 @@
+# ================== OPTIMIZADOR TAC ==================
+# Trabaja sobre las líneas de TAC que produce GeneradorDeCodigo y devuelve
+# líneas equivalentes con menos instrucciones.
+#
+#   -O0  sin cambios
+#   -O1  plegado de constantes y propagación de copias (por bloque básico),
+#        fusión 'tN := expr; x := tN', eliminación de temporales muertos y
+#        limpieza de saltos/etiquetas
+#   -O2  -O1 + eliminación de subexpresiones comunes por bloque básico,
+#        optimización de bucles (src/loops.py), eliminación de asignaciones
+#        muertas y reutilización de temporales guiadas por el análisis de vida
+
+import itertools
+
+from .vm import OPERADORES, OP_DIV, _FUNCIONES
+from .tac_ir import (parsear, formatear, definicion, usos, es_ejecutable, es_literal,
+                     valor_literal, literal, contar_ejecutables, contar_lecturas,
+                     temporales, renombrar)
+from .cfg import GrafoFlujo
+from .loops import optimizar_bucles
+
+_CONMUTATIVOS = {'+', '*', '==', '!=', '&&', '||'}
+_MAX_ITERACIONES = 10
+
+
+def plegar(op, a, b):
+    """Evalúa 'a op b' con literales; devuelve el literal resultado o None"""
+    codigo = OPERADORES[op]
+    izq = valor_literal(a)
+    der = valor_literal(b)
+    if codigo == OP_DIV and der == 0:
+        return None  # La división por cero se deja para tiempo de ejecución
+    return literal(_FUNCIONES[codigo](izq, der))
+
+
+# ========== PASES ==========
+
+class _EstadoBloque:
+    """Copias y expresiones disponibles dentro de un bloque básico"""
+
+    def __init__(self):
+        self.valores = {}       # variable -> operando que contiene (literal o variable)
+        self.expresiones = {}   # (a, op, b) -> variable que la contiene
+        self.guardadas = {}     # variable -> expresión que contiene
+        self.dependientes = {}  # variable -> claves de valores/expresiones que la leen
+
+    def _depende(self, variable, clave):
+        self.dependientes.setdefault(variable, []).append(clave)
+
+    def invalidar(self, variable):
+        # 'variable' cambia: se olvida todo lo que la contiene o la lee
+        self.valores.pop(variable, None)
+        clave = self.guardadas.pop(variable, None)
+        if clave is not None and self.expresiones.get(clave) == variable:
+            del self.expresiones[clave]
+        for clave in self.dependientes.pop(variable, ()):
+            if isinstance(clave, tuple):
+                self.expresiones.pop(clave, None)
+            elif self.valores.get(clave) == variable:
+                del self.valores[clave]
+
+    def copia(self, destino, origen):
+        self.valores[destino] = origen
+        if not es_literal(origen):
+            self._depende(origen, destino)
+
+    def expresion(self, clave, destino):
+        self.expresiones[clave] = destino
+        self.guardadas[destino] = clave
+        for operando in (clave[0], clave[2]):
+            if not es_literal(operando):
+                self._depende(operando, clave)
+
+
+def _clave_expresion(a, op, b):
+    # Las operaciones conmutativas comparten clave sin importar el orden
+    if op in _CONMUTATIVOS and b < a:
+        return (b, op, a)
+    return (a, op, b)
+
+
+def _optimizar_bloques(instrucciones, cse):
+    """Propagación de copias/constantes, plegado y (opcional) CSE por bloque básico"""
+    resultado = []
+    estado = _EstadoBloque()
+    for inst in instrucciones:
+        tipo = inst[0]
+        if tipo == 'etiqueta':
+            estado = _EstadoBloque()
+            resultado.append(inst)
+            continue
+        if tipo == 'comentario':
+            resultado.append(inst)
+            continue
+
+        valores = estado.valores
+        if tipo == 'binop':
+            _, destino, a, op, b = inst
+            a = valores.get(a, a)
+            b = valores.get(b, b)
+            plegado = plegar(op, a, b) if es_literal(a) and es_literal(b) else None
+            if plegado is not None:
+                inst = ('copia', destino, plegado)
+            else:
+                clave = _clave_expresion(a, op, b)
+                previa = estado.expresiones.get(clave) if cse else None
+                if previa == destino:
+                    continue  # El destino ya contiene ese valor
+                inst = ('copia', destino, previa) if previa else ('binop', destino, a, op, b)
+            estado.invalidar(destino)
+            if inst[0] == 'copia':
+                estado.copia(destino, inst[2])
+            elif cse and destino not in (a, b):
+                estado.expresion(clave, destino)
+            resultado.append(inst)
+
+        elif tipo == 'copia':
+            _, destino, origen = inst
+            origen = valores.get(origen, origen)
+            if origen == destino:
+                continue  # 'x := x'
+            estado.invalidar(destino)
+            estado.copia(destino, origen)
+            resultado.append(('copia', destino, origen))
+
+        elif tipo == 'print':
+            resultado.append(('print', valores.get(inst[1], inst[1])))
+
+        elif tipo == 'si_falso':
+            cond = valores.get(inst[1], inst[1])
+            if es_literal(cond):
+                # Condición constante: salto incondicional o nada
+                if not valor_literal(cond):
+                    resultado.append(('goto', inst[2]))
+            else:
+                resultado.append(('si_falso', cond, inst[2]))
+            estado = _EstadoBloque()
+
+        else:  # goto
+            resultado.append(inst)
+            estado = _EstadoBloque()
+    return resultado
+
+
+def _fusionar_copias(instrucciones, temps):
+    """'tN := expr' seguido de 'x := tN' (única lectura de tN) pasa a 'x := expr'"""
+    lecturas = contar_lecturas(instrucciones)
+    resultado = []
+    for inst in instrucciones:
+        if inst[0] == 'copia' and resultado:
+            previa = resultado[-1]
+            origen = inst[2]
+            if definicion(previa) == origen and origen in temps \
+                    and lecturas.get(origen) == 1:
+                resultado[-1] = (previa[0], inst[1]) + previa[2:]
+                continue
+        resultado.append(inst)
+    return resultado
+
+
+def _puede_fallar(inst):
+    # Una división cuyo divisor no es un literal distinto de cero puede
+    # detener el programa: no se quita aunque su resultado no se use
+    return inst[0] == 'binop' and inst[3] == '/' and not (
+        es_literal(inst[4]) and valor_literal(inst[4]) != 0)
+
+
+def _eliminar_temporales_muertos(instrucciones, temps):
+    """Quita asignaciones a temporales que nunca se leen (salvo las que
+    pueden fallar en ejecución)"""
+    while True:
+        lecturas = contar_lecturas(instrucciones)
+        resultado = [inst for inst in instrucciones
+                     if not (definicion(inst) in temps
+                             and inst[1] not in lecturas
+                             and not _puede_fallar(inst))]
+        if len(resultado) == len(instrucciones):
+            return resultado
+        instrucciones = resultado
+
+
+def _eliminar_asignaciones_muertas(instrucciones):
+    """Quita asignaciones (a variables o temporales) que ya no están vivas
+    después, según el análisis de vida; p. ej. las que dejan las copias
+    desenrolladas de un bucle"""
+    while True:
+        grafo = GrafoFlujo(instrucciones).analizar_vida()
+        resultado = []
+        for bloque in grafo.bloques:
+            for inst, vivas in zip(bloque.instrucciones, bloque.vivas_despues()):
+                destino = definicion(inst)
+                if destino is not None and destino not in vivas and not _puede_fallar(inst):
+                    continue
+                resultado.append(inst)
+        if len(resultado) == len(instrucciones):
+            return resultado
+        instrucciones = resultado
+
+
+def _salta_a_siguiente(instrucciones, i):
+    # True si el destino del salto en 'i' es alguna de las etiquetas que lo siguen
+    destino = ('etiqueta', instrucciones[i][-1])
+    for j in range(i + 1, len(instrucciones)):
+        siguiente = instrucciones[j]
+        if es_ejecutable(siguiente):
+            return False
+        if siguiente == destino:
+            return True
+    return False
+
+
+def _limpiar_saltos(instrucciones):
+    """Elimina código inalcanzable, saltos a la instrucción siguiente y etiquetas sin uso"""
+    # 1. Código tras un goto hasta la siguiente etiqueta
+    alcanzables = []
+    muerto = False
+    for inst in instrucciones:
+        if inst[0] == 'etiqueta':
+            muerto = False
+        if muerto and es_ejecutable(inst):
+            continue
+        alcanzables.append(inst)
+        if inst[0] == 'goto':
+            muerto = True
+
+    # 2. 'goto L' / 'if ... goto L' inmediatamente seguido de 'L:'
+    resultado = [inst for i, inst in enumerate(alcanzables)
+                 if not (inst[0] in ('goto', 'si_falso')
+                         and _salta_a_siguiente(alcanzables, i))]
+
+    # 3. Etiquetas que ya nadie referencia (une bloques básicos)
+    referenciadas = {inst[-1] for inst in resultado if inst[0] in ('goto', 'si_falso')}
+    return [inst for inst in resultado
+            if inst[0] != 'etiqueta' or inst[1] in referenciadas]
+
+
+def _reutilizar_temporales(instrucciones, temps):
+    """Asigna los temporales a pocos nombres: dos temporales comparten nombre
+    si nunca están vivos a la vez (coloreo voraz del grafo de interferencias)."""
+    grafo = GrafoFlujo(instrucciones).analizar_vida()
+    # Los leídos antes de cualquier asignación valen 0: conservan su nombre
+    fijos = grafo.bloques[0].vivas_entrada & temps
+    interferencias = {}
+    for bloque in grafo.bloques:
+        for inst, vivas in zip(bloque.instrucciones, bloque.vivas_despues()):
+            destino = definicion(inst)
+            if destino not in temps or destino in fijos:
+                continue
+            vecinos = interferencias.setdefault(destino, set())
+            for otra in vivas:
+                if otra != destino and otra in temps and otra not in fijos:
+                    vecinos.add(otra)
+                    interferencias.setdefault(otra, set()).add(destino)
+
+    # Nombres disponibles: tN que no use ninguna variable ni temporal fijo
+    ocupados = {nombre for inst in instrucciones for nombre in usos(inst)}
+    ocupados.update(definicion(inst) for inst in instrucciones)
+    ocupados = (ocupados - temps) | fijos
+    nombres_libres = (f"t{n}" for n in itertools.count(1) if f"t{n}" not in ocupados)
+    colores = []
+
+    nuevos = {}
+    for temporal in interferencias:  # Orden de primera definición
+        usados = {nuevos[v] for v in interferencias[temporal] if v in nuevos}
+        for nombre in colores:
+            if nombre not in usados:
+                break
+        else:
+            nombre = next(nombres_libres)
+            colores.append(nombre)
+        nuevos[temporal] = nombre
+
+    resultado = []
+    for inst in instrucciones:
+        inst = renombrar(inst, nuevos)
+        if inst[0] == 'copia' and inst[1] == inst[2]:
+            continue  # La copia quedó entre dos temporales fusionados
+        resultado.append(inst)
+    return resultado, len(colores) + len(fijos)
+
+
+class OptimizadorTAC:
+    def __init__(self, nivel=1):
+        self.nivel = nivel
+        self.instrucciones_antes = 0
+        self.instrucciones_despues = 0
+        self.temporales_antes = 0
+        self.temporales_despues = 0
+        self.bucles_optimizados = 0
+
+    @property
+    def eliminadas(self):
+        return self.instrucciones_antes - self.instrucciones_despues
+
+    def _simplificar(self, instrucciones, temps):
+        cse = self.nivel >= 2
+        for _ in range(_MAX_ITERACIONES):
+            previas = instrucciones
+            instrucciones = _optimizar_bloques(instrucciones, cse)
+            instrucciones = _fusionar_copias(instrucciones, temps)
+            instrucciones = _eliminar_temporales_muertos(instrucciones, temps)
+            instrucciones = _limpiar_saltos(instrucciones)
+            if instrucciones == previas:
+                break
+        return instrucciones
+
+    def optimizar(self, lineas):
+        """Recibe y devuelve una lista de líneas de TAC"""
+        instrucciones = [parsear(linea) for linea in lineas if linea.strip()]
+        self.instrucciones_antes = contar_ejecutables(instrucciones)
+
+        temps = temporales(instrucciones)
+        self.temporales_antes = self.temporales_despues = len(temps)
+
+        if self.nivel >= 1:
+            instrucciones = self._simplificar(instrucciones, temps)
+
+        if self.nivel >= 2:
+            instrucciones, self.bucles_optimizados = optimizar_bucles(instrucciones, temps)
+            if self.bucles_optimizados:
+                # Las copias desenrolladas y los acumuladores se vuelven a plegar
+                temps = temporales(instrucciones)
+                instrucciones = self._simplificar(instrucciones, temps)
+            instrucciones = _eliminar_asignaciones_muertas(instrucciones)
+            instrucciones, self.temporales_despues = _reutilizar_temporales(
+                instrucciones, temporales(instrucciones))
+
+        self.instrucciones_despues = contar_ejecutables(instrucciones)
+        return [formatear(inst) for inst in instrucciones]
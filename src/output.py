@@ -0,0 +1,135 @@
+# ================== SALIDA DEL PROGRAMA Y DIAGNÓSTICOS ==================
+# Destinos para los 'print' del programa TAC. La VM llama a escribir(valor)
+# por cada print; las salidas acumulan y vuelcan en bloque con vaciar(), que
+# la VM llama al terminar (también si la ejecución falla). Con bucles que
+# imprimen millones de valores, formatear y escribir línea a línea en stdout
+# costaba más que el propio cálculo.
+#
+#   SalidaEstandar  stdout con el formato de siempre ('OUTPUT >> valor')
+#   SalidaArchivo   mismo formato, a un archivo
+#   SalidaBytes     mismo formato, a un buffer en memoria (contenido())
+#   SalidaLista     los valores sin formatear, en la lista 'valores'
+#   SalidaNula      descarta todo (medir la VM sin coste de salida)
+#
+# Además, info() imprime los mensajes de progreso del pipeline (banners de
+# etapas, contenido del TAC...) salvo que se hayan silenciado con --quiet.
+# Los errores, la salida del programa y lo pedido explícitamente (--stats,
+# --profile...) no pasan por info().
+
+import io
+import sys
+
+PREFIJO = "OUTPUT >> "
+TAM_LOTE = 4096  # Valores acumulados antes de volcar
+
+_silencioso = False
+
+
+def silenciar(activo=True):
+    """Activa o desactiva el modo --quiet para los mensajes de info()"""
+    global _silencioso
+    _silencioso = activo
+
+
+def silenciado():
+    """True en modo --quiet: permite saltarse el trabajo de preparar un mensaje de info()"""
+    return _silencioso
+
+
+def info(*args, **kwargs):
+    """print() de los mensajes de progreso del pipeline; no hace nada en modo --quiet"""
+    if not _silencioso:
+        print(*args, **kwargs)
+
+
+class Salida:
+    """Destino base: acumula valores y los vuelca formateados en bloque"""
+
+    def __init__(self, prefijo=PREFIJO, tam_lote=TAM_LOTE):
+        self.prefijo = prefijo
+        self.tam_lote = tam_lote
+        self._pendientes = []
+
+    def escribir(self, valor):
+        self._pendientes.append(valor)
+        if len(self._pendientes) >= self.tam_lote:
+            self.vaciar()
+
+    def vaciar(self):
+        if self._pendientes:
+            prefijo = self.prefijo
+            self._volcar("".join([f"{prefijo}{valor}\n" for valor in self._pendientes]))
+            self._pendientes = []
+
+    def _volcar(self, texto):
+        raise NotImplementedError
+
+    def cerrar(self):
+        self.vaciar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+        return False
+
+
+class SalidaEstandar(Salida):
+    def _volcar(self, texto):
+        # sys.stdout se busca en cada volcado: respeta contextlib.redirect_stdout
+        sys.stdout.write(texto)
+
+
+class SalidaArchivo(Salida):
+    def __init__(self, ruta, prefijo=PREFIJO, tam_lote=TAM_LOTE):
+        super().__init__(prefijo, tam_lote)
+        self.ruta = ruta
+        self._archivo = open(ruta, 'w', encoding='utf-8')
+
+    def _volcar(self, texto):
+        self._archivo.write(texto)
+
+    def cerrar(self):
+        self.vaciar()
+        self._archivo.close()
+
+
+class SalidaBytes(Salida):
+    def __init__(self, prefijo=PREFIJO, tam_lote=TAM_LOTE):
+        super().__init__(prefijo, tam_lote)
+        self._buffer = io.BytesIO()
+
+    def _volcar(self, texto):
+        self._buffer.write(texto.encode('utf-8'))
+
+    def contenido(self):
+        self.vaciar()
+        return self._buffer.getvalue()
+
+
+class SalidaLista(Salida):
+    def __init__(self):
+        super().__init__()
+        self.valores = []
+        self.escribir = self.valores.append  # Sin formato ni volcados
+
+    def vaciar(self):
+        pass
+
+
+class SalidaNula(Salida):
+    def escribir(self, valor):
+        pass
+
+    def vaciar(self):
+        pass
+
+
+def crear_salida(destino):
+    """Salida para la opción --salida-print: '-' (stdout), 'nula' o una ruta de archivo"""
+    if destino in (None, '-'):
+        return SalidaEstandar()
+    if destino == 'nula':
+        return SalidaNula()
+    return SalidaArchivo(destino)
@@ -1,37 +1,50 @@
-import sys
+from .errors import ErrorSintactico
 # ================== 2. CLASES AST ==================
 
 
+# Nodos con __slots__ (sin __dict__ por instancia): en programas generados con
+# millones de nodos el diccionario de cada nodo era la mayor parte de la
+# memoria del AST. 'slot' lo rellena el análisis semántico.
 class ASTNode:
-    pass
+    __slots__ = ()
 
 
 class Program(ASTNode):
+    __slots__ = ('statements',)
+
     def __init__(self, statements):
         self.statements = statements
 
 
 class Statement(ASTNode):
-    pass
+    __slots__ = ()
 
 
 class Expression(ASTNode):
-    pass
+    __slots__ = ()
 
 
 class VarDecl(Statement):
+    __slots__ = ('tipo_token', 'var_token', 'slot')
+
     def __init__(self, tipo_token, var_token):
         self.tipo_token = tipo_token
         self.var_token = var_token
+        self.slot = None
 
 
 class Assignment(Statement):
+    __slots__ = ('var_token', 'expression', 'slot')
+
     def __init__(self, var_token, expression):
         self.var_token = var_token
         self.expression = expression
+        self.slot = None
 
 
 class IfStatement(Statement):
+    __slots__ = ('condition', 'true_branch', 'false_branch')
+
     def __init__(self, condition, true_branch, false_branch):
         self.condition = condition
         self.true_branch = true_branch
@@ -39,22 +52,30 @@ class IfStatement(Statement):
 
 
 class WhileStatement(Statement):
+    __slots__ = ('condition', 'body')
+
     def __init__(self, condition, body):
         self.condition = condition
         self.body = body
 
 
 class PrintStatement(Statement):
+    __slots__ = ('expression',)
+
     def __init__(self, expression):
         self.expression = expression
 
 
 class Block(Statement):
+    __slots__ = ('statements',)
+
     def __init__(self, statements):
         self.statements = statements
 
 
 class BinaryOp(Expression):
+    __slots__ = ('left', 'op_token', 'right')
+
     def __init__(self, left, op_token, right):
         self.left = left
         self.op_token = op_token
@@ -62,38 +83,51 @@ class BinaryOp(Expression):
 
 
 class UnaryOp(Expression):
+    __slots__ = ('op_token', 'right')
+
     def __init__(self, op_token, right):
         self.op_token = op_token
         self.right = right
 
 
 class Literal(Expression):
+    __slots__ = ('token',)
+
     def __init__(self, token):
         self.token = token
 
 
 class Variable(Expression):
+    __slots__ = ('token', 'slot')
+
     def __init__(self, token):
         self.token = token
+        self.slot = None
 
 
 # ================== 3. ANALIZADOR SINTÁCTICO ==================
 
+_OPERADORES_BINARIOS = frozenset(('OP_ARIT', 'OP_REL', 'OP_AND', 'OP_OR'))
+
+
 class AnalizadorSintactico:
     def __init__(self, tokens):
-        self.tokens = tokens
+        # Acepta una lista o cualquier iterador de tokens (p. ej. iter_tokens).
+        # La gramática es LL(1): solo se guarda el token actual como lookahead.
+        self.tokens = iter(tokens)
         self.pos = 0
-        self.token_actual = self.tokens[self.pos]
+        self.token_actual = next(self.tokens)
 
     def _error(self, mensaje):
-        print(
-            f"Error Sintáctico en línea {self.token_actual.linea}: {mensaje}. Se encontró: {self.token_actual.tipo}")
-        sys.exit(1)  # Termina el programa
+        linea = self.token_actual.linea
+        raise ErrorSintactico(
+            f"Error Sintáctico en línea {linea}: {mensaje}. Se encontró: {self.token_actual.tipo}",
+            linea)
 
     def _avanzar(self):
         self.pos += 1
-        if self.pos < len(self.tokens):
-            self.token_actual = self.tokens[self.pos]
+        # Al agotarse el iterador se queda en el último token (EOF)
+        self.token_actual = next(self.tokens, self.token_actual)
 
     def _consumir(self, tipo_esperado):
         if self.token_actual.tipo == tipo_esperado:
@@ -102,34 +136,77 @@ class AnalizadorSintactico:
             self._error(f"Se esperaba '{tipo_esperado}'")
 
     def parse(self):
-        statements = []
+        return Program(list(self.iter_statements()))
+
+    def iter_statements(self):
+        """Genera las sentencias de nivel superior a medida que se parsean"""
         while self.token_actual.tipo != 'EOF':
-            statements.append(self.parse_statement())
-        return Program(statements)
+            yield self.parse_statement()
 
     def parse_statement(self):
-        if self.token_actual.tipo in ('TIPO_INT', 'TIPO_BOOL'):
-            return self.parse_var_declaration()
-        elif self.token_actual.tipo == 'IF':
-            return self.parse_if_statement()
-        elif self.token_actual.tipo == 'WHILE':
-            return self.parse_while_statement()
-        elif self.token_actual.tipo == 'PRINT':
-            return self.parse_print_statement()
-        elif self.token_actual.tipo == 'ID':
-            return self.parse_assignment_statement()
-        elif self.token_actual.tipo == 'LBRACE':
-            return self.parse_block()
-        else:
-            self._error("Declaración no válida")
-
-    def parse_block(self):
-        statements = []
-        self._consumir('LBRACE')
-        while self.token_actual.tipo != 'RBRACE' and self.token_actual.tipo != 'EOF':
-            statements.append(self.parse_statement())
-        self._consumir('RBRACE')
-        return Block(statements)
+        # Sin recursión: las sentencias compuestas abiertas (bloques, if, while)
+        # esperan en 'abiertas' a que se complete su siguiente sentencia hija,
+        # así que el anidamiento de bloques no está limitado por la pila de Python
+        abiertas = []
+        while True:
+            # 1. Bajar: abrir compuestas hasta completar una sentencia simple
+            tipo = self.token_actual.tipo
+            if tipo == 'LBRACE':
+                self._avanzar()
+                abiertas.append([Block, []])
+                if self.token_actual.tipo != 'RBRACE' and self.token_actual.tipo != 'EOF':
+                    continue
+                nodo = None  # Bloque vacío: se cierra al subir
+            elif tipo == 'IF':
+                abiertas.append([IfStatement, self._condicion('IF'), None])
+                continue
+            elif tipo == 'WHILE':
+                abiertas.append([WhileStatement, self._condicion('WHILE')])
+                continue
+            elif tipo in ('TIPO_INT', 'TIPO_BOOL'):
+                nodo = self.parse_var_declaration()
+            elif tipo == 'PRINT':
+                nodo = self.parse_print_statement()
+            elif tipo == 'ID':
+                nodo = self.parse_assignment_statement()
+            else:
+                self._error("Declaración no válida")
+
+            # 2. Subir: entregar la sentencia completa a la compuesta que la espera
+            while abiertas:
+                abierta = abiertas[-1]
+                if abierta[0] is Block:
+                    if nodo is not None:
+                        abierta[1].append(nodo)
+                    if self.token_actual.tipo != 'RBRACE' and self.token_actual.tipo != 'EOF':
+                        break  # Siguiente sentencia del bloque
+                    self._consumir('RBRACE')
+                    abiertas.pop()
+                    nodo = Block(abierta[1])
+                elif abierta[0] is IfStatement:
+                    if abierta[2] is None:  # Llega la rama verdadera
+                        if self.token_actual.tipo == 'ELSE':
+                            self._avanzar()
+                            abierta[2] = nodo
+                            break  # Falta la rama else
+                        abiertas.pop()
+                        nodo = IfStatement(abierta[1], nodo, None)
+                    else:
+                        abiertas.pop()
+                        nodo = IfStatement(abierta[1], abierta[2], nodo)
+                else:
+                    abiertas.pop()
+                    nodo = WhileStatement(abierta[1], nodo)
+            else:
+                return nodo
+
+    def _condicion(self, palabra):
+        # 'if' / 'while' seguido de '(' expresión ')'
+        self._consumir(palabra)
+        self._consumir('LPAREN')
+        condicion = self.parse_expression()
+        self._consumir('RPAREN')
+        return condicion
 
     def parse_var_declaration(self):
         tipo_token = self.token_actual
@@ -147,28 +224,6 @@ class AnalizadorSintactico:
         self._consumir('PUNTOCOMA')
         return Assignment(var_token, expr)
 
-    def parse_if_statement(self):
-        self._consumir('IF')
-        self._consumir('LPAREN')
-        condicion = self.parse_expression()
-        self._consumir('RPAREN')
-        true_branch = self.parse_statement()
-
-        false_branch = None
-        if self.token_actual.tipo == 'ELSE':
-            self._avanzar()
-            false_branch = self.parse_statement()
-
-        return IfStatement(condicion, true_branch, false_branch)
-
-    def parse_while_statement(self):
-        self._consumir('WHILE')
-        self._consumir('LPAREN')
-        condicion = self.parse_expression()
-        self._consumir('RPAREN')
-        body = self.parse_statement()
-        return WhileStatement(condicion, body)
-
     def parse_print_statement(self):
         self._consumir('PRINT')
         self._consumir('LPAREN')
@@ -178,30 +233,38 @@ class AnalizadorSintactico:
         return PrintStatement(expr)
 
     def parse_expression(self):
-        nodo = self.parse_primary_expression()
-        while self.token_actual.tipo in ('OP_ARIT', 'OP_REL', 'OP_AND', 'OP_OR'):
-            op_token = self.token_actual
+        # Sin precedencia: los operadores se asocian por la izquierda. Sin
+        # recursión: al abrir '(' se guarda en 'abiertos' la parte izquierda
+        # pendiente de fuera (nodo y operador) y se empieza una expresión nueva
+        abiertos = []
+        izquierdo = operador = None
+        while True:
+            token = self.token_actual
+            tipo = token.tipo
+            if tipo == 'LPAREN':
+                self._avanzar()
+                abiertos.append((izquierdo, operador))
+                izquierdo = operador = None
+                continue
+            if tipo == 'LITERAL_ENTERO' or tipo == 'TRUE' or tipo == 'FALSE':
+                nodo = Literal(token)
+            elif tipo == 'ID':
+                nodo = Variable(token)
+            else:
+                self._error(
+                    "Expresión primaria no válida (se esperaba número, ID, 'true'/'false' o '(')")
             self._avanzar()
-            right = self.parse_primary_expression()
-            nodo = BinaryOp(left=nodo, op_token=op_token, right=right)
-        return nodo
 
-    def parse_primary_expression(self):
-        token = self.token_actual
-        if token.tipo == 'LITERAL_ENTERO':
-            self._avanzar()
-            return Literal(token)
-        elif token.tipo in ('TRUE', 'FALSE'):
-            self._avanzar()
-            return Literal(token)
-        elif token.tipo == 'ID':
-            self._avanzar()
-            return Variable(token)
-        elif token.tipo == 'LPAREN':
-            self._avanzar()
-            nodo = self.parse_expression()
-            self._consumir('RPAREN')
-            return nodo
-        else:
-            self._error(
-                "Expresión primaria no válida (se esperaba número, ID, 'true'/'false' o '(')")
+            while True:
+                if operador is not None:
+                    nodo = BinaryOp(left=izquierdo, op_token=operador, right=nodo)
+                if self.token_actual.tipo in _OPERADORES_BINARIOS:
+                    izquierdo = nodo
+                    operador = self.token_actual
+                    self._avanzar()
+                    break  # Falta el operando derecho
+                if not abiertos:
+                    return nodo
+                # Cierra un '(': lo de dentro es un operando de la expresión de fuera
+                self._consumir('RPAREN')
+                izquierdo, operador = abiertos.pop()
@@ -0,0 +1,111 @@
+# ================== EJECUCIÓN DE MUCHOS PROGRAMAS EN UN POOL ==================
+# 'compilador.py run-many' y ejecutar_muchos(): reparte programas TAC entre un
+# pool de procesos para que los trabajos de VM, que son de CPU, usen todos los
+# núcleos. Cada programa se decodifica en el proceso que lo ejecuta, y un
+# mismo TAC que llega varias veces al mismo proceso se decodifica una sola vez
+# (también la función Python de --backend py queda cacheada por proceso).
+#
+# Los resultados vuelven en el orden de entrada, con la salida del programa
+# (los valores impresos, sin formato), el error si lo hubo y tiempos por
+# programa.
+
+import contextlib
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from .output import SalidaLista
+from .py_backend import MaquinaPython
+from .tacb import cargar_tacb
+from .vm import MaquinaTAC, decodificar
+
+
+class ResultadoEjecucion:
+    """Resultado de ejecutar un programa del lote"""
+
+    def __init__(self, nombre, salida, error, instrucciones, segundos_decodificacion,
+                 segundos_ejecucion, proceso, en_cache):
+        self.nombre = nombre                  # Ruta del archivo o nombre dado al texto
+        self.salida = salida                  # Valores impresos, en orden
+        self.error = error                    # Mensaje de error o None
+        self.instrucciones = instrucciones    # Tamaño del programa decodificado
+        self.segundos_decodificacion = segundos_decodificacion
+        self.segundos_ejecucion = segundos_ejecucion
+        self.proceso = proceso                # PID del proceso que lo ejecutó
+        self.en_cache = en_cache              # Ya estaba decodificado en ese proceso
+
+    @property
+    def exito(self):
+        return self.error is None
+
+
+@lru_cache(maxsize=64)
+def _decodificar_texto(texto):
+    return decodificar(texto)
+
+
+def _cargar(ruta, texto):
+    """(ProgramaTAC, en_cache); 'texto' es None si el programa viene de 'ruta'"""
+    if texto is None:
+        if ruta.lower().endswith('.tacb'):
+            return cargar_tacb(ruta), False  # Ya decodificado: se mapea sin parsear
+        with open(ruta, 'r') as f:
+            texto = f.read()
+    aciertos = _decodificar_texto.cache_info().hits
+    programa = _decodificar_texto(texto)
+    return programa, _decodificar_texto.cache_info().hits > aciertos
+
+
+def _ejecutar_trabajo(trabajo):
+    # Se ejecuta en un proceso del pool; los banners de la VM se descartan
+    nombre, ruta, texto, backend, superinstrucciones = trabajo
+    salida = SalidaLista()
+    programa = None
+    en_cache = False
+    error = None
+    inicio = time.perf_counter()
+    decodificado = inicio
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            programa, en_cache = _cargar(ruta, texto)
+            decodificado = time.perf_counter()
+            if backend == 'py':
+                maquina = MaquinaPython(salida=salida)
+            else:
+                maquina = MaquinaTAC(superinstrucciones=superinstrucciones, salida=salida)
+            maquina.ejecutar_programa(programa)
+        except FileNotFoundError:
+            error = f"Error: No se encontró el archivo TAC '{ruta}'"
+        except ValueError as e:
+            error = f"Error: {e}"
+        except Exception as e:
+            error = f"Error de ejecución: {type(e).__name__}: {e}"
+    fin = time.perf_counter()
+    if programa is None:
+        decodificado = fin
+    instrucciones = len(programa.codigo) if programa is not None else 0
+    return ResultadoEjecucion(nombre, salida.valores, error, instrucciones,
+                              decodificado - inicio, fin - decodificado, os.getpid(), en_cache)
+
+
+def ejecutar_muchos(programas, procesos=None, backend='vm', superinstrucciones=True):
+    """Ejecuta varios programas TAC repartidos en un pool de procesos y devuelve
+    sus ResultadoEjecucion en el mismo orden. Cada elemento de 'programas' es la
+    ruta de un .tac/.tacb o un par (nombre, código TAC en texto)"""
+    trabajos = []
+    for programa in programas:
+        if isinstance(programa, tuple):
+            nombre, texto = programa
+            trabajos.append((nombre, None, texto, backend, superinstrucciones))
+        else:
+            trabajos.append((programa, programa, None, backend, superinstrucciones))
+
+    procesos = procesos or os.cpu_count() or 1
+    if procesos > 1 and len(trabajos) > 1:
+        # Varios programas por envío cuando son muchos (como compilar_lote)
+        lote = max(1, len(trabajos) // (procesos * 8))
+        with ProcessPoolExecutor(min(procesos, len(trabajos))) as ejecutor:
+            return list(ejecutor.map(_ejecutar_trabajo, trabajos, chunksize=lote))
+    return [_ejecutar_trabajo(trabajo) for trabajo in trabajos]
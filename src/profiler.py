@@ -0,0 +1,89 @@
+# ================== PERFIL DE EJECUCIÓN DE LA VM ==================
+# Resume una ejecución de MaquinaTAC(perfilar=True): instrucciones ejecutadas
+# por código de operación y por índice TAC, vueltas por etiqueta (cada vez que
+# se pasa por una etiqueta de cabecera de bucle es una iteración), total de
+# instrucciones e instrucciones por segundo.
+#
+# Los conteos se refieren siempre al programa sin fusionar, así que son los
+# mismos con y sin superinstrucciones y los índices coinciden con el TAC que
+# muestra 'run'. El bucle sin instrumentar de la VM no cambia: el perfil usa
+# el mismo bucle con contadores que --contadores.
+
+from .vm import (desensamblar, SIMBOLOS_OPERADOR, OP_COPIA, OP_SI_FALSO,
+                 OP_GOTO, OP_PRINT)
+
+NOMBRES_OPERACION = {
+    **{codigo: f"op {simbolo}" for codigo, simbolo in SIMBOLOS_OPERADOR.items()},
+    OP_COPIA: 'copia', OP_SI_FALSO: 'si_falso', OP_GOTO: 'goto', OP_PRINT: 'print',
+}
+
+
+class PerfilEjecucion:
+    def __init__(self, programa, ejecuciones, segundos):
+        self.programa = programa        # ProgramaTAC sin fusionar
+        self.ejecuciones = ejecuciones  # Veces que se ejecutó cada instrucción
+        self.segundos = segundos
+        self.total = sum(ejecuciones)
+
+    @classmethod
+    def de_maquina(cls, maquina):
+        """Perfil de la última ejecución de una MaquinaTAC(perfilar=True)"""
+        return cls(maquina.programa, maquina.ejecuciones, maquina.segundos)
+
+    @property
+    def instrucciones_por_segundo(self):
+        return self.total / self.segundos if self.segundos else 0.0
+
+    def por_operacion(self):
+        """{nombre de operación: instrucciones ejecutadas}, de más a menos"""
+        conteo = {}
+        for (op, _, _, _), veces in zip(self.programa.codigo, self.ejecuciones):
+            nombre = NOMBRES_OPERACION[op]
+            conteo[nombre] = conteo.get(nombre, 0) + veces
+        return dict(sorted(conteo.items(), key=lambda par: par[1], reverse=True))
+
+    def por_etiqueta(self):
+        """{etiqueta: veces que se pasó por ella}, de más a menos"""
+        conteo = {etiqueta: self.ejecuciones[indice]
+                  for etiqueta, indice in self.programa.etiquetas.items()
+                  if indice < len(self.ejecuciones)}
+        return dict(sorted(conteo.items(), key=lambda par: par[1], reverse=True))
+
+    def calientes(self, limite=10):
+        """[(índice, veces, instrucción TAC)] de las instrucciones más ejecutadas"""
+        texto = [linea for linea in desensamblar(self.programa) if not linea.endswith(':')]
+        orden = sorted(range(len(self.ejecuciones)), key=lambda i: self.ejecuciones[i],
+                       reverse=True)
+        return [(indice, self.ejecuciones[indice], texto[indice])
+                for indice in orden[:limite] if self.ejecuciones[indice]]
+
+    def como_dict(self, limite=10):
+        return {
+            'instrucciones': self.total,
+            'segundos': self.segundos,
+            'instrucciones_por_segundo': self.instrucciones_por_segundo,
+            'por_operacion': self.por_operacion(),
+            'por_etiqueta': self.por_etiqueta(),
+            'calientes': [{'indice': indice, 'veces': veces, 'tac': tac}
+                          for indice, veces, tac in self.calientes(limite)],
+        }
+
+    def tabla(self, limite=10):
+        """Texto legible del perfil"""
+        lineas = [
+            f"Instrucciones ejecutadas: {self.total}",
+            f"Tiempo (con contadores):  {self.segundos:.4f} s",
+            f"Instrucciones/segundo:    {self.instrucciones_por_segundo:,.0f}",
+            "",
+            f"{'operación':<12} {'ejecuciones':>12} {'%':>6}",
+        ]
+        for nombre, veces in self.por_operacion().items():
+            if veces:
+                lineas.append(f"{nombre:<12} {veces:>12} {100 * veces / self.total:>6.1f}")
+        etiquetas = [(etiqueta, veces) for etiqueta, veces in self.por_etiqueta().items() if veces]
+        if etiquetas:
+            lineas += ["", f"{'etiqueta':<12} {'vueltas':>12}"]
+            lineas += [f"{etiqueta:<12} {veces:>12}" for etiqueta, veces in etiquetas[:limite]]
+        lineas += ["", f"{'índice':>6} {'ejecuciones':>12}  instrucción"]
+        lineas += [f"{indice:>6} {veces:>12}  {tac}" for indice, veces, tac in self.calientes(limite)]
+        return "\n".join(lineas)
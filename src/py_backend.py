@@ -0,0 +1,201 @@
+# ================== BACKEND PYTHON (TAC -> función) ==================
+# Traduce un ProgramaTAC a código fuente Python, lo compila una sola vez con
+# compile() y ejecuta la función resultante. Las variables del TAC pasan a ser
+# variables locales de Python.
+
+from functools import lru_cache
+
+from .output import info
+from .vm import (MaquinaTAC, OP_COPIA, OP_DIV, OP_AND, OP_OR, OP_SI_FALSO,
+                 OP_GOTO, OP_PRINT, SIMBOLOS_OPERADOR)
+
+# CPython limita los niveles de sangría y de bucles anidados; por encima de
+# estos valores se usa el despacho por pc, que siempre tiene profundidad fija.
+_MAX_SANGRIA = 80
+_MAX_BUCLES = 18
+
+
+class _NoEstructurado(Exception):
+    """El flujo de saltos no corresponde a un if/while generado por TACGenerator"""
+
+
+class GeneradorPython:
+    def __init__(self, programa):
+        self.codigo = programa.codigo
+        self.memoria_inicial = programa.memoria_inicial
+        # Prefijo 'v_' para que ningún identificador choque con palabras de Python
+        self.nombres = {slot: f"v_{nombre}"
+                        for nombre, slot in programa.simbolos.items()}
+        # Destinos de saltos hacia atrás: cabeceras de while
+        self.cabeceras = {a for i, (op, a, _, _) in enumerate(self.codigo)
+                          if op == OP_GOTO and a <= i}
+
+    def generar(self):
+        lineas = ["def _programa(_emitir):"]
+        for nombre in self.nombres.values():
+            lineas.append(f"    {nombre} = 0")
+
+        try:
+            cuerpo = []
+            self._region(0, len(self.codigo), 1, 0, cuerpo)
+        except _NoEstructurado:
+            cuerpo = self._despacho_pc()
+        lineas.extend(cuerpo)
+
+        lineas.append(f"    return ({''.join(n + ', ' for n in self.nombres.values())})")
+        return "\n".join(lineas) + "\n"
+
+    # ========== TRADUCCIÓN DE INSTRUCCIONES ==========
+
+    def _operando(self, slot):
+        if slot in self.nombres:
+            return self.nombres[slot]
+        return repr(self.memoria_inicial[slot])
+
+    def _sentencia(self, op, a, b, c):
+        # Traduce una instrucción sin salto
+        if op == OP_COPIA:
+            return f"{self.nombres[a]} = {self._operando(b)}"
+        if op == OP_PRINT:
+            return f"_emitir({self._operando(a)})"
+        izq = self._operando(b)
+        der = self._operando(c)
+        if op == OP_DIV:
+            expr = f"int({izq} / {der})"
+        elif op == OP_AND:
+            expr = f"{izq} and {der}"
+        elif op == OP_OR:
+            expr = f"{izq} or {der}"
+        else:
+            expr = f"{izq} {SIMBOLOS_OPERADOR[op]} {der}"
+        return f"{self.nombres[a]} = {expr}"
+
+    # ========== CÓDIGO ESTRUCTURADO ==========
+
+    def _region(self, inicio, fin, nivel, bucles, salida):
+        # Traduce las instrucciones [inicio, fin); salir por el final equivale
+        # a continuar en la instrucción 'fin'
+        if nivel > _MAX_SANGRIA or bucles > _MAX_BUCLES:
+            raise _NoEstructurado
+        sangria = "    " * nivel
+        inicial = len(salida)
+        pc = inicio
+        while pc < fin:
+            if pc in self.cabeceras:
+                pc = self._while(pc, fin, nivel, bucles, salida)
+                continue
+            op, a, b, c = self.codigo[pc]
+            if op == OP_SI_FALSO:
+                pc = self._if(pc, fin, nivel, bucles, salida)
+            elif op == OP_GOTO:
+                # 'goto' a la instrucción siguiente (else vacío): no hace nada
+                if a != pc + 1:
+                    raise _NoEstructurado
+                pc += 1
+            else:
+                salida.append(sangria + self._sentencia(op, a, b, c))
+                pc += 1
+        if len(salida) == inicial:
+            salida.append(sangria + "pass")
+
+    def _if(self, pc, fin, nivel, bucles, salida):
+        # if c == false goto Lelse; ...; [goto Lend; Lelse: ...; Lend:]
+        _, cond, destino, _ = self.codigo[pc]
+        if not pc < destino <= fin:
+            raise _NoEstructurado
+        sangria = "    " * nivel
+        salida.append(f"{sangria}if {self._operando(cond)}:")
+
+        op_previo, final, _, _ = self.codigo[destino - 1]
+        if destino - 1 > pc and op_previo == OP_GOTO and destino < final <= fin:
+            self._region(pc + 1, destino - 1, nivel + 1, bucles, salida)
+            salida.append(f"{sangria}else:")
+            self._region(destino, final, nivel + 1, bucles, salida)
+            return final
+
+        self._region(pc + 1, destino, nivel + 1, bucles, salida)
+        return destino
+
+    def _while(self, cabecera, fin, nivel, bucles, salida):
+        # Lstart: <condición>; if c == false goto Lend; ...; goto Lstart; Lend:
+        pc = cabecera
+        while pc < fin and self.codigo[pc][0] not in (OP_SI_FALSO, OP_GOTO):
+            pc += 1
+        if pc == fin or self.codigo[pc][0] != OP_SI_FALSO:
+            raise _NoEstructurado
+        _, cond, salida_bucle, _ = self.codigo[pc]
+        if not pc + 1 < salida_bucle <= fin or \
+                self.codigo[salida_bucle - 1][:2] != (OP_GOTO, cabecera):
+            raise _NoEstructurado
+
+        sangria = "    " * nivel
+        salida.append(f"{sangria}while True:")
+        for i in range(cabecera, pc):
+            salida.append(f"{sangria}    {self._sentencia(*self.codigo[i])}")
+        salida.append(f"{sangria}    if not {self._operando(cond)}:")
+        salida.append(f"{sangria}        break")
+        self._region(pc + 1, salida_bucle - 1, nivel + 1, bucles + 1, salida)
+        return salida_bucle
+
+    # ========== DESPACHO POR PC ==========
+
+    def _despacho_pc(self):
+        # Un bloque básico por 'if pc == n:'; se usa cuando el flujo no es estructurado
+        total = len(self.codigo)
+        lideres = {0}
+        for i, (op, a, b, _) in enumerate(self.codigo):
+            if op == OP_GOTO:
+                lideres.update((a, i + 1))
+            elif op == OP_SI_FALSO:
+                lideres.update((b, i + 1))
+        lideres = sorted(l for l in lideres if l < total)
+
+        lineas = ["    pc = 0", "    while True:"]
+        for k, inicio in enumerate(lideres):
+            fin = lideres[k + 1] if k + 1 < len(lideres) else total
+            lineas.append(f"        if pc == {inicio}:")
+            for i in range(inicio, fin):
+                op, a, b, c = self.codigo[i]
+                if op == OP_GOTO:
+                    lineas.append(f"            pc = {a}")
+                elif op == OP_SI_FALSO:
+                    lineas.append(
+                        f"            pc = {b} if not {self._operando(a)} else {fin}")
+                else:
+                    lineas.append(f"            {self._sentencia(op, a, b, c)}")
+            if self.codigo[fin - 1][0] not in (OP_GOTO, OP_SI_FALSO):
+                lineas.append(f"            pc = {fin}")
+            lineas.append("            continue")
+        lineas.append("        break")
+        return lineas
+
+
+@lru_cache(maxsize=64)
+def _compilar_fuente(fuente):
+    espacio = {}
+    exec(compile(fuente, "<tac>", "exec"), espacio)
+    return espacio["_programa"]
+
+
+def compilar_a_python(programa):
+    """Devuelve la función Python equivalente a un ProgramaTAC (cacheada por código fuente)"""
+    return _compilar_fuente(GeneradorPython(programa).generar())
+
+
+class MaquinaPython(MaquinaTAC):
+    """Ejecuta el TAC como función Python compilada; misma salida que MaquinaTAC"""
+
+    def ejecutar_programa(self, programa):
+        funcion = compilar_a_python(programa)
+        self.labels = programa.etiquetas
+
+        info(f"\n--- [Ejecución Real] Iniciando ({len(programa.codigo)} instrucciones) ---")
+        try:
+            valores = funcion(self.salida.escribir)
+        finally:
+            self.salida.vaciar()
+        info("--- [Ejecución Real] Finalizada ---")
+
+        self.mem = list(programa.memoria_inicial)
+        for slot, valor in zip(programa.simbolos.values(), valores):
+            self.mem[slot] = valor
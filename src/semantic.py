@@ -1,29 +1,33 @@
-import sys
+from .errors import ErrorSemantico
+from .output import info
+from .visitor import VisitanteAST, postorden
 
 
-class AnalizadorSemanticoAST:
+class AnalizadorSemanticoAST(VisitanteAST):
     def __init__(self):
-        print("[Semántico] Iniciando análisis de tipos y alcances...")
+        info("[Semántico] Iniciando análisis de tipos y alcances...")
         self.tabla_simbolos = {}  # Guarda {nombre_variable: tipo}
+        # {nombre_variable: slot}: índice denso en orden de declaración. Se anota
+        # en los nodos (nodo.slot); TACGenerator lo recoge y decodificar() da a
+        # cada variable ese slot en el banco de registros de la VM
+        self.slots = {}
 
     def _error(self, mensaje):
-        print(f"Error Semántico: {mensaje}")
-        sys.exit(1)
+        raise ErrorSemantico(f"Error Semántico: {mensaje}")
 
     def analizar(self, node):
         self.visit(node)
 
-    def visit(self, node):
-        method_name = f'visit_{type(node).__name__}'
-        method = getattr(self, method_name, self.visit_unknown)
-        return method(node)
+    def _slot(self, nombre):
+        return self.slots.setdefault(nombre, len(self.slots))
 
-    def visit_unknown(self, node):
-        pass
+    # Los visit_ de sentencias con hijos son generadores: 'yield hijo' visita
+    # el hijo y devuelve su tipo; visit_BinaryOp recibe los tipos de sus dos
+    # hijos ya calculados (ver src/visitor.py)
 
     def visit_Program(self, node):
         for stmt in node.statements:
-            self.visit(stmt)
+            yield stmt
 
     def visit_VarDecl(self, node):
         nombre = node.var_token.valor
@@ -31,45 +35,53 @@ class AnalizadorSemanticoAST:
         if nombre in self.tabla_simbolos:
             self._error(f"Variable '{nombre}' ya declarada.")
         self.tabla_simbolos[nombre] = tipo
+        node.slot = self._slot(nombre)
 
     def visit_Assignment(self, node):
+        tipo_variable = self.destino_asignacion(node)
+        tipo_expr = yield node.expression
+        self.comprobar_asignacion(node, tipo_variable, tipo_expr)
+
+    # Las dos mitades de visit_Assignment (antes y después de la expresión),
+    # también usadas por el modo de una pasada (src/single_pass.py)
+    def destino_asignacion(self, node):
         nombre = node.var_token.valor
         if nombre not in self.tabla_simbolos:
             self._error(f"Variable '{nombre}' no ha sido declarada.")
+        node.slot = self._slot(nombre)
+        return self.tabla_simbolos[nombre]
 
-        tipo_variable = self.tabla_simbolos[nombre]
-        tipo_expr = self.visit(node.expression)
-
+    def comprobar_asignacion(self, node, tipo_variable, tipo_expr):
         if tipo_variable != tipo_expr:
             self._error(
-                f"No se puede asignar '{tipo_expr}' a la variable '{nombre}' de tipo '{tipo_variable}'.")
+                f"No se puede asignar '{tipo_expr}' a la variable '{node.var_token.valor}' "
+                f"de tipo '{tipo_variable}'.")
 
     def visit_IfStatement(self, node):
-        tipo_cond = self.visit(node.condition)
+        tipo_cond = yield node.condition
         if tipo_cond != 'bool':
             self._error(
                 f"La condición del 'if' debe ser bool, se recibió: {tipo_cond}")
-        self.visit(node.true_branch)
+        yield node.true_branch
         if node.false_branch:
-            self.visit(node.false_branch)
+            yield node.false_branch
 
     def visit_WhileStatement(self, node):
-        tipo_cond = self.visit(node.condition)
+        tipo_cond = yield node.condition
         if tipo_cond != 'bool':
             self._error(
                 f"La condición del 'while' debe ser bool, se recibió: {tipo_cond}")
-        self.visit(node.body)
+        yield node.body
 
     def visit_PrintStatement(self, node):
-        self.visit(node.expression)
+        yield node.expression
 
     def visit_Block(self, node):
         for stmt in node.statements:
-            self.visit(stmt)
+            yield stmt
 
-    def visit_BinaryOp(self, node):
-        tipo_izq = self.visit(node.left)
-        tipo_der = self.visit(node.right)
+    @postorden
+    def visit_BinaryOp(self, node, tipo_izq, tipo_der):
         op = node.op_token.valor
 
         if op in ['+', '-', '*', '/']:
@@ -99,4 +111,5 @@ class AnalizadorSemanticoAST:
         nombre = node.token.valor
         if nombre not in self.tabla_simbolos:
             self._error(f"Variable '{nombre}' no declarada.")
+        node.slot = self._slot(nombre)
         return self.tabla_simbolos[nombre]
@@ -0,0 +1,173 @@
+# ================== SERVIDOR DE COMPILACIÓN ==================
+# 'compilador.py serve' deja el compilador cargado en un proceso que escucha en
+# un socket Unix: los imports, la compilación de la regex del léxico y el
+# arranque del intérprete se pagan una sola vez en lugar de en cada programa.
+#
+# Protocolo: una petición JSON por línea y una respuesta JSON por línea; una
+# conexión puede enviar varias peticiones seguidas.
+#
+#   {"accion": "compile", "fuente": "...", "optimizacion": 0, "ejecutar": false,
+#    "backend": "vm"}
+#       -> {"ok": true, "tac": "...", "salida": [...], "avisos": [...]}
+#   {"accion": "run", "tac": "...", "backend": "vm"}
+#       -> {"ok": true, "salida": [...], "avisos": [...]}
+#   {"accion": "ping"} -> {"ok": true, "version": "..."}
+#
+# Si algo falla la respuesta es {"ok": false, "error": "..."} con la salida
+# producida hasta el error. Cada conexión se atiende en un proceso hijo
+# (fork): las peticiones concurrentes no se bloquean entre sí, cada una tiene
+# su propia stdout y un programa que no termina se corta por tiempo sin
+# afectar al servidor.
+#
+# Al arrancar solo se borra un socket abandonado (nadie acepta conexiones en
+# él): si ya hay un servidor escuchando o la ruta es otro tipo de archivo, el
+# servidor no arranca.
+
+import contextlib
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import tempfile
+
+from . import __version__
+from .errors import ErrorCompilacion
+from .lexer import AnalizadorLexico
+from .output import SalidaLista, silenciar
+from .parser import AnalizadorSintactico
+from .py_backend import MaquinaPython
+from .semantic import AnalizadorSemanticoAST
+from .tac_generator import TACGenerator
+from .optimizer import OptimizadorTAC
+from .vm import MaquinaTAC, decodificar
+
+RUTA_SOCKET_POR_DEFECTO = os.environ.get('MINILANG_SOCKET') or os.path.join(
+    tempfile.gettempdir(), f"minilang-{os.getuid()}.sock")
+LIMITE_POR_DEFECTO = 30  # Segundos por petición
+
+
+class TiempoAgotado(Exception):
+    pass
+
+
+def compilar_fuente(fuente, nivel_optimizacion=0, lexico=None):
+    """(líneas TAC, {variable: slot} del semántico) de un fuente en texto;
+    lanza ErrorCompilacion si tiene errores"""
+    tokens = (lexico or AnalizadorLexico()).tokenizar(fuente)
+    ast = AnalizadorSintactico(tokens).parse()
+    AnalizadorSemanticoAST().analizar(ast)
+    generador = TACGenerator()
+    lineas_tac = generador.generate(ast)
+    if nivel_optimizacion:
+        lineas_tac = OptimizadorTAC(nivel_optimizacion).optimizar(lineas_tac)
+    return lineas_tac, generador.slots
+
+
+def atender(peticion, lexico=None):
+    """Respuesta (dict) a una petición ya decodificada"""
+    accion = peticion.get('accion')
+    if accion == 'ping':
+        return {'ok': True, 'version': __version__}
+    if accion not in ('compile', 'run'):
+        return {'ok': False, 'error': f"Error: acción desconocida '{accion}'"}
+    nivel_optimizacion = peticion.get('optimizacion', 0)
+    if type(nivel_optimizacion) is not int or not 0 <= nivel_optimizacion <= 2:
+        return {'ok': False,
+                'error': f"Error: 'optimizacion' debe ser 0, 1 o 2 (se recibió {nivel_optimizacion!r})"}
+
+    respuesta = {'ok': True, 'salida': []}
+    avisos = io.StringIO()  # Advertencias léxicas y otros mensajes
+    try:
+        with contextlib.redirect_stdout(avisos):
+            if accion == 'compile':
+                lineas_tac, slots = compilar_fuente(peticion.get('fuente', ''),
+                                                    nivel_optimizacion, lexico)
+                respuesta['tac'] = "\n".join(lineas_tac)
+                if not peticion.get('ejecutar'):
+                    return respuesta
+            else:
+                lineas_tac, slots = peticion.get('tac', ''), None
+            salida = SalidaLista()
+            respuesta['salida'] = salida.valores
+            backend = peticion.get('backend', 'vm')
+            maquina = MaquinaPython(salida=salida) if backend == 'py' else MaquinaTAC(salida=salida)
+            maquina.ejecutar_programa(decodificar(lineas_tac, slots))
+    except ErrorCompilacion as e:
+        respuesta.update(ok=False, error=str(e))
+    except TiempoAgotado as e:
+        respuesta.update(ok=False, error=f"Error: {e}")
+    except Exception as e:
+        respuesta.update(ok=False, error=f"Error de ejecución: {type(e).__name__}: {e}")
+    finally:
+        respuesta['salida'] = [str(valor) for valor in respuesta['salida']]
+        respuesta['avisos'] = avisos.getvalue().splitlines()
+    return respuesta
+
+
+def _liberar_socket_abandonado(ruta):
+    """Borra 'ruta' si es el socket de un servidor que ya no escucha; si es otro
+    tipo de archivo o hay un servidor atendiendo en él, lanza FileExistsError"""
+    try:
+        modo = os.lstat(ruta).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(modo):
+        raise FileExistsError(f"'{ruta}' existe y no es un socket; no se sobrescribe")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as prueba:
+        try:
+            prueba.connect(ruta)
+        except (ConnectionRefusedError, FileNotFoundError):
+            pass  # Nadie escucha: socket de una ejecución anterior
+        else:
+            raise FileExistsError(f"ya hay un servidor escuchando en '{ruta}'")
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(ruta)
+
+
+class _Manejador(socketserver.StreamRequestHandler):
+    def handle(self):
+        for linea in self.rfile:
+            if not linea.strip():
+                continue
+            try:
+                peticion = json.loads(linea)
+            except ValueError as e:
+                respuesta = {'ok': False, 'error': f"Error: petición no es JSON válido ({e})"}
+            else:
+                if isinstance(peticion, dict):
+                    respuesta = self.server.atender_con_limite(peticion)
+                else:
+                    respuesta = {'ok': False, 'error': "Error: la petición debe ser un objeto JSON"}
+            self.wfile.write((json.dumps(respuesta, ensure_ascii=False) + "\n").encode('utf-8'))
+            self.wfile.flush()
+
+
+class ServidorCompilacion(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    def __init__(self, ruta=RUTA_SOCKET_POR_DEFECTO, limite_segundos=LIMITE_POR_DEFECTO):
+        self.ruta = ruta
+        self.limite_segundos = limite_segundos
+        self.lexico = AnalizadorLexico()  # Regex compilada una vez; los hijos la heredan
+        silenciar(True)  # Sin banners de la VM ni del semántico en el servidor
+        _liberar_socket_abandonado(ruta)
+        super().__init__(ruta, _Manejador)
+
+    def atender_con_limite(self, peticion):
+        # Se ejecuta en el proceso hijo de la conexión: la alarma solo lo afecta a él
+        def agotado(signum, frame):
+            raise TiempoAgotado(f"tiempo límite de {self.limite_segundos} s agotado")
+
+        anterior = signal.signal(signal.SIGALRM, agotado)
+        signal.alarm(self.limite_segundos)
+        try:
+            return atender(peticion, self.lexico)
+        finally:
+            signal.alarm(0)
+            signal.signal(signal.SIGALRM, anterior)
+
+    def server_close(self):
+        super().server_close()
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.ruta)
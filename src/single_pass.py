@@ -0,0 +1,102 @@
+# ================== SEMÁNTICO + TAC EN UNA PASADA ==================
+# 'compile --single-pass': comprueba tipos y emite el TAC en un solo
+# recorrido del AST en lugar de dos (AnalizadorSemanticoAST y después
+# TACGenerator sobre un AST que ya no está en caché).
+#
+# No repite las reglas de ninguno de los dos: la tabla de despacho combina,
+# para cada clase de nodo, el visit_ del semántico y el del generador, que
+# tienen la misma forma (ver src/visitor.py):
+#   hoja / postorden  se llaman los dos y el resultado es el par
+#                     (tipo, operando TAC)
+#   generador         se avanzan a la vez: ambos piden los mismos hijos en el
+#                     mismo orden, y a cada uno se le envía su mitad del par
+# El semántico va siempre primero, así que el primer error es el mismo que en
+# dos pasadas; el TAC se emite en el mismo orden y sale idéntico (lo comprueba
+# 'python run_test.py --modo una-pasada').
+
+from .semantic import AnalizadorSemanticoAST
+from .tac_generator import TACGenerator
+from .visitor import VisitanteAST, HOJA, POSTORDEN, postorden
+
+
+def _a_la_vez(semantico, generador):
+    """Generador que avanza los generadores de ambos visitantes en paralelo"""
+    tipo = valor = None
+    while True:
+        try:
+            hijo = semantico.send(tipo)
+        except StopIteration as fin:
+            try:
+                generador.send(valor)
+            except StopIteration as fin_tac:
+                return fin.value, fin_tac.value
+            raise RuntimeError("El generador TAC pide más hijos que el semántico")
+        if generador.send(valor) is not hijo:
+            raise RuntimeError("El semántico y el generador TAC piden hijos distintos")
+        tipo, valor = yield hijo
+
+
+class AnalizadorGeneradorTAC(VisitanteAST):
+    def __init__(self):
+        self.semantico = AnalizadorSemanticoAST()
+        self.generador = TACGenerator()
+
+    @classmethod
+    def _registrar(cls, clase_nodo):
+        metodo = cls.__dict__.get(f'visit_{clase_nodo.__name__}')
+        if metodo is not None:
+            return super()._registrar(clase_nodo)
+        forma, metodo_semantico = AnalizadorSemanticoAST._despacho.get(clase_nodo) \
+            or AnalizadorSemanticoAST._registrar(clase_nodo)
+        forma_tac, metodo_tac = TACGenerator._despacho.get(clase_nodo) \
+            or TACGenerator._registrar(clase_nodo)
+        if forma != forma_tac:
+            raise TypeError(f"visit_{clase_nodo.__name__} tiene forma distinta en el "
+                            f"semántico y en el generador TAC")
+
+        if forma == HOJA:
+            def metodo(self, node):
+                return metodo_semantico(self.semantico, node), metodo_tac(self.generador, node)
+        elif forma == POSTORDEN:
+            def metodo(self, node, izquierdo, derecho):
+                return (metodo_semantico(self.semantico, node, izquierdo[0], derecho[0]),
+                        metodo_tac(self.generador, node, izquierdo[1], derecho[1]))
+        else:
+            def metodo(self, node):
+                return _a_la_vez(metodo_semantico(self.semantico, node),
+                                 metodo_tac(self.generador, node))
+        cls._despacho[clase_nodo] = entrada = (forma, metodo)
+        return entrada
+
+    # Las expresiones y las asignaciones son la mayoría de los nodos: sus
+    # visit_ combinados se escriben a mano para no pasar por el envoltorio
+    # genérico, pero la emisión es la de TACGenerator (emit_binary y
+    # emit_assignment)
+
+    def visit_Literal(self, node):
+        return self.semantico.visit_Literal(node), node.token.valor
+
+    def visit_Variable(self, node):
+        return self.semantico.visit_Variable(node), node.token.valor
+
+    @postorden
+    def visit_BinaryOp(self, node, izquierdo, derecho):
+        return (self.semantico.visit_BinaryOp(node, izquierdo[0], derecho[0]),
+                self.generador.emit_binary(izquierdo[1], node.op_token.valor, derecho[1]))
+
+    def visit_Assignment(self, node):
+        semantico = self.semantico
+        tipo_variable = semantico.destino_asignacion(node)
+        tipo, valor = yield node.expression
+        semantico.comprobar_asignacion(node, tipo_variable, tipo)
+        return None, self.generador.emit_assignment(node.var_token.valor, valor)
+
+    def generate(self, ast):
+        """Líneas TAC del programa; lanza ErrorSemantico igual que analizar()"""
+        generador = self.generador
+        generador.instructions = []
+        generador.slots = {}
+        generador.temp_counter = 0
+        generador.label_counter = 0
+        self.visit(ast)
+        return generador.instructions
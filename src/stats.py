@@ -0,0 +1,127 @@
+# ================== ESTADÍSTICAS DE COMPILACIÓN ==================
+# Mide cada etapa de compilar() (lectura, léxico con la decodificación UTF-8,
+# sintáctico, semántico, TAC, optimización y escritura): tiempo real, tiempo de
+# CPU y pico de memoria reservada durante la etapa según tracemalloc, más los
+# conteos de tokens, nodos del AST e instrucciones TAC.
+#
+# Cada compilación se puede exportar como una línea JSON con la versión del
+# compilador, para ir acumulando un histórico en el que detectar regresiones.
+# tracemalloc ralentiza bastante la ejecución, así que solo se activa cuando se
+# piden estadísticas (compile --stats).
+
+import contextlib
+import json
+import time
+import tracemalloc
+
+from . import __version__
+from .parser import ASTNode
+
+
+def contar_nodos(ast):
+    """Número de nodos del AST (recorrido iterativo: no depende de la profundidad)"""
+    total = 0
+    pendientes = [ast]
+    while pendientes:
+        nodo = pendientes.pop()
+        total += 1
+        for campo in type(nodo).__slots__:  # Los nodos no tienen __dict__
+            valor = getattr(nodo, campo)
+            if isinstance(valor, ASTNode):
+                pendientes.append(valor)
+            elif isinstance(valor, list):
+                pendientes.extend(hijo for hijo in valor if isinstance(hijo, ASTNode))
+    return total
+
+
+def contar_instrucciones(codigo_tac):
+    """Instrucciones de un TAC en texto (sin etiquetas, comentarios ni líneas vacías)"""
+    return sum(1 for linea in codigo_tac.split('\n')
+               if linea.strip() and not linea.startswith('#') and not linea.endswith(':'))
+
+
+class EstadisticasCompilacion:
+    def __init__(self, fuente=None, nivel_optimizacion=0):
+        self.fuente = fuente
+        self.nivel_optimizacion = nivel_optimizacion
+        self.fecha = time.strftime('%Y-%m-%dT%H:%M:%S')
+        self.etapas = []   # [{'etapa', 'segundos', 'cpu', 'pico_bytes'}] en orden
+        self.conteos = {}  # tokens, nodos_ast, instrucciones, ...
+        self.pico_total = 0  # Máximo de memoria trazada en cualquier momento
+        self._iniciado_aqui = False
+
+    def __enter__(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._iniciado_aqui = True
+        return self
+
+    def __exit__(self, *excepcion):
+        if self._iniciado_aqui:
+            tracemalloc.stop()
+            self._iniciado_aqui = False
+        return False
+
+    @contextlib.contextmanager
+    def etapa(self, nombre):
+        """Mide el bloque como la etapa 'nombre'"""
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        inicio_cpu = time.process_time()
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            segundos = time.perf_counter() - inicio
+            cpu = time.process_time() - inicio_cpu
+            _, pico = tracemalloc.get_traced_memory()
+            self.pico_total = max(self.pico_total, pico)
+            self.etapas.append({'etapa': nombre, 'segundos': segundos, 'cpu': cpu,
+                                'pico_bytes': max(0, pico - base)})
+
+    def contar(self, nombre, valor):
+        self.conteos[nombre] = valor
+
+    def como_dict(self):
+        return {
+            'version': __version__,
+            'fecha': self.fecha,
+            'fuente': self.fuente,
+            'optimizacion': self.nivel_optimizacion,
+            'etapas': self.etapas,
+            'conteos': self.conteos,
+            'segundos_total': sum(etapa['segundos'] for etapa in self.etapas),
+            'cpu_total': sum(etapa['cpu'] for etapa in self.etapas),
+            'pico_bytes': self.pico_total,
+        }
+
+    def tabla(self):
+        """Texto legible: una fila por etapa y los conteos"""
+        lineas = [f"{'etapa':<14} {'real (ms)':>10} {'CPU (ms)':>10} {'pico (KB)':>10}"]
+        for etapa in self.etapas:
+            lineas.append(f"{etapa['etapa']:<14} {etapa['segundos'] * 1000:>10.2f} "
+                          f"{etapa['cpu'] * 1000:>10.2f} {etapa['pico_bytes'] / 1024:>10.1f}")
+        datos = self.como_dict()
+        lineas.append(f"{'total':<14} {datos['segundos_total'] * 1000:>10.2f} "
+                      f"{datos['cpu_total'] * 1000:>10.2f} {datos['pico_bytes'] / 1024:>10.1f}")
+        if self.conteos:
+            lineas.append("")
+            lineas += [f"{nombre + ':':<15} {valor}" for nombre, valor in self.conteos.items()]
+        return "\n".join(lineas)
+
+
+def medir(estadisticas, nombre):
+    """estadisticas.etapa(nombre), o un contexto vacío si no se miden estadísticas"""
+    if estadisticas is None:
+        return contextlib.nullcontext()
+    return estadisticas.etapa(nombre)
+
+
+def escribir_jsonl(registros, ruta):
+    """Añade un registro JSON por línea al final de 'ruta' ('-': salida estándar)"""
+    lineas = "".join(json.dumps(registro, ensure_ascii=False) + "\n" for registro in registros)
+    if ruta == '-':
+        print(lineas, end="")
+        return
+    with open(ruta, 'a', encoding='utf-8') as f:
+        f.write(lineas)
@@ -1,8 +1,13 @@
-class TACGenerator:
+from .output import info
+from .visitor import VisitanteAST, postorden
+
+
+class TACGenerator(VisitanteAST):
     def __init__(self):
         self.temp_counter = 0
         self.label_counter = 0
         self.instructions = []
+        self.slots = {}  # {variable: slot} de las declaraciones (nodo.slot del semántico)
     # Los temp sirven para las variables temporales donde se guarda la informacion de operaciones binarias
 
     def new_temp(self):
@@ -20,13 +25,20 @@ class TACGenerator:
         # Añade una instrucción TAC a la lista
         self.instructions.append(instruction)
 
-    def visit(self, node):
-        # Método principal que visita cada tipo de nodo
-        # Busca el método del tipo que reciba
-        method_name = f'visit_{type(node).__name__}'
-        # Ejecuta su método dependiendo del tipo
-        method = getattr(self, method_name, self.visit_unknown)
-        return method(node)
+    # Emisión de operaciones y asignaciones; también la usa el modo de una
+    # pasada (src/single_pass.py)
+    def emit_binary(self, left_value, op, right_value):
+        temp = self.new_temp()  # obtiene una variable temporal para luego almacenarla
+        self.emit(f"{temp} := {left_value} {op} {right_value}")
+        return temp
+
+    def emit_assignment(self, target, value):
+        self.emit(f"{target} := {value}")
+        return target
+
+    # visit() viene de VisitanteAST: busca el método del tipo de nodo en una
+    # tabla de despacho y recorre el AST con una pila explícita. Los métodos
+    # de sentencias con hijos son generadores: 'valor = yield hijo' visita el hijo
 
     def visit_unknown(self, node):
         raise Exception(
@@ -36,7 +48,7 @@ class TACGenerator:
 
     def visit_Program(self, node):
         for statement in node.statements:
-            self.visit(statement)
+            yield statement
 
     # Para valores enteros
     def visit_Literal(self, node):
@@ -47,40 +59,36 @@ class TACGenerator:
         return node.token.valor
 
     # Para operaciones binarias
-    def visit_BinaryOp(self, node):
-        # Visita primero sus nodos hijos
-        left_value = self.visit(node.left)
-        right_value = self.visit(node.right)
-        temp = self.new_temp()  # obtiene una variable temporal para luego almacenarla
-        self.emit(f"{temp} := {left_value} {node.op_token.valor} {right_value}")
-        return temp
+    # Recibe ya visitados sus nodos hijos
+    @postorden
+    def visit_BinaryOp(self, node, left_value, right_value):
+        return self.emit_binary(left_value, node.op_token.valor, right_value)
     # Para asignación x = a + b
 
     def visit_Assignment(self, node):
         # Checa el target (x)
         target = node.var_token.valor
         # Checa el valor de la asignación (a + b)
-        value = self.visit(node.expression)
-        self.emit(f"{target} := {value}")
-        return target
+        value = yield node.expression
+        return self.emit_assignment(target, value)
     # Para ifs
 
     def visit_IfStatement(self, node):
         # Visita primero la condición
-        condition = self.visit(node.condition)
+        condition = yield node.condition
         # Declara label del else, importante para marcar el flujo
         label_else = self.new_label()
 
         self.emit(f"if {condition} == false goto {label_else}")
         # Visita la condición que se cumple
-        self.visit(node.true_branch)
+        yield node.true_branch
 
         if node.false_branch:  # Si hay sentencia de else no vacía
             # Declara nuevo label para el salto al final de la condición
             label_end = self.new_label()
             self.emit(f"goto {label_end}")
             self.emit(f"{label_else}:")  # Inicio del bloque else
-            self.visit(node.false_branch)
+            yield node.false_branch
             self.emit(f"{label_end}:")
         else:
             self.emit(f"{label_else}:")
@@ -93,10 +101,10 @@ class TACGenerator:
 
         self.emit(f"{label_start}:")
         # Procesar la condición
-        condition = self.visit(node.condition)
+        condition = yield node.condition
         self.emit(f"if {condition} == false goto {label_end}")
         # Visitar el contenido del while
-        self.visit(node.body)
+        yield node.body
         self.emit(f"goto {label_start}")
         self.emit(f"{label_end}:")
 
@@ -104,20 +112,23 @@ class TACGenerator:
     def visit_Block(self, node):
         # Por cada uno de las lineas de código, se visitan
         for statement in node.statements:
-            self.visit(statement)
+            yield statement
 
     # Para el print
     def visit_PrintStatement(self, node):
-        value = self.visit(node.expression)
+        value = yield node.expression
         self.emit(f"print {value}")
 
     def visit_VarDecl(self, node):
         # Las declaraciones no generan código TAC ejecutable
+        if node.slot is not None:
+            self.slots[node.var_token.valor] = node.slot
         self.emit(
             f"# Declaración: {node.tipo_token.valor} {node.var_token.valor}")
 
     def generate(self, ast):
         self.instructions = []
+        self.slots = {}
         self.temp_counter = 0
         self.label_counter = 0
         self.visit(ast)
@@ -126,11 +137,11 @@ class TACGenerator:
 
 class GeneradorDeCodigo:
     def __init__(self):
-        print("[CodeGen] Iniciado (Generador TAC Real).")
+        info("[CodeGen] Iniciado (Generador TAC Real).")
         self.generator = TACGenerator()
 
     def generar(self, ast_node):
-        print("[CodeGen] Generando TAC desde el AST...")
+        info("[CodeGen] Generando TAC desde el AST...")
         instructions = self.generator.generate(ast_node)
 
         # Convertir a string para guardar en archivo
@@ -0,0 +1,139 @@
+# ================== REPRESENTACIÓN INTERMEDIA DEL TAC ==================
+# Utilidades compartidas por el optimizador y el grafo de flujo: cada línea
+# de TAC se convierte en una tupla fácil de inspeccionar y reescribir.
+
+import re
+
+_TEMPORAL = re.compile(r't\d+$')
+
+
+def es_temporal(nombre):
+    return _TEMPORAL.match(nombre) is not None
+
+
+def temporales(instrucciones):
+    """Nombres de temporales del programa (tN no declarados como variables)"""
+    declaradas = set()
+    nombres = set()
+    for inst in instrucciones:
+        if inst[0] == 'comentario':
+            partes = inst[1].split()
+            if partes[1:2] == ['Declaración:']:  # '# Declaración: int x'
+                declaradas.add(partes[-1])
+        else:
+            destino = definicion(inst)
+            if destino is not None:
+                nombres.add(destino)
+            nombres.update(usos(inst))
+    return {nombre for nombre in nombres
+            if es_temporal(nombre) and nombre not in declaradas}
+
+
+def es_literal(operando):
+    return operando.lstrip('-').isdigit() or operando in ('true', 'false')
+
+
+def valor_literal(operando):
+    if operando == 'true':
+        return True
+    if operando == 'false':
+        return False
+    return int(operando)
+
+
+def literal(valor):
+    if isinstance(valor, bool):
+        return 'true' if valor else 'false'
+    return str(valor)
+
+
+# ========== REPRESENTACIÓN INTERNA ==========
+# Cada línea se convierte en una tupla:
+#   ('comentario', texto)        ('etiqueta', L)
+#   ('goto', L)                  ('si_falso', cond, L)
+#   ('print', x)                 ('copia', destino, x)
+#   ('binop', destino, a, op, b)
+
+def parsear(linea):
+    linea = linea.strip()
+    if linea.startswith('#'):
+        return ('comentario', linea)
+    if linea.endswith(':'):
+        return ('etiqueta', linea[:-1])
+    partes = linea.split()
+    if partes[0] == 'goto':
+        return ('goto', partes[1])
+    if partes[0] == 'if':  # if t1 == false goto L2
+        return ('si_falso', partes[1], partes[5])
+    if partes[0] == 'print':
+        return ('print', partes[1])
+    if len(partes) == 3:
+        return ('copia', partes[0], partes[2])
+    return ('binop', partes[0], partes[2], partes[3], partes[4])
+
+
+def formatear(inst):
+    tipo = inst[0]
+    if tipo == 'comentario':
+        return inst[1]
+    if tipo == 'etiqueta':
+        return f"{inst[1]}:"
+    if tipo == 'goto':
+        return f"goto {inst[1]}"
+    if tipo == 'si_falso':
+        return f"if {inst[1]} == false goto {inst[2]}"
+    if tipo == 'print':
+        return f"print {inst[1]}"
+    if tipo == 'copia':
+        return f"{inst[1]} := {inst[2]}"
+    return f"{inst[1]} := {inst[2]} {inst[3]} {inst[4]}"
+
+
+def usos(inst):
+    """Operandos que la instrucción lee"""
+    tipo = inst[0]
+    if tipo == 'binop':
+        return (inst[2], inst[4])
+    if tipo == 'copia':
+        return (inst[2],)
+    if tipo == 'print' or tipo == 'si_falso':
+        return (inst[1],)
+    return ()
+
+
+def definicion(inst):
+    """Variable que la instrucción escribe (o None)"""
+    if inst[0] == 'copia' or inst[0] == 'binop':
+        return inst[1]
+    return None
+
+
+def es_ejecutable(inst):
+    return inst[0] != 'comentario' and inst[0] != 'etiqueta'
+
+
+def contar_ejecutables(instrucciones):
+    return sum(1 for inst in instrucciones if es_ejecutable(inst))
+
+
+def contar_lecturas(instrucciones):
+    lecturas = {}
+    for inst in instrucciones:
+        for operando in usos(inst):
+            lecturas[operando] = lecturas.get(operando, 0) + 1
+    return lecturas
+
+
+def renombrar(inst, nombres):
+    """Devuelve la instrucción con las variables cambiadas según {viejo: nuevo}"""
+    tipo = inst[0]
+    if tipo == 'binop':
+        _, destino, a, op, b = inst
+        return ('binop', nombres.get(destino, destino), nombres.get(a, a), op, nombres.get(b, b))
+    if tipo == 'copia':
+        return ('copia', nombres.get(inst[1], inst[1]), nombres.get(inst[2], inst[2]))
+    if tipo == 'print':
+        return ('print', nombres.get(inst[1], inst[1]))
+    if tipo == 'si_falso':
+        return ('si_falso', nombres.get(inst[1], inst[1]), inst[2])
+    return inst
@@ -0,0 +1,160 @@
+# ================== FORMATO BINARIO .tacb ==================
+# Contenedor versionado de un ProgramaTAC ya decodificado. Todo se guarda en
+# little-endian:
+#
+#   Cabecera (32 bytes): 'TACB', versión u16, reservado u16, número de
+#       instrucciones, slots, constantes, símbolos y etiquetas (u32 cada uno),
+#       reservado u32
+#   Instrucciones: int32 x 4 por instrucción (op, a, b, c)
+#   Constantes:    (slot u32, tipo u32, valor i64) por constante
+#   Símbolos:      int32 slot por símbolo, u32 tamaño, nombres utf-8 separados por '\n'
+#   Etiquetas:     int32 índice por etiqueta, u32 tamaño, nombres utf-8 separados por '\n'
+#
+# Al cargar se mapea el archivo con mmap y el flujo de instrucciones se lee
+# directamente como enteros, sin parsear texto. Antes de leer cada sección se
+# comprueba su tamaño contra el del archivo: uno truncado o dañado da ValueError.
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from .vm import ProgramaTAC, OP_PRINT
+
+MAGIA = b'TACB'
+VERSION_TACB = 1
+
+_CABECERA = struct.Struct('<4sHHIIIIII')
+_CONSTANTE = struct.Struct('<IIq')
+_TAMANO = struct.Struct('<I')
+
+_TIPO_ENTERO = 1
+_TIPO_BOOL = 2
+
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+
+
+def _enteros_a_bytes(valores):
+    datos = array('i', valores)
+    if sys.byteorder != 'little':
+        datos.byteswap()
+    return datos.tobytes()
+
+
+def _tabla_nombres(tabla):
+    # {nombre: entero} -> int32[n] + u32 tamaño + nombres separados por '\n'
+    nombres = '\n'.join(tabla).encode('utf-8')
+    return _enteros_a_bytes(tabla.values()) + _TAMANO.pack(len(nombres)) + nombres
+
+
+def guardar_tacb(programa, ruta):
+    """Escribe un ProgramaTAC en formato .tacb"""
+    variables = set(programa.simbolos.values())
+    constantes = []
+    for slot, valor in enumerate(programa.memoria_inicial):
+        if slot in variables:
+            continue
+        if isinstance(valor, bool):
+            constantes.append(_CONSTANTE.pack(slot, _TIPO_BOOL, int(valor)))
+        elif _INT64_MIN <= valor <= _INT64_MAX:
+            constantes.append(_CONSTANTE.pack(slot, _TIPO_ENTERO, valor))
+        else:
+            raise ValueError(f"Constante fuera de rango para .tacb: {valor}")
+
+    cabecera = _CABECERA.pack(
+        MAGIA, VERSION_TACB, 0, len(programa.codigo), len(programa.memoria_inicial),
+        len(constantes), len(programa.simbolos), len(programa.etiquetas), 0)
+    instrucciones = _enteros_a_bytes(
+        campo for instruccion in programa.codigo for campo in instruccion)
+
+    with open(ruta, 'wb') as f:
+        f.write(cabecera)
+        f.write(instrucciones)
+        f.write(b''.join(constantes))
+        f.write(_tabla_nombres(programa.simbolos))
+        f.write(_tabla_nombres(programa.etiquetas))
+
+
+def _comprobar_tamano(vista, fin, ruta):
+    # Cada sección se comprueba contra el tamaño real antes de leerla: un
+    # archivo truncado o corrupto da ValueError y no un struct.error
+    if fin > len(vista):
+        raise ValueError(f"'{ruta}' está truncado o dañado")
+
+
+def _leer_enteros(vista, desplazamiento, cantidad, ruta):
+    # Se copian a un array: ninguna vista sobre el mmap sigue viva al cerrarlo
+    fin = desplazamiento + 4 * cantidad
+    _comprobar_tamano(vista, fin, ruta)
+    datos = array('i')
+    with vista[desplazamiento:fin] as trozo:
+        datos.frombytes(trozo)
+    if sys.byteorder != 'little':
+        datos.byteswap()
+    return datos, fin
+
+
+def _leer_tabla(vista, desplazamiento, cantidad, ruta):
+    valores, desplazamiento = _leer_enteros(vista, desplazamiento, cantidad, ruta)
+    _comprobar_tamano(vista, desplazamiento + _TAMANO.size, ruta)
+    tamano, = _TAMANO.unpack_from(vista, desplazamiento)
+    desplazamiento += _TAMANO.size
+    _comprobar_tamano(vista, desplazamiento + tamano, ruta)
+    nombres = bytes(vista[desplazamiento:desplazamiento + tamano]).decode('utf-8')
+    nombres = nombres.split('\n') if cantidad else []
+    if len(nombres) != cantidad:
+        raise ValueError(f"'{ruta}' está truncado o dañado")
+    return dict(zip(nombres, valores)), desplazamiento + tamano
+
+
+def cargar_tacb(ruta):
+    """Carga un archivo .tacb con mmap y devuelve el ProgramaTAC listo para ejecutar"""
+    with open(ruta, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < _CABECERA.size:
+            raise ValueError(f"'{ruta}' no es un archivo .tacb válido")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            with memoryview(mapa) as vista:
+                return _leer_programa(vista, ruta)
+
+
+def _leer_programa(vista, ruta):
+    (magia, version, _, n_instrucciones, n_slots, n_constantes,
+     n_simbolos, n_etiquetas, _) = _CABECERA.unpack_from(vista, 0)
+    if magia != MAGIA:
+        raise ValueError(f"'{ruta}' no es un archivo .tacb válido")
+    if version != VERSION_TACB:
+        raise ValueError(
+            f"Versión de .tacb no soportada: {version} (se esperaba {VERSION_TACB})")
+
+    # Cada slot es una variable, una constante o un temporal de alguna instrucción
+    if n_slots > n_simbolos + n_constantes + 3 * n_instrucciones:
+        raise ValueError(f"'{ruta}' está truncado o dañado")
+
+    # 1. Flujo de instrucciones: se agrupa en tuplas (op, a, b, c) sin parsear texto.
+    # Los enteros se toman de una tabla compartida para no crear un objeto por campo.
+    enteros, desplazamiento = _leer_enteros(vista, _CABECERA.size, 4 * n_instrucciones, ruta)
+    compartidos = range(max(n_slots, n_instrucciones + 1, OP_PRINT + 1))
+    if enteros and not 0 <= min(enteros) <= max(enteros) < len(compartidos):
+        raise ValueError(f"'{ruta}' está truncado o dañado")
+    campos = list(map(list(compartidos).__getitem__, enteros))
+    codigo = list(zip(campos[0::4], campos[1::4], campos[2::4], campos[3::4]))
+    del campos
+
+    # 2. Banco de registros: variables en 0 y constantes precargadas
+    memoria = [0] * n_slots
+    fin = desplazamiento + _CONSTANTE.size * n_constantes
+    _comprobar_tamano(vista, fin, ruta)
+    with vista[desplazamiento:fin] as trozo:
+        constantes = list(_CONSTANTE.iter_unpack(trozo))
+    for slot, tipo, valor in constantes:
+        if slot >= n_slots:
+            raise ValueError(f"'{ruta}' está truncado o dañado")
+        memoria[slot] = bool(valor) if tipo == _TIPO_BOOL else valor
+
+    # 3. Tablas de símbolos y etiquetas
+    simbolos, desplazamiento = _leer_tabla(vista, fin, n_simbolos, ruta)
+    etiquetas, _ = _leer_tabla(vista, desplazamiento, n_etiquetas, ruta)
+
+    return ProgramaTAC(codigo, memoria, simbolos, etiquetas)
@@ -0,0 +1,114 @@
+# ================== RECORRIDO DEL AST SIN RECURSIÓN ==================
+# Base común de AnalizadorSemanticoAST y TACGenerator. visit() recorre el AST
+# con una pila explícita: la profundidad (paréntesis anidados, cadenas
+# 'a + b + c...' o bloques dentro de bloques) no consume pila de Python ni
+# choca con el límite de recursión.
+#
+# Los métodos visit_<Clase> son de tres formas:
+#   hoja        función normal: visit_Literal(self, node) -> resultado
+#   postorden   @postorden: nodos con hijos 'left' y 'right' que reciben ya
+#               calculados los resultados de ambos:
+#               visit_BinaryOp(self, node, izq, der) -> resultado
+#   generador   para el resto: 'resultado = yield hijo' visita el hijo
+#               (sentencias, que comprueban o emiten algo entre sus hijos)
+# Las expresiones, que son la mayoría de los nodos, solo usan las dos
+# primeras formas y se recorren sin crear generadores.
+#
+# El método de cada clase de nodo se busca una sola vez por clase visitante
+# y se guarda en una tabla de despacho {clase de nodo: (forma, método)}.
+
+import inspect
+
+HOJA = 0
+POSTORDEN = 1
+GENERADOR = 2
+
+# Marcas en la pila (ver visit)
+_DERECHO = object()    # Debajo: el nodo postorden que espera su hijo izquierdo
+_GENERADOR = object()  # Debajo: el generador que espera el resultado de su hijo
+
+
+def postorden(metodo):
+    """Marca un visit_ que recibe los resultados de node.left y node.right"""
+    metodo.postorden = True
+    return metodo
+
+
+class VisitanteAST:
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._despacho = {}  # Tabla propia de cada clase visitante
+
+    def visit_unknown(self, node):
+        pass
+
+    @classmethod
+    def _registrar(cls, clase_nodo):
+        metodo = getattr(cls, f'visit_{clase_nodo.__name__}', cls.visit_unknown)
+        if getattr(metodo, 'postorden', False):
+            forma = POSTORDEN
+        elif inspect.isgeneratorfunction(metodo):
+            forma = GENERADOR
+        else:
+            forma = HOJA
+        cls._despacho[clase_nodo] = entrada = (forma, metodo)
+        return entrada
+
+    def visit(self, node):
+        """Visita 'node' y devuelve el resultado de su método visit_<Clase>"""
+        despacho = self._despacho
+        registrar = self._registrar
+        derecho_pendiente = _DERECHO
+        generador_en_curso = _GENERADOR
+        pila = []
+        apilar = pila.append
+        desapilar = pila.pop
+        while True:
+            # 1. Bajar por los hijos izquierdos de los nodos postorden
+            forma, metodo = despacho.get(type(node)) or registrar(type(node))
+            while forma == 1:  # POSTORDEN
+                apilar(node)
+                apilar(derecho_pendiente)
+                node = node.left
+                forma, metodo = despacho.get(type(node)) or registrar(type(node))
+            if forma == 2:  # GENERADOR
+                generador = metodo(self, node)
+                try:
+                    node = generador.send(None)
+                except StopIteration as fin:
+                    resultado = fin.value
+                else:
+                    apilar(generador)  # Pide un hijo: visitarlo primero
+                    apilar(generador_en_curso)
+                    continue
+            else:
+                resultado = metodo(self, node)
+
+            # 2. Subir: entregar el resultado a quien lo pidió
+            while pila:
+                tope = desapilar()
+                if tope is derecho_pendiente:
+                    node = pila[-1].right
+                    forma, metodo = despacho.get(type(node)) or registrar(type(node))
+                    if forma == 0:  # HOJA: se combina sin volver a bajar
+                        padre = desapilar()
+                        resultado = despacho[type(padre)][1](self, padre, resultado,
+                                                             metodo(self, node))
+                        continue
+                    # [..., nodo, _DERECHO] -> [..., nodo, resultado izquierdo]
+                    apilar(resultado)
+                    break
+                if tope is generador_en_curso:
+                    try:
+                        node = pila[-1].send(resultado)
+                    except StopIteration as fin:
+                        desapilar()
+                        resultado = fin.value
+                        continue
+                    apilar(generador_en_curso)  # Pide otro hijo
+                    break
+                # tope es el resultado izquierdo: [..., nodo] con ambos hijos hechos
+                padre = desapilar()
+                resultado = despacho[type(padre)][1](self, padre, tope, resultado)
+            else:
+                return resultado
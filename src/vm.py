@@ -1,103 +1,412 @@
-class MaquinaTAC:
-    def __init__(self):
-        print("[MaquinaTAC] VM Inicializada.")
-        self.mem = {}  # Memoria de variables y temporales
-        self.labels = {}  # Mapa de etiquetas a número de línea
-
-    def _get_val(self, operando):
-        if operando.isdigit():
-            return int(operando)
-        elif operando == 'true':
-            return True
-        elif operando == 'false':
-            return False
-        return self.mem.get(operando, 0)
-
-    def preprocesar_etiquetas(self, lineas):
-        """Busca donde están las etiquetas para los saltos"""
-        self.labels.clear()
-        instrucciones_limpias = []
-        indice = 0
-        for linea in lineas:
-            linea = linea.strip()
-            if not linea or linea.startswith('#'):
-                continue
+import operator
+import time
+
+from .output import SalidaEstandar, info
+
+# ========== FORMATO DECODIFICADO ==========
+# Cada instrucción TAC se decodifica una sola vez a una tupla (op, a, b, c):
+#   op      código entero de operación
+#   a, b, c slots del banco de registros o índices de salto ya resueltos
+# Las constantes ocupan slots propios precargados, así que todos los operandos
+# se leen igual: mem[slot].
+
+# Operaciones binarias (el código es el índice en _FUNCIONES)
+OP_SUMA = 0
+OP_RESTA = 1
+OP_MULT = 2
+OP_DIV = 3
+OP_MENOR = 4
+OP_MENOR_IGUAL = 5
+OP_MAYOR = 6
+OP_MAYOR_IGUAL = 7
+OP_IGUAL = 8
+OP_DISTINTO = 9
+OP_AND = 10
+OP_OR = 11
+# Resto de instrucciones
+OP_COPIA = 12     # a := b
+OP_SI_FALSO = 13  # if a == false goto b
+OP_GOTO = 14      # goto a
+OP_PRINT = 15     # print a
+# Superinstrucciones: solo las crea fusionar_superinstrucciones() al cargar
+OP_SALTO_SI_NO = 16  # if not (b OP c) goto a, con OP = op - OP_SALTO_SI_NO (16..27)
+OP_COPIA_SALTO = 28  # a := b; goto c
+
+OPERADORES = {
+    '+': OP_SUMA, '-': OP_RESTA, '*': OP_MULT, '/': OP_DIV,
+    '<': OP_MENOR, '<=': OP_MENOR_IGUAL, '>': OP_MAYOR, '>=': OP_MAYOR_IGUAL,
+    '==': OP_IGUAL, '!=': OP_DISTINTO, '&&': OP_AND, '||': OP_OR
+}
+SIMBOLOS_OPERADOR = {codigo: simbolo for simbolo, codigo in OPERADORES.items()}
+
+
+def _division(a, b):
+    # División entera truncada hacia cero
+    return int(a / b)
+
+
+def _y_logico(a, b):
+    return a and b
+
+
+def _o_logico(a, b):
+    return a or b
+
+
+_FUNCIONES = [
+    operator.add, operator.sub, operator.mul, _division,
+    operator.lt, operator.le, operator.gt, operator.ge,
+    operator.eq, operator.ne, _y_logico, _o_logico
+]
+
+
+_DECLARACION = '# Declaración:'
+
+
+def _es_entero(operando):
+    return operando.lstrip('-').isdigit()
+
+
+class ProgramaTAC:
+    """Programa TAC decodificado, listo para ejecutarse sin volver a parsear texto"""
+
+    def __init__(self, codigo, memoria_inicial, simbolos, etiquetas, origen=None):
+        self.codigo = codigo                    # Lista de tuplas (op, a, b, c)
+        self.memoria_inicial = memoria_inicial  # Constantes precargadas, variables en 0
+        self.simbolos = simbolos                # {nombre: slot} de variables y temporales
+        self.etiquetas = etiquetas              # {etiqueta: índice de instrucción}
+        # Tras fusionar superinstrucciones: índice en el programa original de
+        # cada tupla (None si no se fusionó nada)
+        self.origen = origen
+
+    def constantes(self):
+        """Devuelve {slot: valor} de los slots que no son variables"""
+        variables = set(self.simbolos.values())
+        return {slot: valor for slot, valor in enumerate(self.memoria_inicial)
+                if slot not in variables}
+
+
+def desensamblar(programa):
+    """Reconstruye las líneas de TAC de un ProgramaTAC (inverso de decodificar)"""
+    nombres = {slot: nombre for nombre, slot in programa.simbolos.items()}
+    etiquetas = {}
+    for etiqueta, indice in programa.etiquetas.items():
+        etiquetas.setdefault(indice, []).append(etiqueta)
+    destinos = {indice: lista[0] for indice, lista in etiquetas.items()}
+
+    def operando(slot):
+        if slot in nombres:
+            return nombres[slot]
+        valor = programa.memoria_inicial[slot]
+        if isinstance(valor, bool):
+            return 'true' if valor else 'false'
+        return str(valor)
+
+    lineas = []
+    for indice, (op, a, b, c) in enumerate(programa.codigo):
+        lineas.extend(f"{etiqueta}:" for etiqueta in etiquetas.get(indice, ()))
+        if op == OP_GOTO:
+            lineas.append(f"goto {destinos[a]}")
+        elif op == OP_SI_FALSO:
+            lineas.append(f"if {operando(a)} == false goto {destinos[b]}")
+        elif op == OP_PRINT:
+            lineas.append(f"print {operando(a)}")
+        elif op == OP_COPIA:
+            lineas.append(f"{operando(a)} := {operando(b)}")
+        else:
+            lineas.append(
+                f"{operando(a)} := {operando(b)} {SIMBOLOS_OPERADOR[op]} {operando(c)}")
+    lineas.extend(f"{etiqueta}:" for etiqueta in etiquetas.get(len(programa.codigo), ()))
+    return lineas
+
+
+def decodificar(codigo_tac, slots=None):
+    """Decodifica TAC (string o lista de líneas) a un ProgramaTAC.
+
+    'slots' es el {variable: slot} del análisis semántico (TACGenerator.slots);
+    sin él las variables se numeran por el orden de las líneas '# Declaración:'.
+    """
+    if isinstance(codigo_tac, str):
+        codigo_tac = codigo_tac.split('\n')
+
+    # 1. Primera pasada: etiquetas, declaraciones e instrucciones limpias
+    etiquetas = {}
+    instrucciones = []
+    declaradas = []
+    for linea in codigo_tac:
+        linea = linea.strip()
+        if not linea or linea.startswith('#'):
+            if linea.startswith(_DECLARACION):  # '# Declaración: int x'
+                declaradas.append(linea.split()[-1])
+            continue
+        if linea.endswith(':'):  # Es una etiqueta
+            etiquetas[linea[:-1]] = len(instrucciones)
+        else:
+            instrucciones.append(linea.split())
 
-            if linea.endswith(':'):  # Es una etiqueta
-                label_name = linea[:-1]
-                self.labels[label_name] = indice
+    # 2. Segunda pasada: operandos a slots y saltos a índices
+    memoria = []
+    slots = {}
+    simbolos = {}
+
+    def slot(operando):
+        s = slots.get(operando)
+        if s is None:
+            s = slots[operando] = len(memoria)
+            if _es_entero(operando):
+                memoria.append(int(operando))
+            elif operando == 'true':
+                memoria.append(True)
+            elif operando == 'false':
+                memoria.append(False)
             else:
-                instrucciones_limpias.append(linea)
-                indice += 1
-        return instrucciones_limpias
+                memoria.append(0)
+                simbolos[operando] = s
+        return s
 
-    def ejecutar(self, codigo_tac_string):
-        lineas_crudas = codigo_tac_string.split('\n')
-        instrucciones = self.preprocesar_etiquetas(lineas_crudas)
-        pc = 0  # Program Counter
+    # Las variables declaradas ocupan los primeros slots, aunque se usen por
+    # primera vez más tarde: los del análisis semántico o, si no se dan, el
+    # orden de declaración ('# Declaración:'), que es el mismo
+    if slots:
+        for nombre in sorted(slots, key=slots.get):
+            if slot(nombre) != slots[nombre]:
+                raise ValueError(f"Slot no denso para la variable '{nombre}': {slots[nombre]}")
+    for nombre in declaradas:
+        slot(nombre)
+
+    def destino(etiqueta):
+        if etiqueta not in etiquetas:
+            raise ValueError(f"Etiqueta no definida en TAC: '{etiqueta}'")
+        return etiquetas[etiqueta]
+
+    codigo = []
+    for partes in instrucciones:
+        if partes[0] == 'goto':
+            codigo.append((OP_GOTO, destino(partes[1]), 0, 0))
+        elif partes[0] == 'if':  # if t1 == false goto L2
+            codigo.append((OP_SI_FALSO, slot(partes[1]), destino(partes[5]), 0))
+        elif partes[0] == 'print':
+            codigo.append((OP_PRINT, slot(partes[1]), 0, 0))
+        elif len(partes) == 3 and partes[1] == ':=':  # x := 5
+            codigo.append((OP_COPIA, slot(partes[0]), slot(partes[2]), 0))
+        elif len(partes) == 5 and partes[1] == ':=' and partes[3] in OPERADORES:  # t1 := a + b
+            codigo.append((OPERADORES[partes[3]], slot(partes[0]),
+                           slot(partes[2]), slot(partes[4])))
+        else:
+            raise ValueError(f"Instrucción TAC no reconocida: '{' '.join(partes)}'")
+
+    return ProgramaTAC(codigo, memoria, simbolos, etiquetas)
+
+
+# ========== SUPERINSTRUCCIONES ==========
+# Secuencias frecuentes que el cargador de la VM fusiona en una sola tupla:
+#   comparar_y_saltar  'tN := a < b; if tN == false goto L' -> (OP_SALTO_SI_NO + op, L, a, b)
+#   operar_y_asignar   'tN := a + b; x := tN'               -> (op, x, a, b)
+#   copiar_y_saltar    'x := 5; goto L'                     -> (OP_COPIA_SALTO, x, 5, L)
+# Las dos primeras solo se aplican si el temporal no se lee en ningún otro
+# sitio: así no hace falta materializarlo. Las constantes ya viven en slots
+# precargados, por lo que cargar un literal y asignarlo es una sola copia; lo
+# que se fusiona es esa copia con el salto que suele seguirla al final de una
+# rama o del cuerpo de un bucle.
 
-        print(
-            f"\n--- [Ejecución Real] Iniciando ({len(instrucciones)} instrucciones) ---")
+SUPERINSTRUCCIONES = ('comparar_y_saltar', 'operar_y_asignar', 'copiar_y_saltar')
 
-        while pc < len(instrucciones):
-            inst = instrucciones[pc]
-            partes = inst.split()
 
-            # 1. Saltos (GOTO)
-            if partes[0] == 'goto':
-                etiqueta = partes[1]
-                pc = self.labels[etiqueta]
+def _es_temporal(nombre):
+    return nombre[:1] == 't' and nombre[1:].isdigit()
+
+
+def fusionar_superinstrucciones(programa):
+    """Devuelve (ProgramaTAC con superinstrucciones, {índice: tipo de superinstrucción})"""
+    codigo = programa.codigo
+    temporales = {slot for nombre, slot in programa.simbolos.items() if _es_temporal(nombre)}
+    lecturas = [0] * len(programa.memoria_inicial)
+    destinos = set(programa.etiquetas.values())
+    for op, a, b, c in codigo:
+        if op < OP_COPIA:
+            lecturas[b] += 1
+            lecturas[c] += 1
+        elif op == OP_COPIA:
+            lecturas[b] += 1
+        elif op == OP_SI_FALSO:
+            lecturas[a] += 1
+            destinos.add(b)
+        elif op == OP_GOTO:
+            destinos.add(a)
+        else:
+            lecturas[a] += 1
+
+    # 1. Fusión de pares; la segunda instrucción no puede ser destino de un salto
+    nuevo = []
+    origen = []
+    tipos = {}
+    indices = [0] * (len(codigo) + 1)  # Índice viejo -> índice nuevo
+    total = len(codigo)
+    i = 0
+    while i < total:
+        indices[i] = len(nuevo)
+        op, a, b, c = codigo[i]
+        if i + 1 < total and i + 1 not in destinos:
+            op2, a2, b2, c2 = codigo[i + 1]
+            fusion = None
+            if op < OP_COPIA and a in temporales and lecturas[a] == 1:
+                if op2 == OP_SI_FALSO and a2 == a:
+                    fusion = (OP_SALTO_SI_NO + op, b2, b, c), 'comparar_y_saltar'
+                elif op2 == OP_COPIA and b2 == a:
+                    fusion = (op, a2, b, c), 'operar_y_asignar'
+            elif op == OP_COPIA and op2 == OP_GOTO:
+                fusion = (OP_COPIA_SALTO, a, b, a2), 'copiar_y_saltar'
+            if fusion is not None:
+                tipos[len(nuevo)] = fusion[1]
+                nuevo.append(fusion[0])
+                origen.append(i)
+                indices[i + 1] = len(nuevo)
+                i += 2
                 continue
+        nuevo.append(codigo[i])
+        origen.append(i)
+        i += 1
+    indices[total] = len(nuevo)
+
+    # 2. Saltos y etiquetas a los índices nuevos
+    for j, (op, a, b, c) in enumerate(nuevo):
+        if op == OP_GOTO:
+            nuevo[j] = (op, indices[a], b, c)
+        elif op == OP_SI_FALSO:
+            nuevo[j] = (op, a, indices[b], c)
+        elif op == OP_COPIA_SALTO:
+            nuevo[j] = (op, a, b, indices[c])
+        elif op >= OP_SALTO_SI_NO:
+            nuevo[j] = (op, indices[a], b, c)
+    etiquetas = {etiqueta: indices[indice] for etiqueta, indice in programa.etiquetas.items()}
+    fusionado = ProgramaTAC(nuevo, programa.memoria_inicial, programa.simbolos, etiquetas, origen)
+    return fusionado, tipos
 
-            # 2. IF (if t1 == false goto L2)
-            elif partes[0] == 'if':
-                cond_val = self._get_val(partes[1])
-                target_val = False
-                label = partes[5]
-                if cond_val == target_val:
-                    pc = self.labels[label]
-                    continue
-
-            # 3. PRINT
-            elif partes[0] == 'print':
-                val = self._get_val(partes[1])
-                print(f"OUTPUT >> {val}")
-
-            # 4. Asignaciones y Operaciones
-            elif len(partes) >= 3 and partes[1] == ':=':
-                destino = partes[0]
-
-                if len(partes) == 3:  # x := 5
-                    self.mem[destino] = self._get_val(partes[2])
-
-                elif len(partes) == 5:  # t1 := a + b
-                    op1 = self._get_val(partes[2])
-                    operador = partes[3]
-                    op2 = self._get_val(partes[4])
-
-                    res = 0
-                    if operador == '+':
-                        res = op1 + op2
-                    elif operador == '-':
-                        res = op1 - op2
-                    elif operador == '*':
-                        res = op1 * op2
-                    elif operador == '/':
-                        res = int(op1 / op2)
-                    elif operador == '<':
-                        res = op1 < op2
-                    elif operador == '>':
-                        res = op1 > op2
-                    elif operador == '==':
-                        res = (op1 == op2)
-                    elif operador == '!=':
-                        res = (op1 != op2)
-                    elif operador == '&&':
-                        res = (op1 and op2)
-                    elif operador == '||':
-                        res = (op1 or op2)
-
-                    self.mem[destino] = res
 
+def _ejecuciones_originales(programa, ejecuciones, total):
+    """Reparte las ejecuciones de un programa fusionado entre las 'total'
+    instrucciones del original: las dos mitades de una superinstrucción se
+    ejecutan siempre juntas, así que ambas reciben su cuenta"""
+    if programa.origen is None:
+        return ejecuciones
+    originales = [0] * total
+    limites = programa.origen[1:] + [total]
+    for veces, inicio, fin in zip(ejecuciones, programa.origen, limites):
+        for indice in range(inicio, fin):
+            originales[indice] = veces
+    return originales
+
+
+class MaquinaTAC:
+    def __init__(self, superinstrucciones=True, contadores=False, perfilar=False, salida=None):
+        info("[MaquinaTAC] VM Inicializada.")
+        # Destino de los print del programa (ver src/output.py)
+        self.salida = salida if salida is not None else SalidaEstandar()
+        self.mem = []  # Banco de registros: variables, temporales y constantes
+        self.labels = {}  # Mapa de etiquetas a número de instrucción
+        self.superinstrucciones = superinstrucciones
+        self.contadores = contadores
+        self.perfilar = perfilar
+        # {tipo: [fusionadas, ejecuciones]} de la última ejecución
+        self.estadisticas_superinstrucciones = {}
+        # Con perfilar: programa sin fusionar de la última ejecución, veces que
+        # se ejecutó cada una de sus instrucciones y segundos del bucle
+        self.programa = None
+        self.ejecuciones = None
+        self.segundos = 0.0
+
+    def ejecutar(self, codigo_tac_string):
+        self.ejecutar_programa(decodificar(codigo_tac_string))
+
+    def ejecutar_programa(self, programa):
+        original = programa
+        tipos = {}
+        if self.superinstrucciones:
+            programa, tipos = fusionar_superinstrucciones(programa)
+        self.estadisticas_superinstrucciones = {}
+        for tipo in tipos.values():
+            self.estadisticas_superinstrucciones.setdefault(tipo, [0, 0])[0] += 1
+
+        codigo = programa.codigo
+        self.labels = programa.etiquetas
+        self.mem = list(programa.memoria_inicial)
+
+        info(f"\n--- [Ejecución Real] Iniciando ({len(codigo)} instrucciones) ---")
+        try:
+            # Sin contadores ni perfil se usa el bucle sin instrumentar
+            if self.contadores or self.perfilar:
+                inicio = time.perf_counter()
+                ejecuciones = self._bucle_con_contadores(codigo)
+                self.segundos = time.perf_counter() - inicio
+                for indice, tipo in tipos.items():
+                    self.estadisticas_superinstrucciones[tipo][1] += ejecuciones[indice]
+                if self.perfilar:
+                    self.programa = original
+                    self.ejecuciones = _ejecuciones_originales(programa, ejecuciones,
+                                                               len(original.codigo))
+            else:
+                self._bucle(codigo)
+        finally:
+            self.salida.vaciar()  # Lo impreso antes de un error también sale
+        info("--- [Ejecución Real] Finalizada ---")
+
+    def _bucle(self, codigo):
+        mem = self.mem
+        funciones = _FUNCIONES
+        escribir = self.salida.escribir
+        total = len(codigo)
+        pc = 0  # Program Counter
+
+        # Las operaciones binarias van primero: son las más frecuentes
+        while pc < total:
+            op, a, b, c = codigo[pc]
             pc += 1
-        print("--- [Ejecución Real] Finalizada ---")
+            if op < OP_COPIA:
+                mem[a] = funciones[op](mem[b], mem[c])
+            elif op == OP_COPIA:
+                mem[a] = mem[b]
+            elif op >= OP_SALTO_SI_NO:
+                if op == OP_COPIA_SALTO:
+                    mem[a] = mem[b]
+                    pc = c
+                elif not funciones[op - OP_SALTO_SI_NO](mem[b], mem[c]):
+                    pc = a
+            elif op == OP_SI_FALSO:
+                if not mem[a]:
+                    pc = b
+            elif op == OP_GOTO:
+                pc = a
+            else:
+                escribir(mem[a])
+
+    def _bucle_con_contadores(self, codigo):
+        # Igual que _bucle, pero cuenta cuántas veces se ejecuta cada instrucción
+        ejecuciones = [0] * len(codigo)
+        mem = self.mem
+        funciones = _FUNCIONES
+        escribir = self.salida.escribir
+        total = len(codigo)
+        pc = 0
+
+        while pc < total:
+            ejecuciones[pc] += 1
+            op, a, b, c = codigo[pc]
+            pc += 1
+            if op < OP_COPIA:
+                mem[a] = funciones[op](mem[b], mem[c])
+            elif op == OP_COPIA:
+                mem[a] = mem[b]
+            elif op >= OP_SALTO_SI_NO:
+                if op == OP_COPIA_SALTO:
+                    mem[a] = mem[b]
+                    pc = c
+                elif not funciones[op - OP_SALTO_SI_NO](mem[b], mem[c]):
+                    pc = a
+            elif op == OP_SI_FALSO:
+                if not mem[a]:
+                    pc = b
+            elif op == OP_GOTO:
+                pc = a
+            else:
+                escribir(mem[a])
+        return ejecuciones